@@ -1,5 +1,11 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import bumps, conditional
+from backend.batch import fetch_by_ids, parse_batch_ids, BatchError
+from backend.events import record_event, record_event_batch
+from backend.pagination import keyset_page, page_response, PaginationError
+from backend.search import SearchError, fulltext_boolean_query, int_list, time_window
+from backend.streaming import stream_format, stream_keyset
 from mysql.connector import Error
 from flask import current_app
 from datetime import datetime
@@ -11,30 +17,197 @@ alerts = Blueprint("alerts", __name__)
 # Get all alerts (doctors and nurses see the same alerts)
 # Available to Nurse-2.3 and Proxy-4.1
 @alerts.route("/", methods=["GET"])
+@conditional("alert")
 def get_alerts():
     try:
         current_app.logger.info('Starting get_alerts request')
+        
+        # Exports opt in to a streamed body via Accept: application/x-ndjson
+        fmt = stream_format()
+        if fmt:
+            return stream_keyset(
+                "SELECT * FROM AlertDetails", ["SentTime", "AlertID"], descending=True, fmt=fmt
+            ), 200
+        
         cursor = db.get_db().cursor()
         
-        # Get all alerts - no filtering by user type
-        query = """
-        SELECT * FROM AlertDetails 
-        ORDER BY SentTime DESC
+        # Get all alerts - no filtering by user type, newest first
+        page = keyset_page(
+            cursor, "SELECT * FROM AlertDetails", ["SentTime", "AlertID"], descending=True
+        )
+        cursor.close()
+        
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} alerts')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_alerts: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Alert recipients by user_type: (link table, ID column)
+ALERT_RECIPIENTS = {
+    "doctor": ("AlertsDoctors", "DoctorID"),
+    "nurse": ("AlertsNurse", "NurseID"),
+}
+
+
+class AlertQueueError(ValueError):
+    """Raised when the queue's user_type / user_id are missing or invalid."""
+    pass
+
+
+def unacknowledged_by(args):
+    """
+    Build the anti-join keeping alerts the ?user_type= / ?user_id= user
+    has not acknowledged.
+
+    Every user sees every alert, so an alert stays queued until the user's
+    link row has an AcknowledgedTime. The probe is a primary-key lookup on
+    (AlertID, DoctorID) / (AlertID, NurseID), and the clustered row already
+    holds AcknowledgedTime.
+
+    Returns:
+        (condition, params) on AlertDetails aliased as a
+    """
+    user_type = args.get("user_type")
+    user_id = args.get("user_id", type=int)
+    if user_type not in ALERT_RECIPIENTS or user_id is None:
+        raise AlertQueueError("user_type must be 'doctor' or 'nurse' and needs an integer user_id")
+    table, column = ALERT_RECIPIENTS[user_type]
+    condition = (
+        f"NOT EXISTS (SELECT 1 FROM {table} r WHERE r.AlertID = a.AlertID "
+        f"AND r.{column} = %s AND r.AcknowledgedTime IS NOT NULL)"
+    )
+    return condition, [user_id]
+
+
+# Alerts the user has not acknowledged yet, most urgent first, then oldest
+# GET /queue?user_type=doctor&user_id=1, keyset-paginated
+@alerts.route("/queue", methods=["GET"])
+@conditional("alert")
+def get_alert_queue():
+    try:
+        condition, params = unacknowledged_by(request.args)
+        cursor = db.get_db().cursor()
+        
+        # Page over the covering idx_alert_queue alone, so alerts the user
+        # already acknowledged are skipped without reading their rows...
+        page = keyset_page(
+            cursor, "SELECT a.AlertID, a.UrgencyLevel, a.SentTime FROM AlertDetails a",
+            ["a.UrgencyLevel", "a.SentTime", "a.AlertID"], where=[condition], params=params,
+            descending=[True, False, False]
+        )
+        # ...then read the full rows for this page only
+        ids = [row["AlertID"] for row in page["rows"]]
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM AlertDetails", "AlertID", ids) if ids else {}
+        cursor.close()
+        page["rows"] = [rows_by_id[alert_id] for alert_id in ids if alert_id in rows_by_id]
+        
+        current_app.logger.info(f'Retrieved {len(page["rows"])} queued alerts for {request.args["user_type"]} {request.args["user_id"]}')
+        return page_response(page), 200
+    except (AlertQueueError, PaginationError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_alert_queue: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Unacknowledged alert counts for dashboard badges
+# GET /queue/count?user_type=nurse&user_id=3
+# -> {"unread": 7, "by_urgency": {"5": 2, "4": 5}}
+@alerts.route("/queue/count", methods=["GET"])
+@conditional("alert")
+def get_alert_queue_count():
+    try:
+        condition, params = unacknowledged_by(request.args)
+        cursor = db.get_db().cursor()
+        
+        # An index-only scan of idx_alert_queue in UrgencyLevel order, so
+        # the GROUP BY needs no temporary table
+        cursor.execute(
+            f"SELECT a.UrgencyLevel, COUNT(*) AS Unread FROM AlertDetails a "
+            f"WHERE {condition} GROUP BY a.UrgencyLevel",
+            params,
+        )
+        by_urgency = {str(row["UrgencyLevel"]): row["Unread"] for row in cursor.fetchall()}
+        cursor.close()
+        
+        return jsonify({"unread": sum(by_urgency.values()), "by_urgency": by_urgency}), 200
+    except AlertQueueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_alert_queue_count: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Full-text search over alert Message and Protocol, best match first
+# ?q= is required; ?urgency=4,5 or ?min_urgency=, ?from= / ?to= on SentTime
+# and ?user_type= with ?user_id= narrow the results
+@alerts.route("/search", methods=["GET"])
+@conditional("alert")
+def search_alerts():
+    try:
+        current_app.logger.info('Starting search_alerts request')
+        terms = fulltext_boolean_query(request.args.get("q"))
+        
+        conditions = ["MATCH(a.Message, a.Protocol) AGAINST (%s IN BOOLEAN MODE)"]
+        params = [terms]
+        
+        urgency = int_list(request.args, "urgency")
+        if urgency:
+            conditions.append(f"a.UrgencyLevel IN ({', '.join(['%s'] * len(urgency))})")
+            params.extend(urgency)
+        if request.args.get("min_urgency"):
+            try:
+                params.append(int(request.args["min_urgency"]))
+            except ValueError:
+                raise SearchError("min_urgency must be an integer")
+            conditions.append("a.UrgencyLevel >= %s")
+        
+        window, window_params = time_window(request.args, "a.SentTime")
+        conditions.extend(window)
+        params.extend(window_params)
+        
+        user_type = request.args.get("user_type")
+        if user_type:
+            if user_type not in ALERT_RECIPIENTS or not request.args.get("user_id"):
+                raise SearchError("user_type must be 'doctor' or 'nurse' and needs a user_id")
+            table, column = ALERT_RECIPIENTS[user_type]
+            conditions.append(
+                f"EXISTS (SELECT 1 FROM {table} r WHERE r.AlertID = a.AlertID AND r.{column} = %s)"
+            )
+            params.append(request.args["user_id"])
+        
+        # Score in a derived table so Relevance can be the keyset sort key
+        select = f"""
+        SELECT * FROM (
+            SELECT a.*, MATCH(a.Message, a.Protocol) AGAINST (%s IN BOOLEAN MODE) AS Relevance
+            FROM AlertDetails a
+            WHERE {' AND '.join(conditions)}
+        ) ranked
         """
         
-        cursor.execute(query)
-        alerts_data = cursor.fetchall()
+        cursor = db.get_db().cursor()
+        page = keyset_page(
+            cursor, select, ["Relevance", "AlertID"], descending=True,
+            select_params=[terms] + params
+        )
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(alerts_data)} alerts')
-        return jsonify(alerts_data), 200
+        current_app.logger.info(f'Alert search matched {len(page["rows"])} alerts on this page')
+        return page_response(page), 200
+    except (SearchError, PaginationError) as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
-        current_app.logger.error(f'Database error in get_alerts: {str(e)}')
+        current_app.logger.error(f'Database error in search_alerts: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
 # Create alert with UrgencyLevel and Protocol
 @alerts.route("/", methods=["POST"])
+@bumps("alert")
 def create_alert():
     try:
         data = request.get_json()
@@ -68,8 +241,13 @@ def create_alert():
             ),
         )
         
-        db.get_db().commit()
         new_alert_id = cursor.lastrowid
+        
+        # Push to every open dashboard stream in the same transaction
+        cursor.execute("SELECT * FROM AlertDetails WHERE AlertID = %s", (new_alert_id,))
+        record_event(cursor, "alert.created", cursor.fetchone())
+        
+        db.get_db().commit()
         cursor.close()
         
         return jsonify({"message": "Alert created successfully", "alert_id": new_alert_id}), 201
@@ -80,6 +258,7 @@ def create_alert():
 # Get a specific alert with Message, SentTime, PostedBy, PostedByRole, UrgencyLevel, and Protocol
 # Available to Nurse-2.3
 @alerts.route("/<int:alert_id>", methods=["GET"])
+@conditional("alert")
 def get_alert(alert_id):
     try:
         cursor = db.get_db().cursor()
@@ -98,6 +277,7 @@ def get_alert(alert_id):
 
 # Acknowledge alert (sets AcknowledgedTime to NOW())
 @alerts.route("/<int:alert_id>", methods=["PUT"])
+@bumps("alert")
 def acknowledge_alert(alert_id):
     try:
         data = request.get_json()
@@ -136,6 +316,12 @@ def acknowledge_alert(alert_id):
             return jsonify({"error": "Invalid user_type. Must be 'doctor' or 'nurse'"}), 400
         
         cursor.execute(query, (alert_id, user_id, current_time))
+        # Only the acknowledging user's streams need to drop the alert
+        record_event(
+            cursor, "alert.acknowledged",
+            {"AlertID": alert_id, "AcknowledgedTime": current_time},
+            user_type=user_type, user_id=user_id,
+        )
         db.get_db().commit()
         cursor.close()
         
@@ -147,21 +333,17 @@ def acknowledge_alert(alert_id):
 # Delete a specific alert (when acknowledged)
 # Available to Doctor-1.7, Nurse-2.8
 @alerts.route("/<int:alert_id>", methods=["DELETE"])
+@bumps("alert")
 def delete_alert(alert_id):
     try:
         cursor = db.get_db().cursor()
         
-        # Check if alert exists
-        cursor.execute("SELECT * FROM AlertDetails WHERE AlertID = %s", (alert_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Alert not found"}), 404
-        
-        # Delete alert links first (due to foreign key constraints)
-        cursor.execute("DELETE FROM AlertsDoctors WHERE AlertID = %s", (alert_id,))
-        cursor.execute("DELETE FROM AlertsNurse WHERE AlertID = %s", (alert_id,))
-        
-        # Delete the alert itself
+        # AlertsDoctors / AlertsNurse links go with it (ON DELETE CASCADE),
+        # and the row count doubles as the existence check
         cursor.execute("DELETE FROM AlertDetails WHERE AlertID = %s", (alert_id,))
+        if not cursor.rowcount:
+            return jsonify({"error": "Alert not found"}), 404
+        record_event(cursor, "alert.deleted", {"AlertID": alert_id})
         
         db.get_db().commit()
         cursor.close()
@@ -171,3 +353,99 @@ def delete_alert(alert_id):
     except Error as e:
         current_app.logger.error(f'Database error in delete_alert: {str(e)}')
         return jsonify({"error": str(e)}), 500
+
+
+def existing_alert_ids(cursor, ids, lock):
+    """
+    Return the subset of `ids` in AlertDetails, locking those rows
+    ("FOR SHARE" or "FOR UPDATE") until the caller commits.
+    """
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"SELECT AlertID FROM AlertDetails WHERE AlertID IN ({placeholders}) {lock}", ids)
+    return {row["AlertID"] for row in cursor.fetchall()}
+
+
+def bulk_outcomes(ids, found, outcome):
+    """Build {"results": {id: outcome | "not_found"}, "missing": [...]}."""
+    return {
+        "results": {str(alert_id): outcome if alert_id in found else "not_found" for alert_id in ids},
+        "missing": [alert_id for alert_id in ids if alert_id not in found],
+    }
+
+
+# Acknowledge many alerts at once, e.g. after an alert storm
+# PUT /ack with {"ids": [1, 2, 3], "user_type": "nurse", "user_id": 3}
+# -> {"results": {"1": "acknowledged", "2": "acknowledged", "3": "not_found"},
+#     "acknowledged": 2, "missing": [3]}
+@alerts.route("/ack", methods=["PUT"])
+@bumps("alert")
+def acknowledge_alerts():
+    try:
+        ids = parse_batch_ids()
+        data = request.get_json()
+        user_type = data.get("user_type") if isinstance(data, dict) else None
+        user_id = data.get("user_id") if isinstance(data, dict) else None
+        if user_type not in ALERT_RECIPIENTS or not isinstance(user_id, int):
+            return jsonify({"error": "user_type must be 'doctor' or 'nurse' and needs an integer user_id"}), 400
+        table, column = ALERT_RECIPIENTS[user_type]
+        
+        cursor = db.get_db().cursor()
+        
+        # Shared locks keep the alerts from being deleted before the
+        # link rows are written
+        found = existing_alert_ids(cursor, ids, "FOR SHARE")
+        acknowledged = [alert_id for alert_id in ids if alert_id in found]
+        
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if acknowledged:
+            # pymysql rewrites this into one multi-row INSERT
+            cursor.executemany(
+                f"INSERT INTO {table} (AlertID, {column}, AcknowledgedTime) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE AcknowledgedTime = VALUES(AcknowledgedTime)",
+                [(alert_id, user_id, current_time) for alert_id in acknowledged],
+            )
+            record_event_batch(
+                cursor, "alert.acknowledged",
+                [{"AlertID": alert_id, "AcknowledgedTime": current_time} for alert_id in acknowledged],
+                user_type=user_type, user_id=user_id,
+            )
+        db.get_db().commit()
+        cursor.close()
+        
+        current_app.logger.info(f'{user_type} {user_id} acknowledged {len(acknowledged)} of {len(ids)} alerts')
+        return jsonify(dict(bulk_outcomes(ids, found, "acknowledged"), acknowledged=len(acknowledged))), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in acknowledge_alerts: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Delete many alerts at once
+# DELETE / with {"ids": [1, 2, 3]}
+# -> {"results": {"1": "deleted", "2": "deleted", "3": "not_found"},
+#     "deleted": 2, "missing": [3]}
+@alerts.route("/", methods=["DELETE"])
+@bumps("alert")
+def delete_alerts():
+    try:
+        ids = parse_batch_ids()
+        cursor = db.get_db().cursor()
+        
+        found = existing_alert_ids(cursor, ids, "FOR UPDATE")
+        deleted = [alert_id for alert_id in ids if alert_id in found]
+        if deleted:
+            # link rows cascade
+            placeholders = ", ".join(["%s"] * len(deleted))
+            cursor.execute(f"DELETE FROM AlertDetails WHERE AlertID IN ({placeholders})", deleted)
+            record_event_batch(cursor, "alert.deleted", [{"AlertID": alert_id} for alert_id in deleted])
+        db.get_db().commit()
+        cursor.close()
+        
+        current_app.logger.info(f'Deleted {len(deleted)} of {len(ids)} alerts')
+        return jsonify(dict(bulk_outcomes(ids, found, "deleted"), deleted=len(deleted))), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in delete_alerts: {str(e)}')
+        return jsonify({"error": str(e)}), 500
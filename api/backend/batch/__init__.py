@@ -0,0 +1,74 @@
+#------------------------------------------------------------
+# Shared multi-ID fetch used by the /<resource>/batch routes
+#------------------------------------------------------------
+from flask import jsonify, request
+
+
+# Most IDs a single batch request may ask for
+MAX_BATCH_SIZE = 500
+
+
+class BatchError(ValueError):
+    """Raised when the requested ID list is missing or malformed."""
+    pass
+
+
+def parse_batch_ids():
+    """
+    Read the requested IDs from ?ids=1,2,3 (GET) or a JSON body (POST,
+    PUT, DELETE) of either {"ids": [1, 2, 3]} or a bare [1, 2, 3].
+
+    Returns:
+        list of unique integer IDs in request order
+    """
+    if request.method in ("POST", "PUT", "DELETE"):
+        data = request.get_json(silent=True)
+        raw = data.get("ids") if isinstance(data, dict) else data
+        if not isinstance(raw, list):
+            raise BatchError("Request body must be a list of IDs or {\"ids\": [...]}")
+    else:
+        raw = [part for part in request.args.get("ids", "").split(",") if part.strip()]
+
+    ids = []
+    seen = set()
+    for value in raw:
+        try:
+            id_value = int(value)
+        except (TypeError, ValueError):
+            raise BatchError(f"Invalid ID: {value}")
+        if id_value not in seen:
+            seen.add(id_value)
+            ids.append(id_value)
+
+    if not ids:
+        raise BatchError("At least one ID is required")
+    if len(ids) > MAX_BATCH_SIZE:
+        raise BatchError(f"At most {MAX_BATCH_SIZE} IDs may be requested at once")
+    return ids
+
+
+def fetch_by_ids(cursor, select, id_column, ids):
+    """
+    Fetch every row whose `id_column` is in `ids` with one IN (...) query.
+
+    Args:
+        cursor: open DictCursor
+        select: SELECT ... FROM ... without a WHERE clause
+        id_column: column holding the ID, e.g. "PatientID"
+        ids: list of integer IDs
+
+    Returns:
+        dict of ID -> row for the IDs that exist
+    """
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"{select} WHERE {id_column} IN ({placeholders})", ids)
+    field = id_column.split(".")[-1]
+    return {row[field]: row for row in cursor.fetchall()}
+
+
+def batch_response(rows_by_id, ids):
+    """Build {"results": {id: row}, "missing": [ids not found]}."""
+    return jsonify({
+        "results": {str(id_value): rows_by_id[id_value] for id_value in ids if id_value in rows_by_id},
+        "missing": [id_value for id_value in ids if id_value not in rows_by_id],
+    })
@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import bumps, conditional
+from backend.batch import parse_batch_ids, fetch_by_ids, batch_response, BatchError
+from backend.pagination import keyset_page, page_response, PaginationError
 from mysql.connector import Error
 from flask import current_app
 
@@ -9,25 +12,45 @@ conditions = Blueprint("conditions", __name__)
 
 # Get all conditions
 @conditions.route("/", methods=["GET"])
+@conditional("condition", cache=True)
 def get_all_conditions():
     try:
         current_app.logger.info('Starting get_all_conditions request')
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM `Condition`")
-        conditions_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM `Condition`", ["ConditionID"])
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(conditions_data)} conditions')
-        return jsonify(conditions_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} conditions')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_conditions: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
+# Count conditions for dashboard badges -> {"count": 30}
+@conditions.route("/count", methods=["GET"])
+@conditional("condition", cache=True)
+def count_conditions():
+    try:
+        cursor = db.get_db().cursor()
+        
+        cursor.execute("SELECT COUNT(*) AS Total FROM `Condition`")
+        count = cursor.fetchone()["Total"]
+        cursor.close()
+        
+        return jsonify({"count": count}), 200
+    except Error as e:
+        current_app.logger.error(f'Database error in count_conditions: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Create a new condition
 # Available to Doctor-1.1
 @conditions.route("/", methods=["POST"])
+@bumps("condition")
 def create_condition():
     try:
         data = request.get_json()
@@ -61,9 +84,31 @@ def create_condition():
         return jsonify({"error": str(e)}), 500
 
 
+# Get several conditions by ID in one query
+# GET /batch?ids=1,2,3 or POST /batch with {"ids": [1, 2, 3]}
+@conditions.route("/batch", methods=["GET", "POST"])
+@conditional("condition")
+def get_conditions_batch():
+    try:
+        ids = parse_batch_ids()
+        cursor = db.get_db().cursor()
+        
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM `Condition`", "ConditionID", ids)
+        cursor.close()
+        
+        current_app.logger.info(f'Batch fetched {len(rows_by_id)} of {len(ids)} conditions')
+        return batch_response(rows_by_id, ids), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_conditions_batch: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Get details for a specific condition
 # Available to Doctor-1.1 and Proxy-4.3
 @conditions.route("/<int:condition_id>", methods=["GET"])
+@conditional("condition")
 def get_condition(condition_id):
     try:
         cursor = db.get_db().cursor()
@@ -83,6 +128,7 @@ def get_condition(condition_id):
 # Update condition information
 # Available to Nurse-2.2
 @conditions.route("/<int:condition_id>", methods=["PUT"])
+@bumps("condition")
 def update_condition(condition_id):
     try:
         data = request.get_json()
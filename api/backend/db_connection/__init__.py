@@ -1,10 +1,12 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
 #------------------------------------------------------------
-from flaskext.mysql import MySQL
 from pymysql import cursors
 
+from backend.db_connection.pool import PooledMySQL, PoolTimeout
+
 
 # the parameter instructs the connection to return data 
-# as a dictionary object. 
-db = MySQL(cursorclass=cursors.DictCursor)
\ No newline at end of file
+# as a dictionary object. Connections are checked out of a
+# per-process pool (see pool.py) rather than opened per request.
+db = PooledMySQL(cursorclass=cursors.DictCursor)
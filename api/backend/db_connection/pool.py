@@ -0,0 +1,256 @@
+#------------------------------------------------------------
+# A small thread-safe connection pool that sits behind the
+# shared `db` object so every blueprint reuses MySQL sessions
+# instead of paying a TCP + auth handshake per request.
+#------------------------------------------------------------
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from flask import g
+from flaskext.mysql import MySQL
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out before the timeout."""
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of pymysql connections.
+
+    Connections are handed out LIFO so the hottest ones stay warm and the
+    ones at the bottom of the stack age out through idle eviction.
+
+    Args:
+        factory: zero-argument callable returning a new DB-API connection
+        max_size: maximum number of open connections (idle + in use)
+        timeout: seconds to wait for a free connection before PoolTimeout
+        idle_timeout: idle connections older than this are closed
+        ping_after: connections idle longer than this are pinged on checkout
+    """
+
+    def __init__(self, factory, max_size=10, timeout=5.0, idle_timeout=300.0, ping_after=30.0):
+        self._factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, last_used) pairs, newest on the right
+        self._size = 0
+        self._in_use = 0
+
+        # counters reported by metrics()
+        self._checkouts = 0
+        self._created = 0
+        self._closed = 0
+        self._failed_pings = 0
+        self._timeouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self):
+        """Check out a healthy connection, opening one if the pool has room."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        stale = []
+        conn = None
+        last_used = None
+
+        with self._cond:
+            waited = False
+            while True:
+                stale.extend(self._evict_idle_locked(time.monotonic()))
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self._checkouts += 1
+            wait = time.monotonic() - start
+            if waited:
+                self._waits += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+        self._close_all(stale)
+
+        # health check connections that sat idle long enough to have been
+        # dropped by the server (wait_timeout) or a proxy in between
+        if conn is not None and time.monotonic() - last_used > self.ping_after:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._failed_pings += 1
+                self._close_all([conn])
+                conn = None
+
+        if conn is None:
+            try:
+                conn = self._factory()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._created += 1
+
+        return conn
+
+    def release(self, conn):
+        """Return a connection, discarding it if it is broken."""
+        healthy = True
+        try:
+            # end any transaction the request left open so the next
+            # checkout does not read from a stale snapshot
+            if conn.open:
+                conn.rollback()
+            else:
+                healthy = False
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._size -= 1
+            stale = self._evict_idle_locked(time.monotonic())
+            self._cond.notify()
+
+        if not healthy:
+            self._close_all([conn])
+        self._close_all(stale)
+
+    def close(self):
+        """Close every idle connection (in-use ones are closed on release)."""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        self._close_all(idle)
+
+    def metrics(self):
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "created": self._created,
+                "closed": self._closed,
+                "failed_pings": self._failed_pings,
+                "timeouts": self._timeouts,
+                "waits": self._waits,
+                "wait_time_total_ms": round(self._wait_total * 1000, 3),
+                "wait_time_avg_ms": round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "wait_time_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+    def _evict_idle_locked(self, now):
+        # oldest idle connections are on the left of the deque
+        stale = []
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            stale.append(self._idle.popleft()[0])
+            self._size -= 1
+        return stale
+
+    def _close_all(self, conns):
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._cond:
+                self._closed += 1
+
+
+class PooledMySQL(MySQL):
+    """
+    Drop-in replacement for flaskext.mysql.MySQL.
+
+    get_db() still returns one connection per request context, but it is
+    checked out of a per-process ConnectionPool and handed back on teardown
+    instead of being closed.
+    """
+
+    def __init__(self, app=None, prefix="mysql", **connect_args):
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        super().__init__(app, prefix, **connect_args)
+
+    def init_app(self, app):
+        app.config.setdefault("MYSQL_POOL_SIZE", 10)
+        app.config.setdefault("MYSQL_POOL_TIMEOUT", 5.0)
+        app.config.setdefault("MYSQL_POOL_IDLE_TIMEOUT", 300.0)
+        app.config.setdefault("MYSQL_POOL_PING_AFTER", 30.0)
+        super().init_app(app)
+
+    @property
+    def pool(self):
+        # pools are per process: a forked worker must never share sockets
+        # with its parent, so build a fresh pool the first time each PID asks
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != pid:
+                    config = self.app.config
+                    self._pool = ConnectionPool(
+                        self.connect,
+                        max_size=int(config["MYSQL_POOL_SIZE"]),
+                        timeout=float(config["MYSQL_POOL_TIMEOUT"]),
+                        idle_timeout=float(config["MYSQL_POOL_IDLE_TIMEOUT"]),
+                        ping_after=float(config["MYSQL_POOL_PING_AFTER"]),
+                    )
+                    self._pool_pid = pid
+        return self._pool
+
+    def get_db(self):
+        conns = g.setdefault("mysql_dbs", {})
+        if self.prefix not in conns:
+            conns[self.prefix] = self.pool.acquire()
+        return conns[self.prefix]
+
+    @contextmanager
+    def connection(self):
+        """
+        Check a pooled connection out for work outside a request, such as a
+        background thread, and hand it back afterwards.
+        """
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+
+    def teardown_request(self, exception):
+        conns = g.get("mysql_dbs")
+        if conns and self.prefix in conns:
+            self.pool.release(conns.pop(self.prefix))
+
+    def metrics(self):
+        return self.pool.metrics()
@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import bumps, conditional
+from backend.pagination import keyset_page, page_response, PaginationError
 from mysql.connector import Error
 from flask import current_app
 
@@ -9,17 +11,19 @@ discharges = Blueprint("discharges", __name__)
 
 # Get all discharge records
 @discharges.route("/", methods=["GET"])
+@conditional("discharge")
 def get_all_discharges():
     try:
         current_app.logger.info('Starting get_all_discharges request')
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM Discharge")
-        discharges_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM Discharge", ["DischargeID"])
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(discharges_data)} discharges')
-        return jsonify(discharges_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} discharges')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_discharges: {str(e)}')
         return jsonify({"error": str(e)}), 500
@@ -28,6 +32,7 @@ def get_all_discharges():
 # Create discharge with DischargeDate and Instructions
 # Available to Doctor-1.4
 @discharges.route("/", methods=["POST"])
+@bumps("discharge")
 def create_discharge():
     try:
         data = request.get_json()
@@ -64,6 +69,7 @@ def create_discharge():
 # Get discharge details
 # Available to Patient-3.2 and Proxy-4.5
 @discharges.route("/<int:discharge_id>", methods=["GET"])
+@conditional("discharge")
 def get_discharge(discharge_id):
     try:
         cursor = db.get_db().cursor()
@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import conditional
+from backend.batch import parse_batch_ids, fetch_by_ids, batch_response, BatchError
+from backend.pagination import keyset_page, page_response, PaginationError
 from mysql.connector import Error
 from flask import current_app
 
@@ -10,24 +13,48 @@ doctors = Blueprint("doctors", __name__)
 # Get all doctors
 # Available to Patient-3.4
 @doctors.route("/", methods=["GET"])
+@conditional("doctor", cache=True)
 def get_all_doctors():
     try:
         current_app.logger.info('Starting get_all_doctors request')
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM Doctor")
-        doctors_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM Doctor", ["DoctorID"])
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(doctors_data)} doctors')
-        return jsonify(doctors_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} doctors')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_doctors: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
+# Get several doctors by ID in one query
+# GET /batch?ids=1,2,3 or POST /batch with {"ids": [1, 2, 3]}
+@doctors.route("/batch", methods=["GET", "POST"])
+@conditional("doctor")
+def get_doctors_batch():
+    try:
+        ids = parse_batch_ids()
+        cursor = db.get_db().cursor()
+        
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM Doctor", "DoctorID", ids)
+        cursor.close()
+        
+        current_app.logger.info(f'Batch fetched {len(rows_by_id)} of {len(ids)} doctors')
+        return batch_response(rows_by_id, ids), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_doctors_batch: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Get a specific doctor
 @doctors.route("/<int:doctor_id>", methods=["GET"])
+@conditional("doctor")
 def get_doctor(doctor_id):
     try:
         cursor = db.get_db().cursor()
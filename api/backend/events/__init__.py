@@ -0,0 +1,297 @@
+#------------------------------------------------------------
+# Push channel for dashboards: write paths append to EventLog
+# in their own transaction, and one poller per API process
+# tails that table and fans new events out to SSE subscribers
+#------------------------------------------------------------
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+from flask import after_this_request, current_app, has_request_context
+from pymysql import cursors
+
+from backend.db_connection import db
+
+
+# Event types are "<topic>.<action>"; subscribers filter on the topic
+EVENT_TOPICS = ["alert", "message"]
+
+# Seconds between EventLog polls when no local write wakes the poller
+POLL_INTERVAL = 0.5
+
+# Most rows read per poll
+POLL_BATCH_SIZE = 1000
+
+# Recent events kept in memory for fan-out and Last-Event-ID replay
+EVENT_BUFFER_SIZE = 10000
+
+# Most events replayed from EventLog for a reconnecting client; further
+# behind than this it gets a "reset" event and should reload over REST
+REPLAY_LIMIT = 1000
+
+# EventLog rows older than this are pruned
+EVENT_RETENTION_SECONDS = 24 * 3600
+
+# A skipped EventID usually belongs to a transaction that has not
+# committed yet (a broadcast can hold thousands). Events after it are
+# held back for up to this long, however large the gap, before the
+# missing IDs are treated as a rollback or auto-increment reservation.
+GAP_TIMEOUT = 5.0
+
+
+Event = namedtuple("Event", ["id", "type", "user_type", "user_id", "data"])
+
+
+class EventStreamError(ValueError):
+    """Raised for malformed stream subscription parameters."""
+    pass
+
+
+def _wake_poller(response):
+    event_hub.wake()
+    return response
+
+
+def record_event(cursor, event_type, payload, user_type=None, user_id=None):
+    """
+    Append an event to EventLog inside the caller's transaction.
+
+    Because the event commits (or rolls back) with the write it describes,
+    subscribers only ever hear about committed changes. Without user_type
+    and user_id the event goes to every subscriber of its topic.
+    """
+    cursor.execute(
+        "INSERT INTO EventLog (EventType, UserType, UserID, Payload) VALUES (%s, %s, %s, %s)",
+        (event_type, user_type, user_id, current_app.json.dumps(payload)),
+    )
+    # other processes pick the event up on their next poll; this one
+    # checks as soon as the response (and so the commit) is done
+    if has_request_context():
+        after_this_request(_wake_poller)
+
+
+def record_events(cursor, event_type, payload, recipients):
+    """
+    Append one event per (user_type, user_id) recipient in a single
+    multi-row INSERT, e.g. for a message sent to many users at once.
+    """
+    if not recipients:
+        return
+    data = current_app.json.dumps(payload)
+    cursor.executemany(
+        "INSERT INTO EventLog (EventType, UserType, UserID, Payload) VALUES (%s, %s, %s, %s)",
+        [(event_type, user_type, user_id, data) for user_type, user_id in recipients],
+    )
+    if has_request_context():
+        after_this_request(_wake_poller)
+
+
+def record_event_batch(cursor, event_type, payloads, user_type=None, user_id=None):
+    """
+    Append one event per payload for the same audience in a single
+    multi-row INSERT, e.g. for alerts acknowledged or deleted in bulk.
+    """
+    if not payloads:
+        return
+    cursor.executemany(
+        "INSERT INTO EventLog (EventType, UserType, UserID, Payload) VALUES (%s, %s, %s, %s)",
+        [(event_type, user_type, user_id, current_app.json.dumps(payload)) for payload in payloads],
+    )
+    if has_request_context():
+        after_this_request(_wake_poller)
+
+
+class EventHub:
+    """
+    Fans EventLog rows out to every subscriber in this process.
+
+    A single background poller reads new rows by primary key range and
+    appends them to a bounded in-memory buffer, so database load does not
+    grow with the number of open streams. Subscribers block on a shared
+    condition rather than polling; under the gevent server (API_SERVER=
+    gevent) each one is a greenlet, not a thread.
+    """
+
+    def __init__(self, poll_interval=POLL_INTERVAL, buffer_size=EVENT_BUFFER_SIZE):
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._buffer = deque(maxlen=buffer_size)  # (seq, Event), oldest on the left
+        self._seq = 0
+        self._last_id = 0  # low watermark: every ID up to it is delivered or given up on
+        self._covered_after = 0  # the buffer holds every event with a higher ID
+        self._gap = None  # (first missing ID, monotonic time it was first seen)
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._logger = None
+        self._subscribers = 0
+        self._polls = 0
+        self._errors = 0
+        self._pruned_at = 0.0
+
+    def start(self):
+        """Start this process's poller on first use (one per PID, like the pool)."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            self._logger = current_app.logger
+            with db.connection() as conn:
+                cursor = conn.cursor(cursors.Cursor)
+                cursor.execute("SELECT COALESCE(MAX(EventID), 0) FROM EventLog")
+                self._last_id = self._covered_after = cursor.fetchone()[0]
+                cursor.close()
+            threading.Thread(target=self._run, name="event-poller", daemon=True).start()
+            self._pid = pid
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                # a full batch delivered means more rows are waiting; a
+                # batch held back at a gap returns less, so this cannot
+                # spin while the gap stays open
+                if self._poll() >= POLL_BATCH_SIZE:
+                    self._wake.set()
+            except Exception as e:
+                self._errors += 1
+                self._logger.error(f'Event poller failed: {str(e)}')
+                time.sleep(self.poll_interval)
+
+    def _poll(self):
+        """
+        Read EventLog rows past the low watermark and buffer them in ID
+        order, stopping at a missing ID until it commits or times out.
+
+        Returns:
+            number of events delivered
+        """
+        with db.connection() as conn:
+            cursor = conn.cursor(cursors.Cursor)
+            cursor.execute(
+                "SELECT EventID, EventType, UserType, UserID, Payload FROM EventLog "
+                "WHERE EventID > %s ORDER BY EventID LIMIT %s",
+                (self._last_id, POLL_BATCH_SIZE),
+            )
+            rows = cursor.fetchall()
+            now = time.monotonic()
+            if now - self._pruned_at > 600:
+                cursor.execute(
+                    "DELETE FROM EventLog WHERE CreatedAt < NOW() - INTERVAL %s SECOND LIMIT 10000",
+                    (EVENT_RETENTION_SECONDS,),
+                )
+                conn.commit()
+                self._pruned_at = now
+            cursor.close()
+        self._polls += 1
+
+        # Delivering in ID order keeps each client's Last-Event-ID moving
+        # forward, so a reconnect replays exactly what it missed
+        fresh = []
+        for row in rows:
+            event = Event(*row)
+            missing = self._last_id + 1
+            if event.id > missing:
+                if self._gap is None or self._gap[0] != missing:
+                    self._gap = (missing, now)
+                if now - self._gap[1] < GAP_TIMEOUT:
+                    break
+                self._logger.warning(f'Event poller skipped EventIDs {missing}-{event.id - 1} after {GAP_TIMEOUT}s')
+            self._gap = None
+            self._last_id = event.id
+            fresh.append(event)
+
+        if fresh:
+            with self._cond:
+                for event in fresh:
+                    if len(self._buffer) == self._buffer.maxlen:
+                        self._covered_after = max(self._covered_after, self._buffer[0][1].id)
+                    self._seq += 1
+                    self._buffer.append((self._seq, event))
+                self._cond.notify_all()
+        return len(fresh)
+
+    def position(self):
+        with self._cond:
+            return self._seq
+
+    def wait(self, seq, timeout):
+        """
+        Block until events newer than position `seq` arrive (or timeout).
+
+        Returns:
+            (new position, events) where events is None if `seq` has
+            already been evicted from the buffer (a subscriber that fell
+            too far behind)
+        """
+        with self._cond:
+            if self._seq == seq:
+                self._cond.wait(timeout)
+            if self._seq - seq > len(self._buffer):
+                return self._seq, None
+            # newest events are on the right; walk back only as far as needed
+            events = []
+            for event_seq, event in reversed(self._buffer):
+                if event_seq <= seq:
+                    break
+                events.append(event)
+            events.reverse()
+            return self._seq, events
+
+    def replay(self, last_event_id):
+        """
+        Events after `last_event_id` for a reconnecting client.
+
+        Returns:
+            (position to continue from, events), events None when the
+            client is too far behind to catch up
+        """
+        with self._cond:
+            seq = self._seq
+            if last_event_id >= self._covered_after:
+                return seq, [event for _, event in self._buffer if event.id > last_event_id]
+            delivered = self._buffer[-1][1].id if self._buffer else self._covered_after
+        # older than the buffer: read the gap back from EventLog, up to what
+        # the buffer has delivered so nothing is sent twice
+        with db.connection() as conn:
+            cursor = conn.cursor(cursors.Cursor)
+            cursor.execute(
+                "SELECT EventID, EventType, UserType, UserID, Payload FROM EventLog "
+                "WHERE EventID > %s AND EventID <= %s ORDER BY EventID LIMIT %s",
+                (last_event_id, delivered, REPLAY_LIMIT + 1),
+            )
+            rows = cursor.fetchall()
+            cursor.execute("SELECT MIN(EventID) FROM EventLog")
+            oldest = cursor.fetchone()[0]
+            cursor.close()
+        # pruned past the client's position, or too much to replay
+        if len(rows) > REPLAY_LIMIT or (oldest is not None and oldest > last_event_id + 1):
+            return seq, None
+        return seq, [Event(*row) for row in rows]
+
+    def subscribed(self, delta):
+        with self._cond:
+            self._subscribers += delta
+
+    def metrics(self):
+        gap = self._gap
+        with self._cond:
+            return {
+                "subscribers": self._subscribers,
+                "buffered_events": len(self._buffer),
+                "last_event_id": self._last_id,
+                "open_gap_since": gap[0] if gap else None,
+                "polls": self._polls,
+                "poll_errors": self._errors,
+            }
+
+
+# One hub (and poller) per API process
+event_hub = EventHub()
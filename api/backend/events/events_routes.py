@@ -0,0 +1,117 @@
+from flask import Blueprint, Response, jsonify, request
+from backend.events import EVENT_TOPICS, EventStreamError, event_hub
+from mysql.connector import Error
+from flask import current_app
+
+# Create a Blueprint for push (Server-Sent Events) routes
+events = Blueprint("events", __name__)
+
+
+# Seconds between keep-alive comments on an idle stream; also how quickly
+# a closed connection is noticed
+HEARTBEAT_INTERVAL = 15
+
+# Subscribers by user_type; alerts go to staff, messages to any recipient
+STREAM_USER_TYPES = ["doctor", "nurse", "patient"]
+
+
+def parse_subscription(args, headers):
+    """
+    Read ?user_type=, ?user_id=, ?topics= and the resume position.
+
+    The position comes from the Last-Event-ID header that EventSource
+    sends on reconnect, or ?last_event_id= for clients that cannot set it.
+
+    Returns:
+        (user_type, user_id, topics, last_event_id or None)
+    """
+    user_type = args.get("user_type")
+    user_id = args.get("user_id", type=int)
+    if user_type not in STREAM_USER_TYPES or user_id is None:
+        raise EventStreamError(f"user_type must be one of {', '.join(STREAM_USER_TYPES)} and needs an integer user_id")
+
+    topics = [topic.strip() for topic in args.get("topics", ",".join(EVENT_TOPICS)).split(",") if topic.strip()]
+    for topic in topics:
+        if topic not in EVENT_TOPICS:
+            raise EventStreamError(f"topics must be drawn from {', '.join(EVENT_TOPICS)}")
+    # patients are never sent alerts
+    if user_type == "patient":
+        topics = [topic for topic in topics if topic != "alert"]
+
+    last_event_id = headers.get("Last-Event-ID") or args.get("last_event_id")
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            raise EventStreamError("Last-Event-ID must be an integer")
+    return user_type, user_id, topics, last_event_id
+
+
+def format_event(event):
+    # Payload is stored as JSON text, so it goes out without re-encoding
+    return f"id: {event.id}\nevent: {event.type}\ndata: {event.data}\n\n"
+
+
+# Push new alerts, acknowledgements, deletions and messages as they commit
+# GET /events?user_type=nurse&user_id=3[&topics=alert,message]
+# Server-Sent Events; reconnects resume after the Last-Event-ID header.
+# A "reset" event means events were missed: reload state over REST.
+@events.route("/events", methods=["GET"])
+def stream_events():
+    try:
+        user_type, user_id, topics, last_event_id = parse_subscription(request.args, request.headers)
+        event_hub.start()
+        
+        replayed = []
+        if last_event_id is not None:
+            seq, replayed = event_hub.replay(last_event_id)
+        else:
+            seq = event_hub.position()
+    except EventStreamError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in stream_events: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+    
+    def wanted(event):
+        return event.type.split(".")[0] in topics and (
+            event.user_type is None or (event.user_type == user_type and event.user_id == user_id)
+        )
+    
+    def generate(seq, replayed):
+        event_hub.subscribed(1)
+        try:
+            # reconnect delay for EventSource, in milliseconds
+            yield "retry: 3000\n\n"
+            if replayed is None:
+                yield "event: reset\ndata: {}\n\n"
+                replayed = []
+            sent = set()
+            for event in replayed:
+                sent.add(event.id)
+                if wanted(event):
+                    yield format_event(event)
+            while True:
+                seq, fresh = event_hub.wait(seq, HEARTBEAT_INTERVAL)
+                if fresh is None:
+                    yield "event: reset\ndata: {}\n\n"
+                    continue
+                if not fresh:
+                    yield ": keep-alive\n\n"
+                    continue
+                # replay and the live buffer can overlap by a few events
+                chunk = "".join(format_event(e) for e in fresh if wanted(e) and e.id not in sent)
+                if chunk:
+                    yield chunk
+        finally:
+            event_hub.subscribed(-1)
+    
+    current_app.logger.info(f'Event stream opened for {user_type} {user_id} ({", ".join(topics)})')
+    # Not wrapped in stream_with_context: the request (and any pooled
+    # connection it holds) is torn down now, while the stream lives on
+    return Response(
+        generate(seq, replayed),
+        mimetype="text/event-stream",
+        # keep proxies from caching or buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import conditional
+from backend.batch import parse_batch_ids, fetch_by_ids, batch_response, BatchError
+from backend.pagination import keyset_page, page_response, PaginationError
 from mysql.connector import Error
 from flask import current_app
 
@@ -9,24 +12,48 @@ insurance = Blueprint("insurance", __name__)
 
 # Get all insurance providers
 @insurance.route("/", methods=["GET"])
+@conditional("insurance", cache=True)
 def get_all_insurance():
     try:
         current_app.logger.info('Starting get_all_insurance request')
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM Insurance")
-        insurance_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM Insurance", ["InsuranceID"])
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(insurance_data)} insurance providers')
-        return jsonify(insurance_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} insurance providers')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_insurance: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
+# Get several insurance records by ID in one query
+# GET /batch?ids=1,2,3 or POST /batch with {"ids": [1, 2, 3]}
+@insurance.route("/batch", methods=["GET", "POST"])
+@conditional("insurance")
+def get_insurance_batch():
+    try:
+        ids = parse_batch_ids()
+        cursor = db.get_db().cursor()
+        
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM Insurance", "InsuranceID", ids)
+        cursor.close()
+        
+        current_app.logger.info(f'Batch fetched {len(rows_by_id)} of {len(ids)} insurance records')
+        return batch_response(rows_by_id, ids), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_insurance_batch: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Get insurance with InsuranceProvider, PolicyNumber, and Deductible
 @insurance.route("/<int:insurance_id>", methods=["GET"])
+@conditional("insurance")
 def get_insurance(insurance_id):
     try:
         cursor = db.get_db().cursor()
@@ -1,33 +1,57 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import bumps, conditional
+from backend.batch import parse_batch_ids, fetch_by_ids, batch_response, BatchError
+from backend.pagination import keyset_page, page_response, PaginationError
+from backend.search import TablePrefixIndex
+from backend.timeseries import parse_timestamp
 from mysql.connector import Error
 from flask import current_app
+from datetime import datetime
 
 # Create a Blueprint for Medication routes
 medications = Blueprint("medications", __name__)
 
+# Medication is the drug catalog (one row per name and strength); refills,
+# pickup location and frequency are per prescription on Patient_Medications
+CATALOG_FIELDS = ["PrescriptionName", "DosageAmount", "DosageUnit"]
+PRESCRIPTION_FIELDS = ["PickUpLocation", "RefillsLeft", "FrequencyAmount", "FrequencyPeriod"]
+
+# In-memory autocomplete over the catalog, one per API worker
+medication_catalog_index = TablePrefixIndex(
+    "Medication", "MedicationID", CATALOG_FIELDS, refresh_interval=5, rebuild_interval=600
+)
+
+# Most suggestions returned by /search
+MAX_AUTOCOMPLETE_RESULTS = 50
+
 
 # Get all medications
 @medications.route("/", methods=["GET"])
+@conditional("medication", cache=True)
 def get_all_medications():
     try:
         current_app.logger.info('Starting get_all_medications request')
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM Medication")
-        medications_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM Medication", ["MedicationID"])
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(medications_data)} medications')
-        return jsonify(medications_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} medications')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_medications: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
-# Create a new medication
+# Add a drug to the catalog, or find the entry it duplicates
+# Name and unit are matched ignoring case and extra spaces; returns 201
+# with the new medication_id, or 200 with the existing one
 # Available to Doctor-1.3
 @medications.route("/", methods=["POST"])
+@bumps("medication")
 def create_medication():
     try:
         data = request.get_json()
@@ -38,37 +62,91 @@ def create_medication():
         for field in required_fields:
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
+        misplaced = [field for field in PRESCRIPTION_FIELDS if field in data]
+        if misplaced:
+            return jsonify({
+                "error": f"{', '.join(misplaced)} belong to the prescription; send them to POST /medication/patient_medications"
+            }), 400
         
-        # Insert new medication
+        name = " ".join(str(data["PrescriptionName"]).split())
+        unit = " ".join(str(data.get("DosageUnit") or "").split()) or None
+        if not name:
+            return jsonify({"error": "PrescriptionName must not be blank"}), 400
+        
+        # The unique CatalogKey turns a duplicate into a no-op that still
+        # reports the existing row's ID through LAST_INSERT_ID()
         query = """
-        INSERT INTO Medication (PrescriptionName, DosageAmount, DosageUnit, PickUpLocation, 
-                              RefillsLeft, FrequencyAmount, FrequencyPeriod)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO Medication (PrescriptionName, DosageAmount, DosageUnit)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE MedicationID = LAST_INSERT_ID(MedicationID)
         """
-        cursor.execute(
-            query,
-            (
-                data["PrescriptionName"],
-                data.get("DosageAmount"),
-                data.get("DosageUnit"),
-                data.get("PickUpLocation"),
-                data.get("RefillsLeft"),
-                data.get("FrequencyAmount"),
-                data.get("FrequencyPeriod")
-            ),
-        )
+        cursor.execute(query, (name, data.get("DosageAmount"), unit))
+        created = cursor.rowcount == 1
+        medication_id = cursor.lastrowid
         
+        cursor.execute("SELECT * FROM Medication WHERE MedicationID = %s", (medication_id,))
+        medication = cursor.fetchone()
         db.get_db().commit()
-        new_medication_id = cursor.lastrowid
         cursor.close()
+        medication_catalog_index.upsert(medication)
         
-        return jsonify({"message": "Medication created successfully", "medication_id": new_medication_id}), 201
+        if created:
+            return jsonify({"message": "Medication created successfully", "medication_id": medication_id}), 201
+        return jsonify({"message": "Medication already in catalog", "medication_id": medication_id}), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
 
+# Autocomplete over the catalog, served from memory
+# e.g. /medication/search?prefix=lisin&limit=10 matches on the start of
+# any word of "PrescriptionName DosageAmount DosageUnit", compared like the
+# catalog's unique key (case and extra spaces ignored); "lisinopril 10 mg"
+# narrows to one strength
+@medications.route("/search", methods=["GET"])
+@conditional("medication")
+def search_medications():
+    try:
+        prefix = request.args.get("prefix", "").strip()
+        if not prefix:
+            return jsonify({"error": "prefix parameter is required"}), 400
+        try:
+            limit = min(int(request.args.get("limit", 10)), MAX_AUTOCOMPLETE_RESULTS)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        if limit < 1:
+            return jsonify({"error": "limit must be at least 1"}), 400
+        
+        matches = medication_catalog_index.search(db.get_db(), prefix, limit)
+        return jsonify([row for _, row in matches]), 200
+    except Error as e:
+        current_app.logger.error(f'Database error in search_medications: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Get several medications by ID in one query
+# GET /batch?ids=1,2,3 or POST /batch with {"ids": [1, 2, 3]}
+@medications.route("/batch", methods=["GET", "POST"])
+@conditional("medication")
+def get_medications_batch():
+    try:
+        ids = parse_batch_ids()
+        cursor = db.get_db().cursor()
+        
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM Medication", "MedicationID", ids)
+        cursor.close()
+        
+        current_app.logger.info(f'Batch fetched {len(rows_by_id)} of {len(ids)} medications')
+        return batch_response(rows_by_id, ids), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_medications_batch: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Get details for a specific medication
 @medications.route("/<int:medication_id>", methods=["GET"])
+@conditional("medication")
 def get_medication(medication_id):
     try:
         cursor = db.get_db().cursor()
@@ -87,25 +165,32 @@ def get_medication(medication_id):
 
 # Get patient-medication relationships
 @medications.route("/patient_medications", methods=["GET"])
+@conditional("medication")
 def get_patient_medications():
     try:
         current_app.logger.info('Starting get_all_patient_medications request')
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM Patient_Medications")
-        patient_medications = cursor.fetchall()
+        page = keyset_page(
+            cursor, "SELECT * FROM Patient_Medications", ["PatientID", "MedicationID"]
+        )
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(patient_medications)} patient-medication links')
-        return jsonify(patient_medications), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} patient-medication links')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_patient_medications: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
-# Link a patient to a medication
+# Prescribe a medication to a patient, with the prescription's refills,
+# pickup location and frequency. Prescribing a drug the patient already
+# has renews that prescription (200) instead of failing.
 # Available to Doctor-1.3
 @medications.route("/patient_medications", methods=["POST"])
+@bumps("medication")
 def link_patient_medication():
     try:
         data = request.get_json()
@@ -118,39 +203,61 @@ def link_patient_medication():
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
         # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (data["PatientID"],))
+        cursor.execute("SELECT 1 FROM Patient WHERE PatientID = %s", (data["PatientID"],))
         if not cursor.fetchone():
             return jsonify({"error": "Patient not found"}), 404
         
         # Check if medication exists
-        cursor.execute("SELECT * FROM Medication WHERE MedicationID = %s", (data["MedicationID"],))
+        cursor.execute("SELECT 1 FROM Medication WHERE MedicationID = %s", (data["MedicationID"],))
         if not cursor.fetchone():
             return jsonify({"error": "Medication not found"}), 404
         
         # Insert patient-medication link
-        query = """
-        INSERT INTO Patient_Medications (PatientID, MedicationID, PrescribedDate, EndDate)
-        VALUES (%s, %s, %s, %s)
+        columns = ["PatientID", "MedicationID", "PrescribedDate", "EndDate"] + PRESCRIPTION_FIELDS
+        query = f"""
+        INSERT INTO Patient_Medications ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON DUPLICATE KEY UPDATE {', '.join(f'{c} = VALUES({c})' for c in columns[2:])}
         """
-        cursor.execute(
-            query,
-            (
-                data["PatientID"],
-                data["MedicationID"],
-                data.get("PrescribedDate"),
-                data.get("EndDate")
-            ),
-        )
+        cursor.execute(query, [data["PatientID"], data["MedicationID"]] + [data.get(c) for c in columns[2:]])
+        renewed = cursor.rowcount != 1
         
         db.get_db().commit()
         cursor.close()
         
+        if renewed:
+            return jsonify({"message": "Prescription renewed successfully"}), 200
         return jsonify({"message": "Patient linked to medication successfully"}), 201
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
+# Refills come off the prescription in one conditional UPDATE, so
+# concurrent administrations queue on the row lock instead of overwriting
+# each other's result. A missing or zero FrequencyAmount counts as 1.
+ADMINISTER_DOSE = """
+UPDATE Patient_Medications
+SET RefillsLeft = GREATEST(0, RefillsLeft - COALESCE(NULLIF(FrequencyAmount, 0), 1))
+WHERE PatientID = %s AND MedicationID = %s AND RefillsLeft > 0
+"""
+
+# Writes refills back for prescriptions already locked by this transaction;
+# pymysql sends it as one multi-row INSERT, and every row hits the update path
+SET_REFILLS = """
+INSERT INTO Patient_Medications (PatientID, MedicationID, RefillsLeft)
+VALUES (%s, %s, %s)
+ON DUPLICATE KEY UPDATE RefillsLeft = VALUES(RefillsLeft)
+"""
+
+LOG_ADMINISTRATION = """
+INSERT INTO MedicationAdministration (PatientID, MedicationID, NurseID, Amount, RefillsLeft, AdministeredAt)
+VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
 # Administer medication to patient (decrease refills by frequency amount)
+# Optional NurseID is recorded in the administration log
 @medications.route("/administer", methods=["POST"])
+@bumps("medication")
 def administer_medication():
     try:
         data = request.get_json()
@@ -162,40 +269,186 @@ def administer_medication():
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
-        # Check if patient-medication link exists
+        cursor.execute(ADMINISTER_DOSE, (data["PatientID"], data["MedicationID"]))
+        if not cursor.rowcount:
+            # Nothing matched: tell a missing link apart from an empty supply
+            cursor.execute(
+                "SELECT 1 FROM Patient_Medications WHERE PatientID = %s AND MedicationID = %s", 
+                (data["PatientID"], data["MedicationID"])
+            )
+            if not cursor.fetchone():
+                return jsonify({"error": "Patient-medication link not found"}), 404
+            return jsonify({"error": "No refills left for this medication"}), 400
+        
+        # This transaction holds the row lock, so this is the value it wrote
         cursor.execute(
-            "SELECT * FROM Patient_Medications WHERE PatientID = %s AND MedicationID = %s", 
+            "SELECT RefillsLeft, COALESCE(NULLIF(FrequencyAmount, 0), 1) AS Amount "
+            "FROM Patient_Medications WHERE PatientID = %s AND MedicationID = %s",
             (data["PatientID"], data["MedicationID"])
         )
-        if not cursor.fetchone():
-            return jsonify({"error": "Patient-medication link not found"}), 404
-        
-        # Get current medication details including frequency amount
-        cursor.execute("SELECT RefillsLeft, FrequencyAmount FROM Medication WHERE MedicationID = %s", (data["MedicationID"],))
         medication = cursor.fetchone()
-        if not medication:
-            return jsonify({"error": "Medication not found"}), 404
-        
-        current_refills = medication["RefillsLeft"] or 0
-        frequency_amount = medication["FrequencyAmount"] or 1
-        
-        if current_refills <= 0:
-            return jsonify({"error": "No refills left for this medication"}), 400
-        
-        # Decrease refills by frequency amount
-        new_refills = max(0, current_refills - frequency_amount)
         cursor.execute(
-            "UPDATE Medication SET RefillsLeft = %s WHERE MedicationID = %s",
-            (new_refills, data["MedicationID"])
+            LOG_ADMINISTRATION,
+            (
+                data["PatientID"], data["MedicationID"], data.get("NurseID"),
+                medication["Amount"], medication["RefillsLeft"], datetime.now()
+            )
         )
         
         db.get_db().commit()
         cursor.close()
         
         return jsonify({
-            "message": f"Medication administered successfully (decreased by {frequency_amount} refills)", 
-            "remaining_refills": new_refills,
-            "decreased_by": frequency_amount
+            "message": f"Medication administered successfully (decreased by {medication['Amount']} refills)", 
+            "remaining_refills": medication["RefillsLeft"],
+            "decreased_by": medication["Amount"],
+            "administration_id": cursor.lastrowid
         }), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
+
+
+# Administration log, newest first, keyset-paginated
+# ?patient_id= and ?medication_id= narrow it
+@medications.route("/administrations", methods=["GET"])
+@conditional("medication")
+def get_administrations():
+    try:
+        where = []
+        params = []
+        for arg, column in (("patient_id", "PatientID"), ("medication_id", "MedicationID")):
+            if arg in request.args:
+                value = request.args.get(arg, type=int)
+                if value is None:
+                    return jsonify({"error": f"{arg} must be an integer"}), 400
+                where.append(f"{column} = %s")
+                params.append(value)
+        
+        cursor = db.get_db().cursor()
+        page = keyset_page(
+            cursor, "SELECT * FROM MedicationAdministration", ["AdministeredAt", "AdministrationID"],
+            where=where, params=params, descending=True
+        )
+        cursor.close()
+        
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_administrations: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Most doses accepted in one medication pass
+MAX_PASS_DOSES = 500
+
+
+class MedicationPassError(ValueError):
+    """Raised when a medication pass body cannot be read at all."""
+    pass
+
+
+def parse_medication_pass(data):
+    """
+    Read doses from {"doses": [...], "NurseID": 3} or a bare list, each
+    {"PatientID", "MedicationID", optional "AdministeredAt", optional "NurseID"}.
+
+    Returns:
+        (doses, results) where doses are (index, PatientID, MedicationID,
+        NurseID, AdministeredAt) tuples for well-formed entries and results
+        holds an "invalid" result for every other entry
+    """
+    nurse_id = data.get("NurseID") if isinstance(data, dict) else None
+    items = data.get("doses") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise MedicationPassError("Body must be a non-empty list of doses or {\"doses\": [...]}")
+    if len(items) > MAX_PASS_DOSES:
+        raise MedicationPassError(f"At most {MAX_PASS_DOSES} doses may be sent at once")
+    
+    now = datetime.now()
+    doses = []
+    results = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"index": index, "status": "invalid", "error": "Dose is not a JSON object"}
+            continue
+        patient_id, medication_id = item.get("PatientID"), item.get("MedicationID")
+        if not all(isinstance(v, int) and not isinstance(v, bool) for v in (patient_id, medication_id)):
+            results[index] = {"index": index, "status": "invalid", "error": "PatientID and MedicationID must be integers"}
+            continue
+        try:
+            administered_at = parse_timestamp(item["AdministeredAt"], "AdministeredAt") if item.get("AdministeredAt") else now
+        except ValueError as e:
+            results[index] = {"index": index, "status": "invalid", "error": str(e)}
+            continue
+        doses.append((index, patient_id, medication_id, item.get("NurseID", nurse_id), administered_at))
+    return doses, results
+
+
+# Record a whole medication pass at once
+# Body: {"NurseID": 3, "doses": [{"PatientID": 1, "MedicationID": 2,
+#        "AdministeredAt": "2025-08-01T08:00:00"}, ...]} (or a bare list)
+# Every dose is checked with one query, then refills and log rows are
+# written in one transaction; each dose gets its own result, in order
+@medications.route("/administer/batch", methods=["POST"])
+@bumps("medication")
+def administer_medication_batch():
+    try:
+        doses, results = parse_medication_pass(request.get_json(silent=True))
+        cursor = db.get_db().cursor()
+        
+        # One lookup for every prescription in the pass, locking those rows
+        # so the refills read here stay current until commit
+        supply = {}
+        pairs = sorted({(dose[1], dose[2]) for dose in doses})
+        if pairs:
+            cursor.execute(
+                "SELECT PatientID, MedicationID, RefillsLeft, "
+                "COALESCE(NULLIF(FrequencyAmount, 0), 1) AS Amount FROM Patient_Medications "
+                f"WHERE (PatientID, MedicationID) IN ({', '.join(['(%s, %s)'] * len(pairs))}) FOR UPDATE",
+                [value for pair in pairs for value in pair],
+            )
+            supply = {(row["PatientID"], row["MedicationID"]): row for row in cursor.fetchall()}
+        
+        # Apply doses in request order; a prescription listed twice is
+        # drawn down twice
+        refills = {pair: row["RefillsLeft"] for pair, row in supply.items()}
+        log_rows = []
+        for index, patient_id, medication_id, nurse_id, administered_at in doses:
+            result = {"index": index, "PatientID": patient_id, "MedicationID": medication_id}
+            pair = (patient_id, medication_id)
+            row = supply.get(pair)
+            if row is None:
+                result.update(status="not_found", error="Patient-medication link not found")
+            elif (refills[pair] or 0) <= 0:
+                result.update(status="no_refills", error="No refills left for this medication")
+            else:
+                refills[pair] = max(0, refills[pair] - row["Amount"])
+                result.update(
+                    status="administered", decreased_by=row["Amount"],
+                    remaining_refills=refills[pair]
+                )
+                log_rows.append(
+                    (patient_id, medication_id, nurse_id, row["Amount"], refills[pair], administered_at)
+                )
+            results[index] = result
+        
+        if log_rows:
+            # pymysql rewrites both into multi-row INSERTs
+            changed = sorted({(log_row[0], log_row[1]) for log_row in log_rows})
+            cursor.executemany(SET_REFILLS, [(*pair, refills[pair]) for pair in changed])
+            cursor.executemany(LOG_ADMINISTRATION, log_rows)
+            db.get_db().commit()
+        cursor.close()
+        
+        current_app.logger.info(f'Medication pass: administered {len(log_rows)} of {len(results)} doses')
+        return jsonify({
+            "administered": len(log_rows),
+            "failed": len(results) - len(log_rows),
+            "results": [results[index] for index in sorted(results)],
+        }), 200 if log_rows else 400
+    except MedicationPassError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in administer_medication_batch: {str(e)}')
+        return jsonify({"error": str(e)}), 500
@@ -1,5 +1,10 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import bumps, conditional
+from backend.events import record_event, record_events
+from backend.pagination import keyset_page, page_response, PaginationError
+from backend.search import SearchError, fulltext_boolean_query, time_window
+from backend.streaming import stream_format, stream_keyset
 from mysql.connector import Error
 from flask import current_app
 from datetime import datetime
@@ -11,6 +16,7 @@ messages = Blueprint("messages", __name__)
 # Get messages for a user (accessible via MessagePatients, MessageDoctor, or MessageNurse)
 # Available to Patient-3.1, Doctor-1.5, Doctor-1.6, Nurse-2.6
 @messages.route("/", methods=["GET"])
+@conditional("message")
 def get_messages():
     try:
         current_app.logger.info('Starting get_messages request')
@@ -25,83 +31,439 @@ def get_messages():
         
         # Get messages based on user type
         if user_type == "patient":
-            query = """
+            select = """
             SELECT md.* FROM MessageDetails md
             JOIN MessagePatients mp ON md.MessageID = mp.MessageID
-            WHERE mp.PatientID = %s
-            ORDER BY md.SentTime DESC
             """
+            where = ["mp.PatientID = %s"]
         elif user_type == "doctor":
-            query = """
+            select = """
             SELECT md.* FROM MessageDetails md
             JOIN MessageDoctor mdoc ON md.MessageID = mdoc.MessageID
-            WHERE mdoc.DoctorID = %s
-            ORDER BY md.SentTime DESC
             """
+            where = ["mdoc.DoctorID = %s"]
         elif user_type == "nurse":
-            query = """
+            select = """
             SELECT md.* FROM MessageDetails md
             JOIN MessageNurse mn ON md.MessageID = mn.MessageID
-            WHERE mn.NurseID = %s
-            ORDER BY md.SentTime DESC
             """
+            where = ["mn.NurseID = %s"]
         else:
             return jsonify({"error": "Invalid user_type. Must be 'patient', 'doctor', or 'nurse'"}), 400
         
-        cursor.execute(query, (user_id,))
-        messages_data = cursor.fetchall()
+        # Exports opt in to a streamed body via Accept: application/x-ndjson
+        fmt = stream_format()
+        if fmt:
+            cursor.close()
+            return stream_keyset(
+                select, ["md.SentTime", "md.MessageID"],
+                where=where, params=[user_id], descending=True, fmt=fmt
+            ), 200
+        
+        # Newest first, paged on (SentTime, MessageID)
+        page = keyset_page(
+            cursor, select, ["md.SentTime", "md.MessageID"],
+            where=where, params=[user_id], descending=True
+        )
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(messages_data)} messages for {user_type} {user_id}')
-        return jsonify(messages_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} messages for {user_type} {user_id}')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_messages: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
+# Message recipients by user_type: (link table, ID column)
+MESSAGE_RECIPIENTS = {
+    "patient": ("MessagePatients", "PatientID"),
+    "doctor": ("MessageDoctor", "DoctorID"),
+    "nurse": ("MessageNurse", "NurseID"),
+}
+
+
+# Full-text search over message Subject and Content, best match first
+# ?q= is required; ?priority=, ?unread=true, ?from= / ?to= on SentTime and
+# ?user_type= with ?user_id= (a recipient's inbox) narrow the results
+@messages.route("/search", methods=["GET"])
+@conditional("message")
+def search_messages():
+    try:
+        current_app.logger.info('Starting search_messages request')
+        terms = fulltext_boolean_query(request.args.get("q"))
+        
+        conditions = ["MATCH(md.Subject, md.Content) AGAINST (%s IN BOOLEAN MODE)"]
+        params = [terms]
+        
+        priorities = [p.strip() for p in request.args.get("priority", "").split(",") if p.strip()]
+        if priorities:
+            conditions.append(f"md.Priority IN ({', '.join(['%s'] * len(priorities))})")
+            params.extend(priorities)
+        if request.args.get("unread", "").lower() in ("1", "true", "yes"):
+            conditions.append("md.ReadStatus = FALSE")
+        
+        window, window_params = time_window(request.args, "md.SentTime")
+        conditions.extend(window)
+        params.extend(window_params)
+        
+        user_type = request.args.get("user_type")
+        if user_type:
+            if user_type not in MESSAGE_RECIPIENTS or not request.args.get("user_id"):
+                raise SearchError("user_type must be 'patient', 'doctor', or 'nurse' and needs a user_id")
+            table, column = MESSAGE_RECIPIENTS[user_type]
+            conditions.append(
+                f"EXISTS (SELECT 1 FROM {table} r WHERE r.MessageID = md.MessageID AND r.{column} = %s)"
+            )
+            params.append(request.args["user_id"])
+        
+        # Score in a derived table so Relevance can be the keyset sort key
+        select = f"""
+        SELECT * FROM (
+            SELECT md.*, MATCH(md.Subject, md.Content) AGAINST (%s IN BOOLEAN MODE) AS Relevance
+            FROM MessageDetails md
+            WHERE {' AND '.join(conditions)}
+        ) ranked
+        """
+        
+        cursor = db.get_db().cursor()
+        page = keyset_page(
+            cursor, select, ["Relevance", "MessageID"], descending=True,
+            select_params=[terms] + params
+        )
+        cursor.close()
+        
+        current_app.logger.info(f'Message search matched {len(page["rows"])} messages on this page')
+        return page_response(page), 200
+    except (SearchError, PaginationError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in search_messages: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Message headers returned by /summary: everything but the body
+SUMMARY_HEADER_COLUMNS = [
+    "MessageID", "Subject", "SentTime", "PostedBy", "PostedByRole", "SenderType", "ReadStatus", "Priority"
+]
+
+# Latest headers returned by /summary by default, and at most
+SUMMARY_LATEST_DEFAULT = 5
+SUMMARY_LATEST_MAX = 50
+
+
+# Get inbox badge counts and the newest message headers for a recipient
+# ?user_type=patient|doctor|nurse&user_id= (required), ?latest=N headers
+# Returns {"total", "unread", "by_priority": {"High": {"total", "unread"}}, "latest": [...]}
+@messages.route("/summary", methods=["GET"])
+@conditional("message")
+def get_message_summary():
+    try:
+        user_type = request.args.get("user_type")
+        user_id = request.args.get("user_id", type=int)
+        if user_type not in MESSAGE_RECIPIENTS or user_id is None:
+            return jsonify({"error": "user_type must be 'patient', 'doctor', or 'nurse' and needs an integer user_id"}), 400
+        latest = request.args.get("latest", SUMMARY_LATEST_DEFAULT, type=int)
+        if latest is None or not (0 <= latest <= SUMMARY_LATEST_MAX):
+            return jsonify({"error": f"latest must be an integer between 0 and {SUMMARY_LATEST_MAX}"}), 400
+        
+        table, column = MESSAGE_RECIPIENTS[user_type]
+        cursor = db.get_db().cursor()
+        
+        # One grouped pass over the recipient's links (idx_msg_<type>)
+        # joined to MessageDetails by primary key; Content is never read
+        cursor.execute(
+            f"""
+            SELECT md.Priority, COUNT(*) AS Total, SUM(md.ReadStatus = FALSE) AS Unread
+            FROM {table} r
+            JOIN MessageDetails md ON md.MessageID = r.MessageID
+            WHERE r.{column} = %s
+            GROUP BY md.Priority
+            """,
+            (user_id,),
+        )
+        by_priority = {}
+        for row in cursor.fetchall():
+            # Priority defaults to Normal; count legacy NULLs with it
+            counts = by_priority.setdefault(row["Priority"] or "Normal", {"total": 0, "unread": 0})
+            counts["total"] += row["Total"]
+            counts["unread"] += int(row["Unread"] or 0)
+        
+        headers = []
+        if latest:
+            cursor.execute(
+                f"""
+                SELECT {', '.join(f'md.{c}' for c in SUMMARY_HEADER_COLUMNS)}
+                FROM {table} r
+                JOIN MessageDetails md ON md.MessageID = r.MessageID
+                WHERE r.{column} = %s
+                ORDER BY md.SentTime DESC, md.MessageID DESC
+                LIMIT %s
+                """,
+                (user_id, latest),
+            )
+            headers = cursor.fetchall()
+        cursor.close()
+        
+        return jsonify({
+            "total": sum(counts["total"] for counts in by_priority.values()),
+            "unread": sum(counts["unread"] for counts in by_priority.values()),
+            "by_priority": by_priority,
+            "latest": headers,
+        }), 200
+    except Error as e:
+        current_app.logger.error(f'Database error in get_message_summary: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Fields every new message needs
+MESSAGE_REQUIRED_FIELDS = ["Subject", "Content", "PostedBy", "PostedByRole"]
+
+
+def insert_message(cursor, data):
+    """Insert a MessageDetails row from a request body and return its ID."""
+    query = """
+    INSERT INTO MessageDetails (Subject, Content, SentTime, PostedBy, PostedByRole, SenderType, ReadStatus, Priority)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    cursor.execute(
+        query,
+        (
+            data["Subject"],
+            data["Content"],
+            data.get("SentTime", datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+            data["PostedBy"],
+            data["PostedByRole"],
+            data.get("SenderType", data["PostedByRole"]),
+            data.get("ReadStatus", False),
+            data.get("Priority", "Normal")
+        ),
+    )
+    return cursor.lastrowid
+
+
 # Create message
 # Available to Patient-3.3, Doctor-1.5, Doctor-1.6, Nurse-2.6
 @messages.route("/", methods=["POST"])
+@bumps("message")
 def create_message():
     try:
         data = request.get_json()
         cursor = db.get_db().cursor()
         
         # Validate required fields
-        required_fields = ["Subject", "Content", "PostedBy", "PostedByRole"]
-        for field in required_fields:
+        for field in MESSAGE_REQUIRED_FIELDS:
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
         # Insert new message
-        query = """
-        INSERT INTO MessageDetails (Subject, Content, SentTime, PostedBy, PostedByRole, SenderType, ReadStatus, Priority)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        new_message_id = insert_message(cursor, data)
+        
+        db.get_db().commit()
+        cursor.close()
+        
+        return jsonify({"message": "Message created successfully", "message_id": new_message_id}), 201
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Table each recipient user_type's IDs must exist in
+RECIPIENT_ENTITIES = {"patient": "Patient", "doctor": "Doctor", "nurse": "Nurse"}
+
+# Recipient user_type of each ID column a target query can return
+RECIPIENT_COLUMNS = {column: user_type for user_type, (_, column) in MESSAGE_RECIPIENTS.items()}
+
+# Broadcast "role" targets can be narrowed to the patients assigned to one
+# doctor or nurse (served by idx_patient_doctor / idx_patient_nurse)
+TARGET_SCOPES = {"doctor_id": "DoctorID", "nurse_id": "NurseID"}
+
+# Most recipients one POST /message/send may reach once targets are expanded
+MAX_SEND_RECIPIENTS = 5000
+
+
+class MessageSendError(ValueError):
+    """Raised for a malformed POST /message/send body."""
+    pass
+
+
+def _user_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise MessageSendError(f"Invalid user_id: {value}")
+
+
+def parse_recipients(data):
+    """
+    Read the explicit "recipients" and the broadcast "targets" of a send.
+
+    recipients: [{"user_type": "doctor", "user_id": 3}, ...]
+    targets:    {"role": "nurse"}                         every nurse
+                {"role": "nurse", "doctor_id": 3}         nurses of doctor 3's patients
+                {"role": "patient", "nurse_id": 5}        nurse 5's patients
+                {"care_team": 12}                         patient 12's doctor and nurse
+                {"user_type": "doctor", "user_ids": [...]} an explicit ID list
+
+    Returns:
+        (explicit, queries): explicit is {user_type: {user_id: None}} (an
+        ordered set) still to be checked for existence; queries are
+        (target, SELECT, params) whose rows are recipient ID columns
+    """
+    recipients = data.get("recipients", [])
+    targets = data.get("targets", [])
+    if not isinstance(recipients, list) or not isinstance(targets, list) or not (recipients or targets):
+        raise MessageSendError("recipients and/or targets must be given as non-empty lists")
+    
+    explicit = {}
+    for recipient in recipients:
+        user_type = recipient.get("user_type") if isinstance(recipient, dict) else None
+        if user_type not in MESSAGE_RECIPIENTS:
+            raise MessageSendError("Each recipient's user_type must be 'patient', 'doctor', or 'nurse'")
+        explicit.setdefault(user_type, {})[_user_id(recipient.get("user_id"))] = None
+    
+    queries = []
+    for target in targets:
+        if not isinstance(target, dict):
+            raise MessageSendError("Each target must be an object")
+        if "care_team" in target:
+            queries.append((
+                target, "SELECT DoctorID, NurseID FROM Patient WHERE PatientID = %s",
+                [_user_id(target["care_team"])],
+            ))
+        elif "role" in target:
+            role = target["role"]
+            if role not in MESSAGE_RECIPIENTS:
+                raise MessageSendError("role must be 'patient', 'doctor', or 'nurse'")
+            column = MESSAGE_RECIPIENTS[role][1]
+            scopes = [arg for arg in TARGET_SCOPES if arg in target]
+            if len(scopes) > 1:
+                raise MessageSendError("A role target takes at most one of doctor_id or nurse_id")
+            if scopes:
+                queries.append((
+                    target, f"SELECT DISTINCT {column} FROM Patient WHERE {TARGET_SCOPES[scopes[0]]} = %s",
+                    [_user_id(target[scopes[0]])],
+                ))
+            else:
+                queries.append((target, f"SELECT {column} FROM {RECIPIENT_ENTITIES[role]}", []))
+        elif "user_type" in target:
+            user_type = target["user_type"]
+            if user_type not in MESSAGE_RECIPIENTS or not isinstance(target.get("user_ids"), list):
+                raise MessageSendError("An ID list target needs a user_type and a user_ids list")
+            ids = explicit.setdefault(user_type, {})
+            for value in target["user_ids"]:
+                ids[_user_id(value)] = None
+        else:
+            raise MessageSendError("Each target needs one of role, care_team or user_type")
+    if sum(len(ids) for ids in explicit.values()) > MAX_SEND_RECIPIENTS:
+        raise MessageSendError(f"At most {MAX_SEND_RECIPIENTS} recipients may be reached at once")
+    return explicit, queries
+
+
+def resolve_recipients(cursor, explicit, queries):
+    """
+    Check the explicit recipients exist and expand the target queries.
+
+    Returns:
+        ({user_type: [user IDs]}, list of unknown recipients / targets)
+    """
+    missing = []
+    resolved = {}
+    # One IN-list lookup per recipient type rather than a foreign key
+    # failure halfway through the inserts
+    for user_type, ids in explicit.items():
+        if not ids:
+            continue
+        table, column = MESSAGE_RECIPIENTS[user_type]
         cursor.execute(
-            query,
-            (
-                data["Subject"],
-                data["Content"],
-                data.get("SentTime", datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
-                data["PostedBy"],
-                data["PostedByRole"],
-                data.get("SenderType", data["PostedByRole"]),
-                data.get("ReadStatus", False),
-                data.get("Priority", "Normal")
-            ),
+            f"SELECT {column} FROM {RECIPIENT_ENTITIES[user_type]} "
+            f"WHERE {column} IN ({', '.join(['%s'] * len(ids))})",
+            list(ids),
+        )
+        found = {row[column] for row in cursor.fetchall()}
+        missing += [{"user_type": user_type, "user_id": user_id} for user_id in ids if user_id not in found]
+        resolved.setdefault(user_type, {}).update(dict.fromkeys(user_id for user_id in ids if user_id in found))
+    
+    for target, query, params in queries:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        if not rows and "care_team" in target:
+            missing.append(target)
+        for row in rows:
+            for column, user_id in row.items():
+                if user_id is not None:
+                    resolved.setdefault(RECIPIENT_COLUMNS[column], {})[user_id] = None
+    return {user_type: list(ids) for user_type, ids in resolved.items() if ids}, missing
+
+
+# Create a message and link it to all of its recipients in one transaction
+# Body: the POST /message/ fields plus "recipients" and/or broadcast
+# "targets" (see parse_recipients), expanded here rather than by the client.
+# Either everything is stored or nothing is; unknown recipients are a 404
+@messages.route("/send", methods=["POST"])
+@bumps("message")
+def send_message():
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        for field in MESSAGE_REQUIRED_FIELDS:
+            if field not in data:
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        explicit, queries = parse_recipients(data)
+        
+        cursor = db.get_db().cursor()
+        
+        by_type, missing = resolve_recipients(cursor, explicit, queries)
+        if missing:
+            cursor.close()
+            return jsonify({"error": "Unknown recipients", "recipients": missing}), 404
+        total = sum(len(ids) for ids in by_type.values())
+        if not total:
+            cursor.close()
+            return jsonify({"error": "The targets matched no recipients"}), 400
+        if total > MAX_SEND_RECIPIENTS:
+            cursor.close()
+            return jsonify({"error": f"At most {MAX_SEND_RECIPIENTS} recipients may be reached at once ({total} matched)"}), 400
+        
+        new_message_id = insert_message(cursor, data)
+        for user_type, ids in by_type.items():
+            table, column = MESSAGE_RECIPIENTS[user_type]
+            # pymysql rewrites this into one multi-row INSERT
+            cursor.executemany(
+                f"INSERT INTO {table} (MessageID, {column}) VALUES (%s, %s)",
+                [(new_message_id, user_id) for user_id in ids],
+            )
+        
+        cursor.execute("SELECT * FROM MessageDetails WHERE MessageID = %s", (new_message_id,))
+        record_events(
+            cursor, "message.created", cursor.fetchone(),
+            [(user_type, user_id) for user_type, ids in by_type.items() for user_id in ids],
         )
         
         db.get_db().commit()
-        new_message_id = cursor.lastrowid
         cursor.close()
         
-        return jsonify({"message": "Message created successfully", "message_id": new_message_id}), 201
+        current_app.logger.info(f'Message {new_message_id} sent to {total} recipients')
+        return jsonify({"message": "Message sent successfully", "message_id": new_message_id, "recipients": total}), 201
+    except MessageSendError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
+        current_app.logger.error(f'Database error in send_message: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
+
+def notify_recipient(cursor, message_id, user_type, user_id):
+    # A message reaches its recipient's stream once it is linked to them
+    cursor.execute("SELECT * FROM MessageDetails WHERE MessageID = %s", (message_id,))
+    message = cursor.fetchone()
+    if message:
+        record_event(cursor, "message.created", message, user_type=user_type, user_id=user_id)
+
+
 # Link message to doctor
 @messages.route("/messages/<int:message_id>/link_doctor", methods=["POST"])
+@bumps("message")
 def link_message_to_doctor(message_id):
     try:
         data = request.get_json()
@@ -116,6 +478,7 @@ def link_message_to_doctor(message_id):
         VALUES (%s, %s)
         """
         cursor.execute(query, (message_id, data["DoctorID"]))
+        notify_recipient(cursor, message_id, "doctor", data["DoctorID"])
         
         db.get_db().commit()
         cursor.close()
@@ -126,6 +489,7 @@ def link_message_to_doctor(message_id):
 
 # Link message to nurse
 @messages.route("/messages/<int:message_id>/link_nurse", methods=["POST"])
+@bumps("message")
 def link_message_to_nurse(message_id):
     try:
         data = request.get_json()
@@ -140,6 +504,7 @@ def link_message_to_nurse(message_id):
         VALUES (%s, %s)
         """
         cursor.execute(query, (message_id, data["NurseID"]))
+        notify_recipient(cursor, message_id, "nurse", data["NurseID"])
         
         db.get_db().commit()
         cursor.close()
@@ -150,6 +515,7 @@ def link_message_to_nurse(message_id):
 
 # Link message to patient
 @messages.route("/messages/<int:message_id>/link_patient", methods=["POST"])
+@bumps("message")
 def link_message_to_patient(message_id):
     try:
         data = request.get_json()
@@ -164,6 +530,7 @@ def link_message_to_patient(message_id):
         VALUES (%s, %s)
         """
         cursor.execute(query, (message_id, data["PatientID"]))
+        notify_recipient(cursor, message_id, "patient", data["PatientID"])
         
         db.get_db().commit()
         cursor.close()
@@ -175,6 +542,7 @@ def link_message_to_patient(message_id):
 
 # Get a specific message with Message, SentTime, PostedBy, and PostedByRole
 @messages.route("/messages/<int:message_id>", methods=["GET"])
+@conditional("message")
 def get_message(message_id):
     try:
         cursor = db.get_db().cursor()
@@ -193,6 +561,7 @@ def get_message(message_id):
 # Delete a specific message (when acknowledged)
 # Available to Doctor-1.6, Nurse-2.7, Patient-3.7, Proxy-4.6
 @messages.route("/messages/<int:message_id>", methods=["DELETE"])
+@bumps("message")
 def delete_message(message_id):
     try:
         cursor = db.get_db().cursor()
@@ -209,6 +578,7 @@ def delete_message(message_id):
         
         # Delete the message itself
         cursor.execute("DELETE FROM MessageDetails WHERE MessageID = %s", (message_id,))
+        record_event(cursor, "message.deleted", {"MessageID": message_id})
         
         db.get_db().commit()
         cursor.close()
@@ -0,0 +1,30 @@
+from flask import Blueprint, jsonify
+from backend.db_connection import db
+from backend.events import event_hub
+from backend.versions import resource_versions
+from backend.versions.cache import reference_cache
+from flask import current_app
+
+# Create a Blueprint for operational metrics routes
+metrics = Blueprint("metrics", __name__)
+
+
+# Get connection pool statistics for this API worker process
+@metrics.route("/db_pool", methods=["GET"])
+def get_db_pool_metrics():
+    pool_metrics = db.metrics()
+    current_app.logger.debug(f'DB pool metrics: {pool_metrics}')
+    return jsonify(pool_metrics), 200
+
+
+# Get push channel (/stream/events) statistics for this API worker process
+@metrics.route("/events", methods=["GET"])
+def get_event_metrics():
+    return jsonify(event_hub.metrics()), 200
+
+
+# Get reference-data response cache and version counter statistics for
+# this API worker process (hits, misses, evictions, invalidations)
+@metrics.route("/cache", methods=["GET"])
+def get_cache_metrics():
+    return jsonify({"responses": reference_cache.metrics(), "versions": resource_versions.metrics()}), 200
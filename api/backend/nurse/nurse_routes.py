@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import conditional
+from backend.batch import parse_batch_ids, fetch_by_ids, batch_response, BatchError
+from backend.pagination import keyset_page, page_response, PaginationError
 from mysql.connector import Error
 from flask import current_app
 
@@ -10,25 +13,49 @@ nurses = Blueprint("nurses", __name__)
 # Get all nurses
 # Available to Proxy-4.6
 @nurses.route("/", methods=["GET"])
+@conditional("nurse", cache=True)
 def get_all_nurses():
     try:
         current_app.logger.info('Starting get_all_nurses request')
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM Nurse")
-        nurses_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM Nurse", ["NurseID"])
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(nurses_data)} nurses')
-        return jsonify(nurses_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} nurses')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_nurses: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
+# Get several nurses by ID in one query
+# GET /batch?ids=1,2,3 or POST /batch with {"ids": [1, 2, 3]}
+@nurses.route("/batch", methods=["GET", "POST"])
+@conditional("nurse")
+def get_nurses_batch():
+    try:
+        ids = parse_batch_ids()
+        cursor = db.get_db().cursor()
+        
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM Nurse", "NurseID", ids)
+        cursor.close()
+        
+        current_app.logger.info(f'Batch fetched {len(rows_by_id)} of {len(ids)} nurses')
+        return batch_response(rows_by_id, ids), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_nurses_batch: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Get a specific nurse with FirstName and LastName
 # Available to Proxy-4.6
 @nurses.route("/<int:nurse_id>", methods=["GET"])
+@conditional("nurse")
 def get_nurse(nurse_id):
     try:
         cursor = db.get_db().cursor()
@@ -43,3 +70,22 @@ def get_nurse(nurse_id):
         return jsonify(nurse), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
+
+
+# Get nurse by name (FirstName and LastName)
+@nurses.route("/name/<string:first_name>/<string:last_name>", methods=["GET"])
+@conditional("nurse")
+def get_nurse_by_name(first_name, last_name):
+    try:
+        cursor = db.get_db().cursor()
+        
+        cursor.execute("SELECT * FROM Nurse WHERE FirstName = %s AND LastName = %s", (first_name, last_name))
+        nurse = cursor.fetchone()
+        
+        if not nurse:
+            return jsonify({"error": "Nurse not found"}), 404
+            
+        cursor.close()
+        return jsonify(nurse), 200
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
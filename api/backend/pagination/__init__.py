@@ -0,0 +1,200 @@
+#------------------------------------------------------------
+# Shared keyset (cursor) pagination for list endpoints
+#------------------------------------------------------------
+import base64
+import json
+from urllib.parse import urlencode
+
+from flask import jsonify, request
+
+
+# Page size used when the caller does not pass ?limit=
+DEFAULT_PAGE_SIZE = 100
+
+# Hard ceiling on ?limit= so no single request can pull a whole table
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    """Raised for malformed limit/after/before query parameters."""
+    pass
+
+
+def encode_cursor(values):
+    """Encode the ordering key of a row as an opaque, URL-safe cursor."""
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, width):
+    """Decode a cursor produced by encode_cursor() into its key values."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != width:
+        raise PaginationError("Invalid pagination cursor")
+    return values
+
+
+def parse_page_args(args):
+    """
+    Read limit/after/before from the query string.
+
+    Returns:
+        (limit, after, before) where after/before are raw cursor tokens or None
+    """
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+
+    after = args.get("after")
+    before = args.get("before")
+    if after and before:
+        raise PaginationError("Use either after or before, not both")
+
+    return min(limit, MAX_PAGE_SIZE), after, before
+
+
+def key_directions(keys, descending):
+    """Expand `descending` (one bool, or one per key) to a list per key."""
+    if isinstance(descending, (list, tuple)):
+        return list(descending)
+    return [descending] * len(keys)
+
+
+def keyset_predicate(keys, values, descending, backwards):
+    """
+    Build a WHERE fragment selecting rows strictly past `values` in key order.
+
+    Row-value comparisons such as (a, b) > (x, y) are expanded into
+    a > x OR (a = x AND b > y) so MySQL can use a range scan on the index.
+    This expansion also allows mixed directions, e.g. a DESC, b ASC.
+    """
+    clauses = []
+    params = []
+    for i, (key, key_descending) in enumerate(zip(keys, key_directions(keys, descending))):
+        # scanning forward on an ascending key (or backwards on a
+        # descending one) means we want keys greater than the cursor
+        op = "<" if key_descending != backwards else ">"
+        parts = [f"{k} = %s" for k in keys[:i]] + [f"{key} {op} %s"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(values[: i + 1])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def keyset_query(select, keys, where=None, params=None, descending=False,
+                 token=None, backwards=False, limit=None, select_params=None):
+    """
+    Build the SQL for a keyset scan starting just past cursor `token`.
+
+    `select_params` fill placeholders inside `select` itself (for example
+    a derived table) and are passed ahead of the WHERE parameters.
+
+    Returns:
+        (query, params) ready for cursor.execute()
+    """
+    conditions = list(where or [])
+    query_params = list(select_params or []) + list(params or [])
+
+    if token:
+        predicate, predicate_params = keyset_predicate(
+            keys, decode_cursor(token, len(keys)), descending, backwards
+        )
+        conditions.append(predicate)
+        query_params.extend(predicate_params)
+
+    # walking backwards flips the scan direction; callers re-reverse rows
+    query = select
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY " + ", ".join(
+        f"{k} {'DESC' if key_descending != backwards else 'ASC'}"
+        for k, key_descending in zip(keys, key_directions(keys, descending))
+    )
+    if limit is not None:
+        query += " LIMIT %s"
+        query_params.append(limit)
+    return query, query_params
+
+
+def keyset_page(cursor, select, keys, where=None, params=None, descending=False, args=None,
+                select_params=None):
+    """
+    Run one page of a keyset-paginated query.
+
+    Args:
+        cursor: open DictCursor
+        select: SELECT ... FROM ... [JOIN ...] without WHERE/ORDER BY/LIMIT
+        keys: ordered list of columns forming a unique sort key, e.g.
+              ["PatientID"] or ["md.SentTime", "md.MessageID"]
+        where: optional list of extra WHERE conditions (ANDed together)
+        params: parameters for the `where` conditions
+        descending: True to page newest/highest first, or one bool per key
+                    for mixed orderings such as [True, False]
+        args: query args to read limit/after/before from (default request.args)
+        select_params: parameters for placeholders inside `select`
+
+    Returns:
+        dict with "rows", "limit", "next" and "prev" (cursor tokens or None)
+    """
+    limit, after, before = parse_page_args(request.args if args is None else args)
+    backwards = bool(before)
+    query, query_params = keyset_query(
+        select, keys, where, params, descending,
+        token=before or after, backwards=backwards, limit=limit + 1,
+        select_params=select_params
+    )
+
+    cursor.execute(query, query_params)
+    rows = cursor.fetchall()
+
+    has_more = len(rows) > limit
+    rows = list(rows[:limit])
+    if backwards:
+        rows.reverse()
+
+    fields = [k.split(".")[-1] for k in keys]
+    first = encode_cursor([rows[0][f] for f in fields]) if rows else None
+    last = encode_cursor([rows[-1][f] for f in fields]) if rows else None
+
+    if backwards:
+        next_cursor, prev_cursor = last, (first if has_more else None)
+    else:
+        next_cursor, prev_cursor = (last if has_more else None), (first if after else None)
+
+    return {"rows": rows, "limit": limit, "next": next_cursor, "prev": prev_cursor}
+
+
+def page_link(cursor_param, token):
+    args = request.args.to_dict(flat=False)
+    args.pop("after", None)
+    args.pop("before", None)
+    args[cursor_param] = [token]
+    return f"{request.base_url}?{urlencode(args, doseq=True)}"
+
+
+def page_response(page):
+    """
+    Build the JSON response for a page from keyset_page().
+
+    The body stays a plain JSON array so existing clients keep working;
+    navigation is exposed through a Link header (rel="next"/"prev") and
+    X-Next-Cursor / X-Prev-Cursor headers.
+    """
+    response = jsonify(page["rows"])
+    links = []
+    if page["next"]:
+        links.append(f'<{page_link("after", page["next"])}>; rel="next"')
+        response.headers["X-Next-Cursor"] = page["next"]
+    if page["prev"]:
+        links.append(f'<{page_link("before", page["prev"])}>; rel="prev"')
+        response.headers["X-Prev-Cursor"] = page["prev"]
+    if links:
+        response.headers["Link"] = ", ".join(links)
+    response.headers["X-Page-Limit"] = str(page["limit"])
+    return response
@@ -1,37 +1,239 @@
+import json
+from datetime import date
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import bumps, conditional
+from backend.batch import parse_batch_ids, fetch_by_ids, batch_response, BatchError
+from backend.pagination import keyset_page, page_response, PaginationError
+from backend.search import TableNameIndex
+from backend.streaming import stream_format, stream_keyset
+from backend.timeseries import READING_COLUMNS, READING_FIELDS, VitalsRangeError, latest_reading, reading_range
+from backend.timeseries.pressure import PressureFilterError, pressure_conditions
+from backend.timeseries.scores import census_scores
 from mysql.connector import Error
 from flask import current_app
 
 # Create a Blueprint for Patient routes
 patients = Blueprint("patients", __name__)
 
+# Trigram index over patient names backing /patient/search (one per worker)
+patient_name_index = TableNameIndex("Patient", "PatientID", ["FirstName", "LastName"])
 
-# Get all patients accessible to the user
+# Most results /patient/search will return
+MAX_SEARCH_RESULTS = 50
+
+
+class PatientFilterError(ValueError):
+    """Raised for malformed roster filter query parameters."""
+    pass
+
+
+def like_prefix(value):
+    """Escape LIKE wildcards in user input and turn it into a prefix pattern."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def patient_filters(args):
+    """
+    Translate roster filter query parameters into SQL conditions.
+
+    Supported filters: doctor_id, nurse_id, blood_type (comma-separated),
+    pre_existing (true/false), dob_from / dob_to (YYYY-MM-DD), first_name /
+    last_name (prefix match), name (every word must prefix-match the
+    first or last name) and systolic_min / systolic_max / diastolic_min /
+    diastolic_max (thresholds on the latest reading). doctor_id and
+    nurse_id are served by the idx_patient_doctor / idx_patient_nurse
+    indexes.
+
+    Returns:
+        (where, params) for keyset_page() / stream_keyset()
+    """
+    where = []
+    params = []
+
+    for arg, column in (("doctor_id", "DoctorID"), ("nurse_id", "NurseID")):
+        if args.get(arg):
+            try:
+                params.append(int(args[arg]))
+            except ValueError:
+                raise PatientFilterError(f"{arg} must be an integer")
+            where.append(f"{column} = %s")
+
+    if args.get("blood_type"):
+        blood_types = [value.strip() for value in args["blood_type"].split(",") if value.strip()]
+        where.append(f"BloodType IN ({', '.join(['%s'] * len(blood_types))})")
+        params.extend(blood_types)
+
+    if args.get("pre_existing"):
+        value = args["pre_existing"].lower()
+        if value not in ("true", "false", "1", "0"):
+            raise PatientFilterError("pre_existing must be true or false")
+        where.append("PreExisting = %s")
+        params.append(value in ("true", "1"))
+
+    for arg, op in (("dob_from", ">="), ("dob_to", "<=")):
+        if args.get(arg):
+            try:
+                params.append(date.fromisoformat(args[arg]))
+            except ValueError:
+                raise PatientFilterError(f"{arg} must be a date in YYYY-MM-DD format")
+            where.append(f"DOB {op} %s")
+
+    for arg, column in (("first_name", "FirstName"), ("last_name", "LastName")):
+        if args.get(arg):
+            where.append(f"{column} LIKE %s")
+            params.append(like_prefix(args[arg].strip()))
+
+    for term in args.get("name", "").split():
+        where.append("(FirstName LIKE %s OR LastName LIKE %s)")
+        params.extend([like_prefix(term)] * 2)
+
+    try:
+        conditions, pressure_params = pressure_conditions(args, "vl.")
+    except PressureFilterError as e:
+        raise PatientFilterError(str(e))
+    if conditions:
+        where.append(
+            "PatientID IN (SELECT vl.PatientID FROM VitalLatest vl WHERE "
+            + " AND ".join(conditions) + ")"
+        )
+        params.extend(pressure_params)
+
+    return where, params
+
+
+# Get all patients accessible to the user, optionally narrowed to one
+# care team or by patient attributes (see patient_filters)
 # Available to Doctor-1.1 and Nurse-2.1
 @patients.route("/", methods=["GET"])
+@conditional("patient", "vital")
 def get_all_patients():
     try:
         current_app.logger.info('Starting get_all_patients request')
-        cursor = db.get_db().cursor()
+        where, params = patient_filters(request.args)
+        
+        # Exports opt in to a streamed body via Accept: application/x-ndjson
+        fmt = stream_format()
+        if fmt:
+            return stream_keyset(
+                "SELECT * FROM Patient", ["PatientID"], where=where, params=params, fmt=fmt
+            ), 200
+        
+        conn = db.get_db()
+        cursor = conn.cursor()
         
-        cursor.execute("SELECT * FROM Patient")
-        patients_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM Patient", ["PatientID"], where=where, params=params)
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(patients_data)} patients')
-        return jsonify(patients_data), 200
+        # early-warning score from the cache (see timeseries/scores.py)
+        page["rows"] = census_scores.annotate(conn, page["rows"])
+        
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} patients')
+        return page_response(page), 200
+    except (PaginationError, PatientFilterError) as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_patients: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
+# Count the patients GET / would list, for dashboard badges
+# Takes the same filters (see patient_filters) -> {"count": 42}
+@patients.route("/count", methods=["GET"])
+@conditional("patient", "vital")
+def count_patients():
+    try:
+        where, params = patient_filters(request.args)
+        cursor = db.get_db().cursor()
+        
+        cursor.execute(
+            "SELECT COUNT(*) AS Total FROM Patient" + (" WHERE " + " AND ".join(where) if where else ""),
+            params,
+        )
+        count = cursor.fetchone()["Total"]
+        cursor.close()
+        
+        return jsonify({"count": count}), 200
+    except PatientFilterError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in count_patients: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Ranked, prefix-aware and typo-tolerant patient name search
+# e.g. /patient/search?q=jo pes&limit=10
+# Available to Doctor-1.1 and Nurse-2.1
+@patients.route("/search", methods=["GET"])
+@conditional("patient", "vital")
+def search_patients():
+    try:
+        q = request.args.get("q", "").strip()
+        if not q:
+            return jsonify({"error": "q parameter is required"}), 400
+        try:
+            limit = min(int(request.args.get("limit", 10)), MAX_SEARCH_RESULTS)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        if limit < 1:
+            return jsonify({"error": "limit must be at least 1"}), 400
+        
+        conn = db.get_db()
+        ranked = patient_name_index.search(conn, q, limit)
+        if not ranked:
+            return jsonify([]), 200
+        
+        # Hydrate the top-k in one query and keep the ranking order
+        cursor = conn.cursor()
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM Patient", "PatientID", [pid for pid, _ in ranked])
+        cursor.close()
+        
+        results = []
+        for patient_id, score in ranked:
+            if patient_id in rows_by_id:
+                results.append(dict(rows_by_id[patient_id], SearchScore=score))
+        results = census_scores.annotate(conn, results)
+        
+        current_app.logger.info(f'Patient search for "{q}" returned {len(results)} results')
+        return jsonify(results), 200
+    except Error as e:
+        current_app.logger.error(f'Database error in search_patients: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Get several patients by ID in one query
+# GET /batch?ids=1,2,3 or POST /batch with {"ids": [1, 2, 3]}
+@patients.route("/batch", methods=["GET", "POST"])
+@conditional("patient", "vital")
+def get_patients_batch():
+    try:
+        ids = parse_batch_ids()
+        conn = db.get_db()
+        cursor = conn.cursor()
+        
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM Patient", "PatientID", ids)
+        cursor.close()
+        
+        scored = census_scores.annotate(conn, list(rows_by_id.values()))
+        rows_by_id = {row["PatientID"]: row for row in scored}
+        
+        current_app.logger.info(f'Batch fetched {len(rows_by_id)} of {len(ids)} patients')
+        return batch_response(rows_by_id, ids), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_patients_batch: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Get details for a specific patient
 # Available to Doctor-1.1, Nurse-2.5, and Patient-3.4
 @patients.route("/<int:patient_id>", methods=["GET"])
+@conditional("patient", "vital")
 def get_patient(patient_id):
     try:
-        cursor = db.get_db().cursor()
+        conn = db.get_db()
+        cursor = conn.cursor()
         
         cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
         patient = cursor.fetchone()
@@ -40,14 +242,191 @@ def get_patient(patient_id):
             return jsonify({"error": "Patient not found"}), 404
             
         cursor.close()
+        patient = census_scores.annotate(conn, [patient])[0]
         return jsonify(patient), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
 
+# A patient's current vitals: their VitalLatest row when they have a
+# series, otherwise the fields of their linked VitalChart, the same rule
+# the early-warning scores use. Bulk ingestion only writes VitalLatest,
+# so reading VitalChart alone would show those patients stale vitals.
+CURRENT_VITALS = f"""
+SELECT pv.PatientID, vl.RecordedAt,
+       {', '.join(f'IF(vl.PatientID IS NULL, vc.{field}, vl.{field}) AS {field}' for field in READING_FIELDS)},
+       pv.VitalID
+FROM Patient pv
+LEFT JOIN VitalLatest vl ON vl.PatientID = pv.PatientID
+LEFT JOIN VitalChart vc ON vc.VitalID = pv.VitalID
+WHERE vl.PatientID IS NOT NULL OR vc.VitalID IS NOT NULL
+"""
+
+# Sections of the composite chart that are 1:1 with the patient row,
+# with the join that reaches them and the columns they expose
+CHART_JOINS = {
+    "doctor": ("LEFT JOIN Doctor d ON d.DoctorID = p.DoctorID", "d",
+               ["DoctorID", "FirstName", "LastName", "Specialty", "YearOfExperience"]),
+    "nurse": ("LEFT JOIN Nurse n ON n.NurseID = p.NurseID", "n",
+              ["NurseID", "FirstName", "LastName"]),
+    "insurance": ("LEFT JOIN Insurance i ON i.InsuranceID = p.InsuranceID", "i",
+                  ["InsuranceID", "InsuranceProvider", "PolicyNumber", "Deductible", "DueDate"]),
+    "condition": ("LEFT JOIN `Condition` c ON c.ConditionID = p.ConditionID", "c",
+                  ["ConditionID", "Description", "Treatment"]),
+    "vitals": (f"LEFT JOIN ({CURRENT_VITALS}) cv ON cv.PatientID = p.PatientID", "cv",
+               READING_COLUMNS + ["VitalID"]),
+    "visit": ("LEFT JOIN Visits v ON v.VisitID = p.VisitID", "v",
+              ["VisitID", "AdmitReason", "AppointmentDate", "NextVisitDate"]),
+    "discharge": ("LEFT JOIN Discharge dc ON dc.DischargeID = p.DischargeID", "dc",
+                  ["DischargeID", "DischargeDate", "Instructions"]),
+}
+
+CHART_SECTIONS = list(CHART_JOINS) + ["medications", "proxies"]
+
+
+# Get a patient's whole chart in one request
+# Replaces the per-patient fan-out of /patient/<id>, /vitals, /condition,
+# /medications, /visit, ... with one joined query (plus one for medications)
+@patients.route("/<int:patient_id>/chart", methods=["GET"])
+@conditional("patient", "doctor", "nurse", "insurance", "condition", "vital", "visit", "discharge", "medication", "proxy")
+def get_patient_chart(patient_id):
+    try:
+        # ?include=vitals,medications limits the chart to those sections
+        include = request.args.get("include")
+        if include:
+            sections = [section.strip() for section in include.split(",") if section.strip()]
+            unknown = [section for section in sections if section not in CHART_SECTIONS]
+            if unknown:
+                return jsonify({
+                    "error": f"Unknown include section(s): {', '.join(unknown)}. "
+                             f"Valid sections: {', '.join(CHART_SECTIONS)}"
+                }), 400
+        else:
+            sections = CHART_SECTIONS
+
+        cursor = db.get_db().cursor()
+
+        # One row: the patient plus every included 1:1 section, each column
+        # aliased "<section>__<column>" so same-named columns don't collide.
+        # Proxies are folded into the same row as a JSON array.
+        select_list = ["p.*"]
+        joins = []
+        for section, (join, alias, columns) in CHART_JOINS.items():
+            if section in sections:
+                joins.append(join)
+                select_list.extend(f"{alias}.{column} AS {section}__{column}" for column in columns)
+        if "proxies" in sections:
+            select_list.append("""
+            (SELECT JSON_ARRAYAGG(JSON_OBJECT(
+                'ProxyID', pr.ProxyID, 'PatientID', pr.PatientID, 'FirstName', pr.FirstName,
+                'LastName', pr.LastName, 'Relationship', pr.Relationship))
+             FROM Proxy pr WHERE pr.PatientID = p.PatientID) AS proxies__json
+            """)
+
+        query = f"""
+        SELECT {', '.join(select_list)}
+        FROM Patient p
+        {' '.join(joins)}
+        WHERE p.PatientID = %s
+        """
+        cursor.execute(query, (patient_id,))
+        row = cursor.fetchone()
+
+        if not row:
+            cursor.close()
+            return jsonify({"error": "Patient not found"}), 404
+
+        # Split the flat row back into sections
+        chart = {"patient": {}}
+        for key, value in row.items():
+            if "__" not in key:
+                chart["patient"][key] = value
+        for section, (join, alias, columns) in CHART_JOINS.items():
+            if section not in sections:
+                continue
+            values = {column: row[f"{section}__{column}"] for column in columns}
+            # a NULL key means the LEFT JOIN found nothing
+            found = values[columns[0]] is not None
+            if section == "vitals":
+                # same shape as /patient/<id>/vitals
+                chart[section] = [values] if found else []
+            else:
+                chart[section] = values if found else None
+        if "proxies" in sections:
+            proxies_json = row["proxies__json"]
+            chart["proxies"] = json.loads(proxies_json) if proxies_json else []
+
+        if "medications" in sections:
+            query = """
+            SELECT pm.*, m.PrescriptionName, m.DosageAmount, m.DosageUnit
+            FROM Patient_Medications pm
+            JOIN Medication m ON pm.MedicationID = m.MedicationID
+            WHERE pm.PatientID = %s
+            """
+            cursor.execute(query, (patient_id,))
+            chart["medications"] = cursor.fetchall()
+
+        cursor.close()
+        return jsonify(chart), 200
+    except Error as e:
+        current_app.logger.error(f'Database error in get_patient_chart: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Related resources reachable from a patient, as
+# (columns to select, LEFT JOIN from Patient p, key column of the related row).
+# The 1:1 relations reuse the chart joins above.
+PATIENT_RELATIONS = {
+    section: (f"{alias}.*", join, columns[0])
+    for section, (join, alias, columns) in CHART_JOINS.items()
+}
+PATIENT_RELATIONS["medications"] = (
+    "pm.*, m.PrescriptionName, m.DosageAmount, m.DosageUnit",
+    """LEFT JOIN Patient_Medications pm ON pm.PatientID = p.PatientID
+       LEFT JOIN Medication m ON m.MedicationID = pm.MedicationID""",
+    "MedicationID",
+)
+PATIENT_RELATIONS["proxies"] = ("pr.*", "LEFT JOIN Proxy pr ON pr.PatientID = p.PatientID", "ProxyID")
+
+
+def fetch_patient_related(cursor, patient_id, relation):
+    """
+    Look up a patient's related rows in one query.
+
+    The LEFT JOIN from Patient tells the two empty cases apart in a single
+    round trip: no rows at all means the patient does not exist, while a
+    row whose related key is NULL means the patient has nothing linked.
+
+    Returns:
+        None if the patient does not exist, otherwise a (possibly empty)
+        list of related rows
+    """
+    columns, join, key = PATIENT_RELATIONS[relation]
+    query = f"""
+    SELECT p.PatientID AS _patient_id, {columns}
+    FROM Patient p
+    {join}
+    WHERE p.PatientID = %s
+    """
+    cursor.execute(query, (patient_id,))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    related = []
+    for row in rows:
+        if row[key] is None:
+            continue
+        row = dict(row)
+        del row["_patient_id"]
+        related.append(row)
+    return related
+
+
 # Update patient information (link DischargeID or ConditionID)
 # Available to Doctor-1.4
 @patients.route("/<int:patient_id>", methods=["PUT"])
+@bumps("patient")
 def update_patient(patient_id):
     try:
         data = request.get_json()
@@ -78,6 +457,11 @@ def update_patient(patient_id):
         db.get_db().commit()
         cursor.close()
         
+        # a relinked chart changes the vitals the patient is scored on, and
+        # a relinked visit or discharge can admit or discharge them
+        if {"VitalID", "VisitID", "DischargeID"} & data.keys():
+            census_scores.invalidate([patient_id])
+        
         return jsonify({"message": "Patient updated successfully"}), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
@@ -86,28 +470,18 @@ def update_patient(patient_id):
 # Get medications associated with a patient (via Patient_Medications join)
 # Available to Patient-3.5 and Proxy-4.4
 @patients.route("/<int:patient_id>/medications", methods=["GET"])
+@conditional("patient", "medication")
 def get_patient_medications(patient_id):
     try:
         cursor = db.get_db().cursor()
         
-        # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get patient medications with medication details
-        query = """
-        SELECT pm.*, m.PrescriptionName, m.DosageAmount, m.DosageUnit, 
-               m.PickUpLocation, m.RefillsLeft, m.FrequencyAmount, m.FrequencyPeriod
-        FROM Patient_Medications pm
-        JOIN Medication m ON pm.MedicationID = m.MedicationID
-        WHERE pm.PatientID = %s
-        """
-        cursor.execute(query, (patient_id,))
-        medications = cursor.fetchall()
+        rows = fetch_patient_related(cursor, patient_id, "medications")
         cursor.close()
         
-        return jsonify(medications), 200
+        if rows is None:
+            return jsonify({"error": "Patient not found"}), 404
+        
+        return jsonify(rows), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
@@ -115,21 +489,18 @@ def get_patient_medications(patient_id):
 # Get proxy information if one exists for the patient
 # Available to Proxy-4.1
 @patients.route("/<int:patient_id>/proxy", methods=["GET"])
+@conditional("patient", "proxy")
 def get_patient_proxy(patient_id):
     try:
         cursor = db.get_db().cursor()
         
-        # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get proxy information
-        cursor.execute("SELECT * FROM Proxy WHERE PatientID = %s", (patient_id,))
-        proxies = cursor.fetchall()
+        rows = fetch_patient_related(cursor, patient_id, "proxies")
         cursor.close()
         
-        return jsonify(proxies), 200
+        if rows is None:
+            return jsonify({"error": "Patient not found"}), 404
+        
+        return jsonify(rows), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
@@ -137,59 +508,89 @@ def get_patient_proxy(patient_id):
 # Get patient's current visit (using Patient.VisitID as FK)
 # Available to Patient-3.6 and Proxy-4.2
 @patients.route("/<int:patient_id>/visit", methods=["GET"])
+@conditional("patient", "visit")
 def get_patient_visit(patient_id):
     try:
         cursor = db.get_db().cursor()
         
-        # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get patient's current visit
-        query = """
-        SELECT v.* FROM Visits v
-        JOIN Patient p ON v.VisitID = p.VisitID
-        WHERE p.PatientID = %s
-        """
-        cursor.execute(query, (patient_id,))
-        visit = cursor.fetchone()
+        rows = fetch_patient_related(cursor, patient_id, "visit")
         cursor.close()
         
-        if not visit:
+        if rows is None:
+            return jsonify({"error": "Patient not found"}), 404
+        if not rows:
             return jsonify({"message": "No visit found for this patient"}), 404
             
-        return jsonify(visit), 200
+        return jsonify(rows[0]), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
 
-# Get patient's current vitals (via Patient.VitalID FK)
+# Get patient's current vitals (VitalLatest, or the chart linked via Patient.VitalID)
+# With ?from= and/or ?to= returns the recorded series for that time range
+# instead, oldest first and keyset-paginated on RecordedAt
 # Available to Doctor-1.2 and Nurse-2.1
 @patients.route("/<int:patient_id>/vitals", methods=["GET"])
+@conditional("patient", "vital")
 def get_patient_vitals(patient_id):
     try:
+        if request.args.get("from") or request.args.get("to"):
+            return get_patient_vital_series(patient_id)
+        
         cursor = db.get_db().cursor()
         
-        # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
+        rows = fetch_patient_related(cursor, patient_id, "vitals")
+        cursor.close()
+        
+        if rows is None:
+            return jsonify({"error": "Patient not found"}), 404
+        
+        return jsonify(rows), 200
+    except (VitalsRangeError, PaginationError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def get_patient_vital_series(patient_id):
+    # Range scan on the (PatientID, RecordedAt) clustered primary key
+    select = f"SELECT {', '.join(READING_COLUMNS)} FROM VitalReading"
+    conditions, params = reading_range(request.args)
+    where = ["PatientID = %s"] + conditions
+    params = [patient_id] + params
+    
+    fmt = stream_format()
+    if fmt:
+        return stream_keyset(select, ["RecordedAt"], where=where, params=params, fmt=fmt), 200
+    
+    cursor = db.get_db().cursor()
+    page = keyset_page(cursor, select, ["RecordedAt"], where=where, params=params)
+    
+    if not page["rows"]:
+        cursor.execute("SELECT PatientID FROM Patient WHERE PatientID = %s", (patient_id,))
         if not cursor.fetchone():
+            cursor.close()
             return jsonify({"error": "Patient not found"}), 404
+    cursor.close()
+    
+    current_app.logger.info(f'Retrieved {len(page["rows"])} vital readings for patient {patient_id}')
+    return page_response(page), 200
+
+
+# Get patient's most recent vital reading (one primary-key lookup)
+@patients.route("/<int:patient_id>/vitals/latest", methods=["GET"])
+@conditional("patient", "vital")
+def get_patient_latest_vitals(patient_id):
+    try:
+        cursor = db.get_db().cursor()
         
-        # Get patient's current vitals - return all vitals for the patient
-        query = """
-        SELECT v.* FROM VitalChart v
-        JOIN Patient p ON v.VitalID = p.VitalID
-        WHERE p.PatientID = %s
-        """
-        cursor.execute(query, (patient_id,))
-        vitals = cursor.fetchall()
+        reading = latest_reading(cursor, patient_id)
         cursor.close()
         
-        if not vitals:
-            return jsonify([]), 200  # Return empty list instead of error
-            
-        return jsonify(vitals), 200
+        if not reading:
+            return jsonify({"error": "No vitals recorded for this patient"}), 404
+        
+        return jsonify(reading), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
@@ -197,29 +598,20 @@ def get_patient_vitals(patient_id):
 # Get patient's condition (via Patient.ConditionID FK)
 # Available to Doctor-1.1 and Proxy-4.3
 @patients.route("/<int:patient_id>/condition", methods=["GET"])
+@conditional("patient", "condition")
 def get_patient_condition(patient_id):
     try:
         cursor = db.get_db().cursor()
         
-        # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get patient's condition
-        query = """
-        SELECT c.* FROM `Condition` c
-        JOIN Patient p ON c.ConditionID = p.ConditionID
-        WHERE p.PatientID = %s
-        """
-        cursor.execute(query, (patient_id,))
-        condition = cursor.fetchone()
+        rows = fetch_patient_related(cursor, patient_id, "condition")
         cursor.close()
         
-        if not condition:
+        if rows is None:
+            return jsonify({"error": "Patient not found"}), 404
+        if not rows:
             return jsonify({"message": "No condition found for this patient"}), 404
             
-        return jsonify(condition), 200
+        return jsonify(rows[0]), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
@@ -227,29 +619,20 @@ def get_patient_condition(patient_id):
 # Get patient's discharge (via Patient.DischargeID FK)
 # Available to Patient-3.2 and Proxy-4.5
 @patients.route("/<int:patient_id>/discharge", methods=["GET"])
+@conditional("patient", "discharge")
 def get_patient_discharge(patient_id):
     try:
         cursor = db.get_db().cursor()
         
-        # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get patient's discharge information
-        query = """
-        SELECT d.* FROM Discharge d
-        JOIN Patient p ON d.DischargeID = p.DischargeID
-        WHERE p.PatientID = %s
-        """
-        cursor.execute(query, (patient_id,))
-        discharge = cursor.fetchone()
+        rows = fetch_patient_related(cursor, patient_id, "discharge")
         cursor.close()
         
-        if not discharge:
+        if rows is None:
+            return jsonify({"error": "Patient not found"}), 404
+        if not rows:
             return jsonify({"message": "No discharge found for this patient"}), 404
             
-        return jsonify(discharge), 200
+        return jsonify(rows[0]), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
@@ -257,29 +640,20 @@ def get_patient_discharge(patient_id):
 # Get patient's doctor (via Patient.DoctorID FK)
 # Available to Patient-3.4 and Proxy-4.6
 @patients.route("/<int:patient_id>/doctor", methods=["GET"])
+@conditional("patient", "doctor")
 def get_patient_doctor(patient_id):
     try:
         cursor = db.get_db().cursor()
         
-        # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get patient's doctor
-        query = """
-        SELECT d.* FROM Doctor d
-        JOIN Patient p ON d.DoctorID = p.DoctorID
-        WHERE p.PatientID = %s
-        """
-        cursor.execute(query, (patient_id,))
-        doctor = cursor.fetchone()
+        rows = fetch_patient_related(cursor, patient_id, "doctor")
         cursor.close()
         
-        if not doctor:
+        if rows is None:
+            return jsonify({"error": "Patient not found"}), 404
+        if not rows:
             return jsonify({"message": "No doctor assigned to this patient"}), 404
             
-        return jsonify(doctor), 200
+        return jsonify(rows[0]), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
@@ -287,57 +661,39 @@ def get_patient_doctor(patient_id):
 # Get patient's nurse (via Patient.NurseID FK)
 # Available to Proxy-4.6
 @patients.route("/<int:patient_id>/nurse", methods=["GET"])
+@conditional("patient", "nurse")
 def get_patient_nurse(patient_id):
     try:
         cursor = db.get_db().cursor()
         
-        # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get patient's nurse
-        query = """
-        SELECT n.* FROM Nurse n
-        JOIN Patient p ON n.NurseID = p.NurseID
-        WHERE p.PatientID = %s
-        """
-        cursor.execute(query, (patient_id,))
-        nurse = cursor.fetchone()
+        rows = fetch_patient_related(cursor, patient_id, "nurse")
         cursor.close()
         
-        if not nurse:
+        if rows is None:
+            return jsonify({"error": "Patient not found"}), 404
+        if not rows:
             return jsonify({"message": "No nurse assigned to this patient"}), 404
             
-        return jsonify(nurse), 200
+        return jsonify(rows[0]), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
 
 
 # Get patient's insurance (via Patient.InsuranceID FK)
 @patients.route("/<int:patient_id>/insurance", methods=["GET"])
+@conditional("patient", "insurance")
 def get_patient_insurance(patient_id):
     try:
         cursor = db.get_db().cursor()
         
-        # Check if patient exists
-        cursor.execute("SELECT * FROM Patient WHERE PatientID = %s", (patient_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Patient not found"}), 404
-        
-        # Get patient's insurance
-        query = """
-        SELECT i.* FROM Insurance i
-        JOIN Patient p ON i.InsuranceID = p.InsuranceID
-        WHERE p.PatientID = %s
-        """
-        cursor.execute(query, (patient_id,))
-        insurance = cursor.fetchone()
+        rows = fetch_patient_related(cursor, patient_id, "insurance")
         cursor.close()
         
-        if not insurance:
+        if rows is None:
+            return jsonify({"error": "Patient not found"}), 404
+        if not rows:
             return jsonify({"message": "No insurance found for this patient"}), 404
             
-        return jsonify(insurance), 200
+        return jsonify(rows[0]), 200
     except Error as e:
         return jsonify({"error": str(e)}), 500
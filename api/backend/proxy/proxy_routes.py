@@ -2,6 +2,9 @@
 
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import conditional
+from backend.batch import parse_batch_ids, fetch_by_ids, batch_response, BatchError
+from backend.pagination import keyset_page, page_response, PaginationError
 from mysql.connector import Error
 from flask import current_app
 
@@ -11,24 +14,48 @@ proxies = Blueprint("proxies", __name__)
 
 # Get all proxies
 @proxies.route("/", methods=["GET"])
+@conditional("proxy")
 def get_all_proxies():
     try:
         current_app.logger.info('Starting get_all_proxies request')
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM Proxy")
-        proxies_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM Proxy", ["ProxyID"])
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(proxies_data)} proxies')
-        return jsonify(proxies_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} proxies')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_proxies: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
+# Get several proxies by ID in one query
+# GET /batch?ids=1,2,3 or POST /batch with {"ids": [1, 2, 3]}
+@proxies.route("/batch", methods=["GET", "POST"])
+@conditional("proxy")
+def get_proxies_batch():
+    try:
+        ids = parse_batch_ids()
+        cursor = db.get_db().cursor()
+        
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM Proxy", "ProxyID", ids)
+        cursor.close()
+        
+        current_app.logger.info(f'Batch fetched {len(rows_by_id)} of {len(ids)} proxies')
+        return batch_response(rows_by_id, ids), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_proxies_batch: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Get a specific proxy with FirstName, LastName, and Relationship
 @proxies.route("/<int:proxy_id>", methods=["GET"])
+@conditional("proxy")
 def get_proxy(proxy_id):
     try:
         cursor = db.get_db().cursor()
@@ -47,6 +74,7 @@ def get_proxy(proxy_id):
 
 # Get proxy by name (FirstName and LastName)
 @proxies.route("/name/<string:first_name>/<string:last_name>", methods=["GET"])
+@conditional("proxy")
 def get_proxy_by_name(first_name, last_name):
     try:
         cursor = db.get_db().cursor()
@@ -66,6 +94,7 @@ def get_proxy_by_name(first_name, last_name):
 # Get all patients where Proxy.PatientID matches
 # Available to Proxy-4.1 through 4.6
 @proxies.route("/<int:proxy_id>/patients", methods=["GET"])
+@conditional("proxy", "patient")
 def get_proxy_patients(proxy_id):
     try:
         cursor = db.get_db().cursor()
@@ -1,10 +1,11 @@
-from flask import Flask
+from flask import Flask, jsonify, g
 from dotenv import load_dotenv
 import os
+import time
 import logging
 from logging.handlers import RotatingFileHandler
 
-from backend.db_connection import db
+from backend.db_connection import db, PoolTimeout
 from backend.patient.patient_routes import patients
 from backend.visit.visit_routes import visits
 from backend.vital.vital_routes import vitals
@@ -17,6 +18,8 @@ from backend.nurse.nurse_routes import nurses
 from backend.proxy.proxy_routes import proxies
 from backend.message.message_routes import messages
 from backend.alert.alert_routes import alerts
+from backend.metrics.metrics_routes import metrics
+from backend.events.events_routes import events
 
 def create_app():
     app = Flask(__name__)
@@ -48,10 +51,38 @@ def create_app():
         "DB_NAME"
     ).strip()  # Change this to your DB name
 
+    # Connection pool sizing is per API worker process. Either set
+    # DB_POOL_SIZE directly, or set DB_MAX_CONNECTIONS (the share of the
+    # MySQL max_connections budget this service may use) and let it be
+    # split evenly across WEB_CONCURRENCY workers.
+    app.config["MYSQL_POOL_SIZE"] = pool_size_per_worker()
+    app.config["MYSQL_POOL_TIMEOUT"] = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+    app.config["MYSQL_POOL_IDLE_TIMEOUT"] = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+    app.config["MYSQL_POOL_PING_AFTER"] = float(os.getenv("DB_POOL_PING_AFTER", "30"))
+
     # Initialize the database object with the settings above.
     app.logger.info("current_app(): starting the database connection")
     db.init_app(app)
 
+    # A saturated pool is a capacity problem, not a server bug
+    @app.errorhandler(PoolTimeout)
+    def handle_pool_timeout(e):
+        app.logger.error(f'Database pool exhausted: {str(e)}')
+        return jsonify({"error": str(e)}), 503
+
+    # Report per-request handler time in a Server-Timing header so route
+    # latency can be compared before/after query changes from any client
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing(response):
+        if "request_started" in g:
+            elapsed_ms = (time.perf_counter() - g.request_started) * 1000
+            response.headers["Server-Timing"] = f"app;dur={elapsed_ms:.2f}"
+        return response
+
     # Register the routes from each Blueprint with the app object
     # and give a url prefix to each
     app.logger.info("create_app(): registering blueprints with Flask app object.")
@@ -69,10 +100,27 @@ def create_app():
     app.register_blueprint(proxies, url_prefix="/proxy")
     app.register_blueprint(messages, url_prefix="/message")
     app.register_blueprint(alerts, url_prefix="/alert")
+    app.register_blueprint(metrics, url_prefix="/metrics")
+    app.register_blueprint(events, url_prefix="/stream")
 
     # Don't forget to return the app object
     return app
 
+def pool_size_per_worker():
+    """
+    Work out how many pooled MySQL connections each API worker may hold.
+
+    Returns:
+        DB_POOL_SIZE if set, otherwise DB_MAX_CONNECTIONS divided across
+        WEB_CONCURRENCY workers (at least 1), otherwise 10
+    """
+    if os.getenv("DB_POOL_SIZE"):
+        return int(os.getenv("DB_POOL_SIZE").strip())
+    if os.getenv("DB_MAX_CONNECTIONS"):
+        workers = int(os.getenv("WEB_CONCURRENCY", "1").strip())
+        return max(1, int(os.getenv("DB_MAX_CONNECTIONS").strip()) // max(1, workers))
+    return 10
+
 def setup_logging(app):
     """
     Configure logging for the Flask application in both files and console (Docker Desktop for this project)
@@ -0,0 +1,398 @@
+#------------------------------------------------------------
+# Search helpers: in-process trigram and prefix indexes for
+# ranked name search and autocomplete, and the query-string
+# parsing shared by the MySQL FULLTEXT search routes
+#------------------------------------------------------------
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+from flask import current_app
+from pymysql import cursors
+
+from backend.db_connection import db
+
+
+class SearchError(ValueError):
+    """Raised for a missing search term or malformed search filters."""
+    pass
+
+
+def fulltext_boolean_query(text):
+    """
+    Turn free text into a MySQL BOOLEAN MODE query of prefix terms.
+
+    "chest pai" becomes "chest* pai*": any term may match, rows matching
+    more terms rank higher, and a trailing * keeps short or partially typed
+    words (which MySQL would otherwise drop) searchable.
+    """
+    words = re.findall(r"[0-9A-Za-z]+", text or "")
+    if not words:
+        raise SearchError("q parameter is required")
+    return " ".join(f"{word}*" for word in words)
+
+
+def time_window(args, column):
+    """
+    Build SentTime-style range conditions from ?from= and ?to=.
+
+    Both accept ISO dates or datetimes ("2024-08-01", "2024-08-01T10:00").
+
+    Returns:
+        (conditions, params)
+    """
+    conditions = []
+    params = []
+    for arg, op in (("from", ">="), ("to", "<=")):
+        if args.get(arg):
+            try:
+                params.append(datetime.fromisoformat(args[arg]))
+            except ValueError:
+                raise SearchError(f"{arg} must be an ISO date or datetime")
+            conditions.append(f"{column} {op} %s")
+    return conditions, params
+
+
+def int_list(args, name):
+    """Parse a comma-separated list of integers from the query string."""
+    try:
+        return [int(value) for value in args.get(name, "").split(",") if value.strip()]
+    except ValueError:
+        raise SearchError(f"{name} must be a comma-separated list of integers")
+
+
+def normalize(text):
+    """Lowercase and reduce to letters, digits and single spaces."""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", (text or "").lower()).split())
+
+
+def trigrams(text):
+    """
+    Trigrams of each word, padded like pg_trgm ("  j", " jo", "joe", "oe ").
+
+    The two-space lead-in makes prefixes match: "jo" shares "  j" and " jo"
+    with every name starting with "jo".
+    """
+    grams = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Maps document IDs to short strings and ranks them against a query.
+
+    Postings are stored as int32 arrays so candidate counting can be done
+    with a single numpy bincount instead of a Python loop over postings.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._texts = {}
+        self._max_id = 0
+
+    def __len__(self):
+        return len(self._texts)
+
+    @property
+    def max_id(self):
+        return self._max_id
+
+    def add(self, doc_id, text):
+        """Insert or replace the text for `doc_id`."""
+        with self._lock:
+            old = self._texts.get(doc_id)
+            self._texts[doc_id] = normalize(text)
+            # only new trigrams get postings; stale ones from a previous
+            # text are harmless because candidates are rescored exactly
+            grams = trigrams(text) - (trigrams(old) if old is not None else set())
+            for gram in grams:
+                self._postings.setdefault(gram, array("i")).append(doc_id)
+            self._max_id = max(self._max_id, doc_id)
+
+    def search(self, query, k=10, min_similarity=0.2):
+        """
+        Return up to k (doc_id, score) pairs, best first.
+
+        Score is trigram similarity (shared / union, as in pg_trgm) plus a
+        bonus when a word of the text starts with a word of the query, so
+        "jo" ranks "John" above "Marjorie".
+        """
+        query_grams = trigrams(query)
+        query_words = normalize(query).split()
+        if not query_grams:
+            return []
+
+        with self._lock:
+            lists = [self._postings[g] for g in query_grams if g in self._postings]
+            if not lists:
+                return []
+            hits = np.concatenate([np.frombuffer(postings, dtype=np.int32) for postings in lists])
+            counts = np.bincount(hits, minlength=self._max_id + 1)
+
+            # shortlist the best-overlapping documents, then rescore exactly
+            shortlist = min(len(counts), max(k * 20, 200))
+            candidates = np.argpartition(counts, -shortlist)[-shortlist:]
+            candidates = candidates[counts[candidates] > 0]
+            texts = {int(doc_id): self._texts.get(int(doc_id)) for doc_id in candidates}
+
+        results = []
+        for doc_id, text in texts.items():
+            if text is None:
+                continue
+            doc_grams = trigrams(text)
+            shared = len(query_grams & doc_grams)
+            similarity = shared / len(query_grams | doc_grams)
+            words = text.split()
+            prefix_hits = sum(1 for q in query_words if any(w.startswith(q) for w in words))
+            score = similarity + 0.5 * prefix_hits / len(query_words)
+            if similarity >= min_similarity or prefix_hits:
+                results.append((doc_id, round(score, 4)))
+
+        results.sort(key=lambda result: (-result[1], result[0]))
+        return results[:k]
+
+
+def prefix_key(text):
+    """
+    Autocomplete key: lowercase with runs of whitespace collapsed, the
+    same comparison the catalog's unique key makes, so decimal points and
+    punctuation are kept ("0.5 mg" stays "0.5 mg").
+    """
+    return " ".join((text or "").lower().split())
+
+
+def key_text(value):
+    """
+    Column value as prefix_key() text. DECIMALs lose their trailing zeros
+    (10.00 -> "10", 0.50 -> "0.5"), which still gives one text per value.
+    """
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    return str(value)
+
+
+class PrefixIndex:
+    """
+    Sorted keys for autocomplete, with a stored payload per document.
+
+    Each document is keyed by its whole text and by the text from each
+    later word on, so "chlor" finds "Potassium Chloride" and multi-word
+    prefixes like "potassium ch" still match. A lookup is a bisect into
+    the sorted keys followed by a scan of at most k matches.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs = {}
+        self._starts = []  # (whole key, doc_id), sorted
+        self._words = []   # (key from a later word on, doc_id), sorted
+        self._max_id = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    @property
+    def max_id(self):
+        return self._max_id
+
+    @staticmethod
+    def _entries(doc_id, key):
+        words = key.split()
+        return (key, doc_id), [(" ".join(words[i:]), doc_id) for i in range(1, len(words))]
+
+    def _discard(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        start, words = self._entries(doc_id, doc[0])
+        for entries, entry in [(self._starts, start)] + [(self._words, word) for word in words]:
+            position = bisect_left(entries, entry)
+            if position < len(entries) and entries[position] == entry:
+                del entries[position]
+
+    def add(self, doc_id, text, payload=None):
+        """Insert or replace `doc_id`; search() returns `payload` for it."""
+        key = prefix_key(text)
+        with self._lock:
+            self._discard(doc_id)
+            self._docs[doc_id] = (key, payload)
+            start, words = self._entries(doc_id, key)
+            insort(self._starts, start)
+            for word in words:
+                insort(self._words, word)
+            self._max_id = max(self._max_id, doc_id)
+
+    def extend(self, docs):
+        """Bulk add or replace (doc_id, text, payload) documents, sorting once."""
+        docs = {doc[0]: doc for doc in docs}.values()
+        with self._lock:
+            # drop replaced documents while the lists are still sorted
+            for doc_id, _, _ in docs:
+                self._discard(doc_id)
+            for doc_id, text, payload in docs:
+                key = prefix_key(text)
+                self._docs[doc_id] = (key, payload)
+                start, words = self._entries(doc_id, key)
+                self._starts.append(start)
+                self._words.extend(words)
+                self._max_id = max(self._max_id, doc_id)
+            self._starts.sort()
+            self._words.sort()
+
+    def search(self, prefix, k=10):
+        """
+        Return up to k (doc_id, payload) pairs whose text starts with
+        `prefix`, then those with a later word starting with it, each
+        group in key order.
+        """
+        key = prefix_key(prefix)
+        if not key:
+            return []
+        results = []
+        seen = set()
+        with self._lock:
+            for entries in (self._starts, self._words):
+                position = bisect_left(entries, (key,))
+                while position < len(entries) and len(results) < k:
+                    entry_key, doc_id = entries[position]
+                    if not entry_key.startswith(key):
+                        break
+                    if doc_id not in seen:
+                        seen.add(doc_id)
+                        results.append((doc_id, self._docs[doc_id][1]))
+                    position += 1
+        return results
+
+
+class TableNameIndex:
+    """
+    A TrigramIndex over one table's name columns, loaded from MySQL.
+
+    The index is built on first use in each worker process. Afterwards rows
+    with a higher primary key than any indexed row are pulled in every
+    `refresh_interval` seconds (a cheap PK range scan), and every
+    `rebuild_interval` seconds a fresh index is built on a background
+    thread to pick up edits and deletes, then swapped in. Requests keep
+    searching the old index while that runs.
+    """
+
+    index_class = TrigramIndex
+
+    def __init__(self, table, id_column, name_columns, refresh_interval=30, rebuild_interval=3600):
+        self.table = table
+        self.id_column = id_column
+        self.name_columns = name_columns
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self._index = None
+        self._built_at = 0.0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._pending = None  # writes to replay onto an index being rebuilt
+        self._logger = None
+
+    def _load(self, conn, index, after_id=0):
+        cursor = conn.cursor(cursors.SSCursor)
+        try:
+            cursor.execute(
+                f"SELECT {self.id_column}, {', '.join(self.name_columns)} FROM {self.table} "
+                f"WHERE {self.id_column} > %s",
+                (after_id,),
+            )
+            while True:
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    break
+                for row in rows:
+                    index.add(row[0], " ".join(part or "" for part in row[1:]))
+        finally:
+            cursor.close()
+
+    def _rebuild(self):
+        try:
+            index = self.index_class()
+            with db.connection() as conn:
+                self._load(conn, index)
+            with self._lock:
+                for op, args in self._pending:
+                    getattr(index, op)(*args)
+                self._index = index
+                self._built_at = self._refreshed_at = time.monotonic()
+        except Exception as e:
+            self._logger.error(f'Rebuilding the {self.table} search index failed: {str(e)}')
+            with self._lock:
+                # try again after the next refresh interval, not every request
+                self._built_at = time.monotonic() - self.rebuild_interval + self.refresh_interval
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def ensure_fresh(self, conn):
+        now = time.monotonic()
+        with self._lock:
+            if self._index is None:
+                # nothing to serve yet, so the first request builds it
+                index = self.index_class()
+                self._load(conn, index)
+                self._index = index
+                self._built_at = self._refreshed_at = now
+                return index
+            if now - self._built_at > self.rebuild_interval and self._pending is None:
+                self._pending = []
+                self._logger = current_app.logger
+                threading.Thread(target=self._rebuild, name=f"{self.table}-index", daemon=True).start()
+            if now - self._refreshed_at > self.refresh_interval:
+                self._load(conn, self._index, self._index.max_id)
+                self._refreshed_at = now
+            return self._index
+
+    def search(self, conn, query, k=10):
+        return self.ensure_fresh(conn).search(query, k)
+
+    def _apply(self, op, *args):
+        # a write landing while a rebuild runs is also replayed onto the
+        # new index, which may have read the table before it committed
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((op, args))
+            index = self._index
+        if index is not None:
+            getattr(index, op)(*args)
+
+
+class TablePrefixIndex(TableNameIndex):
+    """
+    A PrefixIndex over one table for autocomplete, kept fresh the same way
+    as TableNameIndex. Whole rows are held as payloads, so lookups are
+    answered from memory without a query; meant for small catalogs.
+    """
+
+    index_class = PrefixIndex
+
+    def _load(self, conn, index, after_id=0):
+        cursor = conn.cursor(cursors.SSDictCursor)
+        try:
+            cursor.execute(f"SELECT * FROM {self.table} WHERE {self.id_column} > %s", (after_id,))
+            while True:
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    break
+                index.extend((row[self.id_column], self._text(row), row) for row in rows)
+        finally:
+            cursor.close()
+
+    def _text(self, row):
+        return " ".join(key_text(row[column]) for column in self.name_columns if row[column] is not None)
+
+    def upsert(self, row):
+        """Add or replace a row written through the API so it is searchable at once."""
+        self._apply("add", row[self.id_column], self._text(row), row)
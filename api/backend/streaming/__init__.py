@@ -0,0 +1,102 @@
+#------------------------------------------------------------
+# Streamed JSON / NDJSON responses read off an unbuffered
+# server-side cursor, so large exports never sit in API memory
+#------------------------------------------------------------
+from flask import Response, current_app, request, stream_with_context
+from pymysql import cursors
+
+from backend.db_connection import db
+from backend.pagination import PaginationError, keyset_query
+
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Rows pulled off the socket per fetchmany(); bounds memory per chunk
+STREAM_BATCH_SIZE = 500
+
+
+def stream_format():
+    """
+    Decide whether the caller asked for a streamed response.
+
+    Returns:
+        "ndjson" for Accept: application/x-ndjson, "json" for ?stream=true
+        (a streamed JSON array), or None for a normal buffered response
+    """
+    # only an explicit preference counts; */* keeps the buffered default
+    accept = request.accept_mimetypes
+    if accept[NDJSON_MIMETYPE] > accept["application/json"]:
+        return "ndjson"
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return "json"
+    return None
+
+
+def stream_rows(query, params=None, fmt="ndjson"):
+    """
+    Execute `query` on an SSDictCursor and stream the rows as they arrive.
+
+    The query is executed before the response starts so SQL errors still
+    surface as normal error responses rather than a truncated body.
+    """
+    cursor = db.get_db().cursor(cursors.SSDictCursor)
+    try:
+        cursor.execute(query, params or ())
+    except Exception:
+        cursor.close()
+        raise
+
+    json_provider = current_app.json
+
+    def dumps(row):
+        return json_provider.dumps(row, separators=(",", ":"))
+
+    def generate():
+        try:
+            first = True
+            if fmt == "json":
+                yield "["
+            while True:
+                rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                if fmt == "json":
+                    chunk = ",".join(dumps(row) for row in rows)
+                    yield chunk if first else "," + chunk
+                else:
+                    yield "".join(dumps(row) + "\n" for row in rows)
+                first = False
+            if fmt == "json":
+                yield "]"
+        finally:
+            # closing an SSCursor drains any unread rows, which keeps the
+            # pooled connection usable if the client hung up mid-stream
+            cursor.close()
+
+    mimetype = NDJSON_MIMETYPE if fmt == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def stream_keyset(select, keys, where=None, params=None, descending=False, fmt="ndjson"):
+    """
+    Stream a whole keyset-ordered result, resuming after ?after= if given.
+
+    Uses the same ordering and cursors as keyset_page(), so a client that
+    lost its connection can resume from the last row it received. An
+    explicit ?limit= is honoured; otherwise the full result is streamed.
+    """
+    if request.args.get("before"):
+        raise PaginationError("before is not supported for streamed responses")
+    limit = request.args.get("limit")
+    try:
+        limit = int(limit) if limit is not None else None
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit is not None and limit < 1:
+        raise PaginationError("limit must be at least 1")
+
+    query, query_params = keyset_query(
+        select, keys, where, params, descending,
+        token=request.args.get("after"), limit=limit
+    )
+    return stream_rows(query, query_params, fmt)
@@ -0,0 +1,218 @@
+#------------------------------------------------------------
+# Per-patient vitals series: the append-only VitalReading table,
+# the VitalLatest row kept next to it for O(1) lookups, and the
+# VitalRollup buckets maintained from the same writes
+#------------------------------------------------------------
+from datetime import datetime
+
+from pymysql.constants import ER
+from pymysql.err import IntegrityError
+
+from backend.timeseries.rollups import RESOLUTIONS, ROLLUP_METRICS, apply_rollups
+
+
+# Measurement columns shared by VitalReading, VitalLatest and VitalChart.
+# BloodPressure is the legacy "120/80" string, kept alongside Systolic and
+# Diastolic while clients move over.
+READING_FIELDS = ["HeartRate", "BloodPressure", "RespiratoryRate", "Temperature", "Systolic", "Diastolic"]
+
+READING_COLUMNS = ["PatientID", "RecordedAt"] + READING_FIELDS
+
+# A plain INSERT: re-sending a reading (same patient and timestamp) keeps
+# the stored copy, so monitor retries are idempotent and the series,
+# VitalLatest and the rollups always agree
+INSERT_READING = f"""
+INSERT INTO VitalReading ({', '.join(READING_COLUMNS)})
+VALUES ({', '.join(['%s'] * len(READING_COLUMNS))})
+"""
+
+# Late (back-dated) readings must not replace a newer latest value.
+# MySQL applies the assignments left to right, so RecordedAt goes last
+# and every field compares against the old timestamp.
+UPSERT_LATEST = f"""
+INSERT INTO VitalLatest ({', '.join(READING_COLUMNS)})
+VALUES ({', '.join(['%s'] * len(READING_COLUMNS))})
+ON DUPLICATE KEY UPDATE
+    {', '.join(f'{f} = IF(VALUES(RecordedAt) >= RecordedAt, VALUES({f}), {f})' for f in READING_FIELDS)},
+    RecordedAt = GREATEST(RecordedAt, VALUES(RecordedAt))
+"""
+
+
+class VitalsRangeError(ValueError):
+    """Raised for a malformed from/to time range."""
+    pass
+
+
+def parse_timestamp(value, name):
+    """
+    Parse an ISO date or datetime value.
+
+    Timestamps with an offset (e.g. a monitor sending "...Z") are converted
+    to server-local time, which is how every DATETIME here is stored.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise VitalsRangeError(f"{name} must be an ISO date or datetime")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def reading_range(args, column="RecordedAt"):
+    """
+    Read ?from= and ?to= into half-open [from, to) conditions on `column`.
+
+    Returns:
+        (conditions, params) to AND into a VitalReading query
+    """
+    conditions = []
+    params = []
+    bounds = {}
+    for arg, op in (("from", ">="), ("to", "<")):
+        if args.get(arg):
+            bounds[arg] = parse_timestamp(args[arg], arg)
+            conditions.append(f"{column} {op} %s")
+            params.append(bounds[arg])
+    if "from" in bounds and "to" in bounds and bounds["from"] >= bounds["to"]:
+        raise VitalsRangeError("from must be earlier than to")
+    return conditions, params
+
+
+def _existing_keys(cursor, readings):
+    # one PK range probe per patient covering the batch's time span; a
+    # locking read, so no other transaction can insert into those ranges
+    # before this one does
+    spans = {}
+    for patient_id, recorded_at, *_ in readings:
+        low, high = spans.get(patient_id, (recorded_at, recorded_at))
+        spans[patient_id] = (min(low, recorded_at), max(high, recorded_at))
+    conditions = " OR ".join(["(PatientID = %s AND RecordedAt BETWEEN %s AND %s)"] * len(spans))
+    params = [value for patient_id, span in spans.items() for value in (patient_id, *span)]
+    cursor.execute(f"SELECT PatientID, RecordedAt FROM VitalReading WHERE {conditions} FOR SHARE", params)
+    return {(row["PatientID"], row["RecordedAt"]) for row in cursor.fetchall()}
+
+
+def record_readings(cursor, readings):
+    """
+    Append readings to the series, advance each patient's latest row and
+    merge the new readings into the rollups.
+
+    Readings whose (PatientID, RecordedAt) is already stored are resends
+    and are skipped everywhere.
+
+    Args:
+        cursor: open cursor; the caller commits
+        readings: list of (PatientID, RecordedAt, HeartRate, BloodPressure,
+                  RespiratoryRate, Temperature, Systolic, Diastolic) tuples
+                  with distinct (PatientID, RecordedAt) keys
+
+    Returns:
+        number of readings stored
+    """
+    if not readings:
+        return 0
+    # RecordedAt is stored to the millisecond; truncate here so resends
+    # compare equal to what is already stored
+    readings = [
+        (r[0], r[1].replace(microsecond=r[1].microsecond // 1000 * 1000), *r[2:])
+        for r in readings
+    ]
+    # Live monitor batches are all new, so the batch is inserted as is.
+    # A duplicate key means it holds resends: the partial insert is undone
+    # and only the readings not stored yet go in.
+    cursor.execute("SAVEPOINT record_readings")
+    try:
+        # pymysql rewrites these into multi-row INSERTs
+        cursor.executemany(INSERT_READING, readings)
+        fresh = readings
+    except IntegrityError as e:
+        if e.args[0] != ER.DUP_ENTRY:
+            raise
+        cursor.execute("ROLLBACK TO SAVEPOINT record_readings")
+        existing = _existing_keys(cursor, readings)
+        fresh = [r for r in readings if (r[0], r[1]) not in existing]
+        if fresh:
+            cursor.executemany(INSERT_READING, fresh)
+    cursor.execute("RELEASE SAVEPOINT record_readings")
+    if not fresh:
+        return 0
+
+    # only the newest reading per patient in this batch can win
+    newest = {}
+    for reading in fresh:
+        current = newest.get(reading[0])
+        if current is None or reading[1] >= current[1]:
+            newest[reading[0]] = reading
+    cursor.executemany(UPSERT_LATEST, list(newest.values()))
+
+    apply_rollups(cursor, fresh)
+    return len(fresh)
+
+
+def latest_reading(cursor, patient_id):
+    """Return a patient's newest reading (one primary-key lookup) or None."""
+    cursor.execute(
+        f"SELECT {', '.join(READING_COLUMNS)} FROM VitalLatest WHERE PatientID = %s",
+        (patient_id,),
+    )
+    return cursor.fetchone()
+
+
+def parse_resolution(value):
+    """Map ?resolution= (1m, 15m, 1h) to a bucket width in seconds."""
+    if value not in RESOLUTIONS:
+        raise VitalsRangeError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+    return RESOLUTIONS[value]
+
+
+def rollup_select():
+    """SELECT for VitalRollup exposing min/max/mean/last per metric."""
+    stats = []
+    for metric in ROLLUP_METRICS:
+        stats += [
+            f"{metric}Min",
+            f"{metric}Max",
+            f"{metric}Sum / NULLIF({metric}Count, 0) AS {metric}Mean",
+            f"{metric}Last",
+        ]
+    return f"SELECT PatientID, BucketStart, SampleCount, LastAt, {', '.join(stats)} FROM VitalRollup"
+
+
+# Raw readings pulled per query while rebuilding rollups
+REBUILD_BATCH_SIZE = 50000
+
+
+def rebuild_rollups(conn, patient_id):
+    """
+    Recompute one patient's rollups from VitalReading and commit.
+
+    Runs as one transaction: the DELETE next-key locks the patient's
+    rollup range, so concurrent inserts wait and then merge onto the
+    rebuilt rows, while the raw series is read back in keyset batches
+    through apply_rollups().
+
+    Returns:
+        number of readings processed
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM VitalRollup WHERE PatientID = %s", (patient_id,))
+        query = (
+            f"SELECT {', '.join(READING_COLUMNS)} FROM VitalReading "
+            "WHERE PatientID = %s AND RecordedAt > %s ORDER BY RecordedAt LIMIT %s"
+        )
+        processed = 0
+        after = datetime(1000, 1, 1)  # MySQL's lowest DATETIME
+        while True:
+            cursor.execute(query, (patient_id, after, REBUILD_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            apply_rollups(cursor, rows)
+            processed += len(rows)
+            after = rows[-1]["RecordedAt"]
+        conn.commit()
+        return processed
+    finally:
+        cursor.close()
@@ -0,0 +1,243 @@
+#------------------------------------------------------------
+# Batch validation for bulk vitals ingestion: every rule runs
+# as one NumPy comparison over the whole batch
+#------------------------------------------------------------
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.timeseries import parse_timestamp
+from backend.timeseries.pressure import format_blood_pressure, split_blood_pressure
+
+
+# Most readings accepted in one POST /vital/bulk request
+MAX_BULK_READINGS = 50000
+
+# Plausible (inclusive) ranges; readings outside them are rejected as
+# sensor or entry errors. Temperature is in °F like the rest of the app.
+VITAL_RANGES = {
+    "HeartRate": (20, 300),
+    "RespiratoryRate": (0, 80),
+    "Temperature": (80.0, 115.0),
+    "Systolic": (40, 300),
+    "Diastolic": (20, 200),
+}
+
+NUMERIC_FIELDS = ["HeartRate", "RespiratoryRate", "Temperature"]
+
+# Stored as SMALLINT, so fractions are rejected rather than truncated
+WHOLE_NUMBER_FIELDS = ["HeartRate", "RespiratoryRate", "Systolic", "Diastolic"]
+
+
+class BulkIngestError(ValueError):
+    """Raised when a bulk request body cannot be read at all."""
+    pass
+
+
+def parse_bulk_body(request):
+    """
+    Read readings from a JSON array, {"readings": [...]} or NDJSON body.
+
+    Returns:
+        (items, rejections) where NDJSON lines that are not valid JSON
+        objects are already rejected and left as None in `items`
+    """
+    rejections = []
+    if request.mimetype == "application/x-ndjson":
+        items = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = None
+            if not isinstance(item, dict):
+                rejections.append({"index": len(items), "errors": ["Line is not a JSON object"]})
+                item = None
+            items.append(item)
+    else:
+        data = request.get_json(silent=True)
+        items = data.get("readings") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise BulkIngestError("Body must be a JSON array of readings, {\"readings\": [...]} or NDJSON")
+        items = [item if isinstance(item, dict) else None for item in items]
+        rejections = [
+            {"index": index, "errors": ["Reading is not a JSON object"]}
+            for index, item in enumerate(items) if item is None
+        ]
+
+    if not items:
+        raise BulkIngestError("No readings in request body")
+    if len(items) > MAX_BULK_READINGS:
+        raise BulkIngestError(f"At most {MAX_BULK_READINGS} readings may be sent at once")
+    return items, rejections
+
+
+def _field(items, field):
+    return [item.get(field) if item is not None else None for item in items]
+
+
+_PLAIN_NUMBER_TYPES = {int, float, type(None)}
+
+
+def _numbers(values):
+    """
+    Convert raw JSON values to a float array (None -> NaN).
+
+    Returns:
+        (array, bad) where bad marks values that are not numbers
+    """
+    # one C-level conversion in the common case of clean input (None
+    # converts to NaN); bools and strings take the checked path below
+    if set(map(type, values)) <= _PLAIN_NUMBER_TYPES:
+        return np.array(values, dtype=np.float64), np.zeros(len(values), dtype=bool)
+    array = np.full(len(values), np.nan)
+    bad = np.zeros(len(values), dtype=bool)
+    for index, value in enumerate(values):
+        if value is None:
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            array[index] = value
+        else:
+            bad[index] = True
+    return array, bad
+
+
+def _timestamps(values):
+    """Parse RecordedAt values; returns (list of datetime or None, bad mask)."""
+    parsed = []
+    bad = np.zeros(len(values), dtype=bool)
+    for index, value in enumerate(values):
+        if value is None:
+            parsed.append(None)
+            continue
+        try:
+            parsed.append(parse_timestamp(value, "RecordedAt"))
+        except ValueError:
+            parsed.append(None)
+            bad[index] = True
+    return parsed, bad
+
+
+def _nullable(array, convert):
+    return [None if value != value else convert(value) for value in array.tolist()]
+
+
+def validate_readings(items, known_patient_ids, now=None):
+    """
+    Validate a batch of reading dicts in one vectorized pass per rule.
+
+    Args:
+        items: parsed readings (None for already-rejected entries)
+        known_patient_ids: iterable of PatientIDs that exist
+        now: timestamp for readings without RecordedAt (default now)
+
+    Returns:
+        (readings, rejections): reading tuples ready for record_readings(),
+        one per (PatientID, RecordedAt), and [{"index": i, "errors": [...]}]
+        for every rejected item
+    """
+    now = now or datetime.now()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    n = len(items)
+    missing = np.array([item is None for item in items], dtype=bool)
+
+    patient_ids, bad_id = _numbers(_field(items, "PatientID"))
+    bad_id |= np.isnan(patient_ids) | (np.floor(patient_ids) != patient_ids) | (patient_ids < 1)
+    recorded_at, bad_time = _timestamps(_field(items, "RecordedAt"))
+    known = np.fromiter(known_patient_ids, dtype=np.float64)
+
+    # pressure comes as the legacy "120/80" string or as Systolic and
+    # Diastolic numbers; the string wins when both are sent
+    blood_pressure = _field(items, "BloodPressure")
+    has_string = np.array([v is not None for v in blood_pressure], dtype=bool)
+    systolic, diastolic = split_blood_pressure(blood_pressure)
+    systolic_field, bad_systolic = _numbers(_field(items, "Systolic"))
+    diastolic_field, bad_diastolic = _numbers(_field(items, "Diastolic"))
+    systolic = np.where(has_string, systolic, systolic_field)
+    diastolic = np.where(has_string, diastolic, diastolic_field)
+    bad_pressure = ~has_string & (bad_systolic | bad_diastolic)
+
+    checks = [
+        (bad_id, "PatientID is required and must be a positive integer"),
+        (~bad_id & ~np.isin(patient_ids, known), "Unknown PatientID"),
+        (bad_time, "RecordedAt must be an ISO datetime"),
+        (has_string & np.isnan(systolic), "BloodPressure must look like 120/80"),
+        (bad_pressure, "Systolic and Diastolic must be numbers"),
+        (~bad_pressure & (np.isnan(systolic) != np.isnan(diastolic)), "Systolic and Diastolic must be sent together"),
+        (systolic <= diastolic, "Systolic pressure must be above diastolic"),
+    ]
+
+    metrics = {"Systolic": systolic, "Diastolic": diastolic}
+    for field in NUMERIC_FIELDS:
+        metrics[field], bad = _numbers(_field(items, field))
+        checks.append((bad, f"{field} must be a number"))
+    for field in WHOLE_NUMBER_FIELDS:
+        values = metrics[field]
+        checks.append(((np.floor(values) != values) & ~np.isnan(values), f"{field} must be a whole number"))
+    for field, (low, high) in VITAL_RANGES.items():
+        values = metrics[field]
+        # NaN (not measured) compares False, so it never fails a range
+        checks.append(((values < low) | (values > high), f"{field} must be between {low} and {high}"))
+
+    measured = np.zeros(n, dtype=bool)
+    for field in NUMERIC_FIELDS + ["Systolic"]:
+        measured |= ~np.isnan(metrics[field])
+    checks.append((~measured, "Reading has no measurements"))
+
+    failed = np.zeros(n, dtype=bool)
+    for mask, _ in checks:
+        failed |= mask
+    failed &= ~missing
+
+    rejections = []
+    for index in np.flatnonzero(failed):
+        rejections.append({
+            "index": int(index),
+            "errors": [message for mask, message in checks if mask[index]],
+        })
+
+    # RecordedAt is stored to the millisecond, so keys are compared at that
+    # precision. Readings without one get the request time, 1 ms apart per
+    # patient in batch order, so they do not collide with each other. Of
+    # several readings with the same key, the last one sent is kept.
+    unstamped = {}
+    kept = {}
+    for index in np.flatnonzero(~(failed | missing)).tolist():
+        patient_id = int(patient_ids[index])
+        value = recorded_at[index]
+        if value is None:
+            count = unstamped.get(patient_id, 0)
+            unstamped[patient_id] = count + 1
+            value = now + timedelta(milliseconds=count)
+        else:
+            value = value.replace(microsecond=value.microsecond // 1000 * 1000)
+        recorded_at[index] = value
+        previous = kept.get((patient_id, value))
+        if previous is not None:
+            failed[previous] = True
+            rejections.append({
+                "index": previous,
+                "errors": [f"Same PatientID and RecordedAt as reading {index}, which is kept"],
+            })
+        kept[(patient_id, value)] = index
+    rejections.sort(key=lambda rejection: rejection["index"])
+
+    # build the accepted tuples column-wise from the validated arrays
+    accepted = ~(failed | missing)
+    keep = np.flatnonzero(accepted).tolist()
+    systolic_kept = _nullable(systolic[accepted], int)
+    diastolic_kept = _nullable(diastolic[accepted], int)
+    readings = list(zip(
+        patient_ids[accepted].astype(np.int64).tolist(),
+        [recorded_at[index] for index in keep],
+        _nullable(metrics["HeartRate"][accepted], int),
+        [format_blood_pressure(s, d) for s, d in zip(systolic_kept, diastolic_kept)],
+        _nullable(metrics["RespiratoryRate"][accepted], int),
+        _nullable(metrics["Temperature"][accepted], float),
+        systolic_kept,
+        diastolic_kept,
+    ))
+    return readings, rejections
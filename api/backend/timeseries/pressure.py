@@ -0,0 +1,75 @@
+#------------------------------------------------------------
+# Blood pressure parsing between the legacy "120/80" string
+# and the Systolic / Diastolic integer columns
+#------------------------------------------------------------
+import numpy as np
+
+
+# ?<arg>= query filters on the integer columns: (arg, column, operator)
+PRESSURE_FILTERS = [
+    ("systolic_min", "Systolic", ">="),
+    ("systolic_max", "Systolic", "<="),
+    ("diastolic_min", "Diastolic", ">="),
+    ("diastolic_max", "Diastolic", "<="),
+]
+
+
+class PressureFilterError(ValueError):
+    """Raised for a non-integer blood pressure filter value."""
+    pass
+
+
+def parse_blood_pressure(value):
+    """
+    Split "120/80" into (120, 80).
+
+    Anything that is not two whole numbers around a slash gives
+    (None, None); the legacy string is still stored as sent.
+    """
+    if isinstance(value, str):
+        systolic, slash, diastolic = value.partition("/")
+        systolic, diastolic = systolic.strip(), diastolic.strip()
+        if slash and systolic.isdigit() and diastolic.isdigit():
+            return int(systolic), int(diastolic)
+    return None, None
+
+
+def format_blood_pressure(systolic, diastolic):
+    """Build the legacy "120/80" string from the integer columns."""
+    if systolic is None or diastolic is None:
+        return None
+    return f"{int(systolic)}/{int(diastolic)}"
+
+
+def split_blood_pressure(values):
+    """
+    Split "120/80" strings into systolic and diastolic float arrays.
+
+    Unparseable values become NaN in both arrays. The split itself is plain
+    str.partition: measured against np.char and a uint8 digit-matrix parser
+    it was several times faster, since numpy has no fast path for
+    variable-length text.
+    """
+    pairs = np.array(
+        [parse_blood_pressure(value) for value in values], dtype=np.float64
+    ).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def pressure_conditions(args, column_prefix=""):
+    """
+    Read systolic_min/max and diastolic_min/max into SQL conditions.
+
+    Returns:
+        (conditions, params)
+    """
+    conditions = []
+    params = []
+    for arg, column, op in PRESSURE_FILTERS:
+        if args.get(arg):
+            try:
+                params.append(int(args[arg]))
+            except ValueError:
+                raise PressureFilterError(f"{arg} must be an integer")
+            conditions.append(f"{column_prefix}{column} {op} %s")
+    return conditions, params
@@ -0,0 +1,159 @@
+#------------------------------------------------------------
+# Vectorized downsampling of vital readings into 1m / 15m / 1h
+# min / max / mean / last buckets stored in VitalRollup
+#------------------------------------------------------------
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+# Bucket widths in seconds, by the name used in ?resolution=
+RESOLUTIONS = {"1m": 60, "15m": 900, "1h": 3600}
+
+# Rolled-up series
+ROLLUP_METRICS = ["HeartRate", "RespiratoryRate", "Temperature", "Systolic", "Diastolic"]
+
+# Per metric: non-null sample count, sum (for the mean), min, max, last
+STAT_SUFFIXES = ["Count", "Sum", "Min", "Max", "Last"]
+
+ROLLUP_COLUMNS = ["PatientID", "Resolution", "BucketStart", "SampleCount", "LastAt"] + [
+    f"{metric}{suffix}" for metric in ROLLUP_METRICS for suffix in STAT_SUFFIXES
+]
+
+
+def _merge_clause(metric):
+    # Counts and sums add up, min/max combine (LEAST/GREATEST return NULL
+    # if either side is NULL, hence the COALESCE), and last follows the
+    # newest reading; LastAt itself is assigned after every metric
+    return [
+        f"{metric}Count = {metric}Count + VALUES({metric}Count)",
+        f"{metric}Sum = {metric}Sum + VALUES({metric}Sum)",
+        f"{metric}Min = COALESCE(LEAST({metric}Min, VALUES({metric}Min)), {metric}Min, VALUES({metric}Min))",
+        f"{metric}Max = COALESCE(GREATEST({metric}Max, VALUES({metric}Max)), {metric}Max, VALUES({metric}Max))",
+        f"{metric}Last = IF(VALUES(LastAt) >= LastAt, COALESCE(VALUES({metric}Last), {metric}Last), {metric}Last)",
+    ]
+
+
+MERGE_ROLLUP = f"""
+INSERT INTO VitalRollup ({', '.join(ROLLUP_COLUMNS)})
+VALUES ({', '.join(['%s'] * len(ROLLUP_COLUMNS))})
+ON DUPLICATE KEY UPDATE
+    SampleCount = SampleCount + VALUES(SampleCount),
+    {', '.join(clause for metric in ROLLUP_METRICS for clause in _merge_clause(metric))},
+    LastAt = GREATEST(LastAt, VALUES(LastAt))
+"""
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def _as_millis(values):
+    # timedelta floor division beats np.array(..., dtype="datetime64[ms]")
+    # on datetime objects by about 3x
+    return np.array([(value - _EPOCH) // _MILLISECOND for value in values], dtype=np.int64)
+
+
+def _as_float(values):
+    # None (or anything non-numeric) becomes NaN
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def reading_arrays(readings):
+    """
+    Turn reading tuples into column arrays.
+
+    Args:
+        readings: (PatientID, RecordedAt, HeartRate, BloodPressure,
+                  RespiratoryRate, Temperature, Systolic, Diastolic) tuples
+                  or dicts with those keys
+
+    Returns:
+        (patient_ids, recorded_at as int64 epoch milliseconds, {metric: float array})
+    """
+    if readings and isinstance(readings[0], dict):
+        readings = [
+            (r["PatientID"], r["RecordedAt"], r["HeartRate"], r["BloodPressure"],
+             r["RespiratoryRate"], r["Temperature"], r["Systolic"], r["Diastolic"])
+            for r in readings
+        ]
+    columns = list(zip(*readings)) if readings else [()] * 8
+    metrics = {
+        "HeartRate": _as_float(columns[2]),
+        "RespiratoryRate": _as_float(columns[4]),
+        "Temperature": _as_float(columns[5]),
+        "Systolic": _as_float(columns[6]),
+        "Diastolic": _as_float(columns[7]),
+    }
+    patient_ids = np.array(columns[0], dtype=np.int64)
+    recorded_at = _as_millis(columns[1])
+    return patient_ids, recorded_at, metrics
+
+
+def compute_rollups(patient_ids, recorded_at, metrics, resolution):
+    """
+    Downsample readings into buckets of `resolution` seconds.
+
+    `recorded_at` is int64 epoch milliseconds, as from reading_arrays().
+
+    Sorts once by (patient, bucket, time) and reduces every metric with
+    ufunc.reduceat over the group boundaries, so the cost is a sort plus a
+    handful of vectorized passes regardless of how many buckets there are.
+
+    Returns:
+        list of rows in ROLLUP_COLUMNS order, NaN replaced by None
+    """
+    n = len(patient_ids)
+    if not n:
+        return []
+    width = resolution * 1000
+    buckets = recorded_at // width * width
+
+    order = np.lexsort((recorded_at, buckets, patient_ids))
+    pids = patient_ids[order]
+    bucket_starts = buckets[order]
+    millis = recorded_at[order]
+
+    boundary = np.empty(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (pids[1:] != pids[:-1]) | (bucket_starts[1:] != bucket_starts[:-1])
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], n) - 1
+
+    # tolist() turns each column into Python ints/floats/datetimes in C;
+    # only the float columns that can hold NaN need a Python pass
+    columns = [
+        pids[starts].tolist(),
+        [resolution] * len(starts),
+        bucket_starts[starts].astype("datetime64[ms]").astype(object).tolist(),
+        np.diff(np.append(starts, n)).tolist(),
+        millis[ends].astype("datetime64[ms]").astype(object).tolist(),
+    ]
+    positions = np.arange(n)
+    for metric in ROLLUP_METRICS:
+        values = metrics[metric][order]
+        valid = ~np.isnan(values)
+        last_index = np.maximum.reduceat(np.where(valid, positions, -1), starts)
+        columns += [
+            np.add.reduceat(valid.astype(np.int64), starts).tolist(),
+            np.add.reduceat(np.where(valid, values, 0.0), starts).tolist(),
+        ]
+        for stat in (
+            np.fmin.reduceat(values, starts),
+            np.fmax.reduceat(values, starts),
+            np.where(last_index >= 0, values[np.maximum(last_index, 0)], np.nan),
+        ):
+            if np.isnan(stat).any():
+                columns.append([None if v != v else v for v in stat.tolist()])
+            else:
+                columns.append(stat.tolist())
+    return list(zip(*columns))
+
+
+def apply_rollups(cursor, readings):
+    """Merge new readings into every rollup resolution; the caller commits."""
+    if not readings:
+        return
+    patient_ids, recorded_at, metrics = reading_arrays(readings)
+    for resolution in RESOLUTIONS.values():
+        cursor.executemany(MERGE_ROLLUP, compute_rollups(patient_ids, recorded_at, metrics, resolution))
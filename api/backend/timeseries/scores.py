@@ -0,0 +1,327 @@
+#------------------------------------------------------------
+# NEWS2-style early-warning scores for the whole census,
+# computed with NumPy over each patient's latest vitals and
+# cached per API worker
+#------------------------------------------------------------
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from flask import current_app
+from pymysql import cursors
+
+from backend.db_connection import db
+from backend.timeseries.rollups import _as_float
+
+
+# NEWS2 bands for the parameters VitalFlow records: (upper band edges,
+# points per band). np.digitize(..., right=True) puts a value equal to an
+# edge in the lower band, e.g. respiratory rate 8 -> 3 points, 9-11 -> 1.
+# SpO2, supplemental oxygen and consciousness are not recorded, so they
+# do not contribute.
+NEWS2_BANDS = {
+    "RespiratoryRate": ([8, 11, 20, 24], [3, 1, 0, 2, 3]),
+    "Systolic": ([90, 100, 110, 219], [3, 2, 1, 0, 3]),
+    "HeartRate": ([40, 50, 90, 110, 130], [3, 1, 0, 1, 2, 3]),
+    "Temperature": ([35.0, 36.0, 38.0, 39.0], [3, 1, 0, 1, 2]),  # °C
+}
+
+SCORED_METRICS = list(NEWS2_BANDS)
+
+# Clinical response thresholds on the aggregate score
+RISK_LEVELS = ["low", "low-medium", "medium", "high"]
+
+SCORE_COLUMNS = ["RecordedAt", "HeartRate", "RespiratoryRate", "Temperature", "Systolic"]
+
+
+class ScoreFilterError(ValueError):
+    """Raised for malformed min_score / risk filters."""
+    pass
+
+
+def parse_score_filters(args):
+    """
+    Read ?min_score= and ?risk= (comma-separated RISK_LEVELS).
+
+    Returns:
+        (min_score or None, list of risk levels)
+    """
+    min_score = None
+    if args.get("min_score"):
+        try:
+            min_score = int(args["min_score"])
+        except ValueError:
+            raise ScoreFilterError("min_score must be an integer")
+    risk = [level.strip() for level in args.get("risk", "").split(",") if level.strip()]
+    for level in risk:
+        if level not in RISK_LEVELS:
+            raise ScoreFilterError(f"risk must be one of {', '.join(RISK_LEVELS)}")
+    return min_score, risk
+
+
+def news2_scores(metrics):
+    """
+    Score every patient at once.
+
+    Args:
+        metrics: {metric: float array}, NaN where not measured; Temperature
+                 in °F as stored
+
+    Returns:
+        (points, totals, risk) where points is {metric: float array of
+        points, NaN if not measured}, totals an int array and risk an int
+        array of indexes into RISK_LEVELS
+    """
+    points = {}
+    for metric, (edges, band_points) in NEWS2_BANDS.items():
+        values = metrics[metric]
+        if metric == "Temperature":
+            # NEWS2 bands are in tenths of a degree Celsius
+            values = np.round((values - 32.0) * 5.0 / 9.0, 1)
+        bands = np.digitize(values, edges, right=True)
+        # NaN lands past the last edge; mask it back out
+        points[metric] = np.where(np.isnan(values), np.nan, np.asarray(band_points, dtype=np.float64)[bands])
+
+    stacked = np.vstack([points[metric] for metric in SCORED_METRICS])
+    totals = np.nansum(stacked, axis=0).astype(np.int64)
+    any_three = (stacked == 3).any(axis=0)
+    risk = np.select([totals >= 7, totals >= 5, any_three], [3, 2, 1], default=0)
+    return points, totals, risk
+
+
+class ScoreCache:
+    """
+    Early-warning scores for every admitted patient with vitals, held as
+    NumPy arrays in this worker.
+
+    A patient is admitted while they have a current visit (Patient.VisitID)
+    and no discharge dated on or after its AppointmentDate; a discharge
+    from an earlier stay does not count.
+
+    The first request loads the census and scores it in one vectorized
+    pass. After that only patients whose latest vitals changed are
+    re-scored: those written through this worker (invalidate()) and, every
+    `refresh_interval` seconds, VitalLatest rows with a newer UpdatedAt,
+    which covers writes made by other workers. Every `rebuild_interval`
+    seconds a fresh census is scored on a background thread to pick up
+    anything else, such as admissions, discharges and charts relinked
+    directly in the database, then swapped in. Requests keep reading the
+    old arrays while that runs.
+    """
+
+    # Commits can land slightly out of UpdatedAt order, so each probe
+    # re-reads a little before the last watermark
+    REFRESH_OVERLAP = timedelta(seconds=10)
+
+    def __init__(self, refresh_interval=5, rebuild_interval=600):
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._ids = None
+        self._built_at = 0.0
+        self._refreshed_at = 0.0
+        self._watermark = None
+        self._updated = {}
+        self._dirty = set()
+        self._pending = None  # patients re-scored while a rebuild runs
+        self._logger = None
+
+    def _select(self):
+        # the patient's VitalLatest row when they have a series, otherwise
+        # the fields of their linked VitalChart
+        fields = ", ".join(
+            f"IF(vl.PatientID IS NULL, vc.{column}, vl.{column})" for column in SCORE_COLUMNS[1:]
+        )
+        return (
+            f"SELECT p.PatientID, vl.RecordedAt, {fields}, vl.UpdatedAt FROM Patient p "
+            "LEFT JOIN VitalLatest vl ON vl.PatientID = p.PatientID "
+            "LEFT JOIN VitalChart vc ON vc.VitalID = p.VitalID "
+            "JOIN Visits v ON v.VisitID = p.VisitID "
+            "LEFT JOIN Discharge d ON d.DischargeID = p.DischargeID "
+            "WHERE (vl.PatientID IS NOT NULL OR vc.VitalID IS NOT NULL) "
+            "AND (d.DischargeID IS NULL OR d.DischargeDate < v.AppointmentDate)"
+        )
+
+    def _fetch(self, conn, patient_ids=None):
+        query = self._select()
+        params = []
+        if patient_ids is not None:
+            query += f" AND p.PatientID IN ({', '.join(['%s'] * len(patient_ids))})"
+            params = list(patient_ids)
+        cursor = conn.cursor(cursors.Cursor)
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _score(self, rows):
+        columns = list(zip(*rows)) if rows else [()] * (len(SCORE_COLUMNS) + 2)
+        metrics = {
+            column: _as_float(values)
+            for column, values in zip(SCORE_COLUMNS[1:], columns[2:-1])
+        }
+        points, totals, risk = news2_scores(metrics)
+        return {
+            "ids": np.array(columns[0], dtype=np.int64),
+            "recorded_at": np.array(columns[1], dtype=object),
+            "points": np.vstack([points[metric] for metric in SCORED_METRICS]).T,
+            "totals": totals,
+            "risk": risk,
+            "updated": dict(zip(columns[0], columns[-1])),
+        }
+
+    def _track(self, updated):
+        for patient_id, updated_at in updated.items():
+            self._updated[patient_id] = updated_at
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+
+    def _install(self, scored):
+        self._watermark = None
+        self._updated = {}
+        self._track(scored["updated"])
+        order = np.argsort(scored["ids"])
+        self._ids = scored["ids"][order]
+        self._recorded_at = scored["recorded_at"][order]
+        self._points = scored["points"][order]
+        self._totals = scored["totals"][order]
+        self._risk = scored["risk"][order]
+
+    def _splice(self, patient_ids, scored):
+        # patients that are no longer admitted, have no vitals or no
+        # longer exist drop out
+        keep = ~np.isin(self._ids, np.array(sorted(patient_ids), dtype=np.int64))
+        ids = np.concatenate([self._ids[keep], scored["ids"]])
+        order = np.argsort(ids, kind="stable")
+        self._ids = ids[order]
+        self._recorded_at = np.concatenate([self._recorded_at[keep], scored["recorded_at"]])[order]
+        self._points = np.concatenate([self._points[keep], scored["points"]])[order]
+        self._totals = np.concatenate([self._totals[keep], scored["totals"]])[order]
+        self._risk = np.concatenate([self._risk[keep], scored["risk"]])[order]
+        for patient_id in set(patient_ids) - set(scored["ids"].tolist()):
+            self._updated.pop(patient_id, None)
+        self._track(scored["updated"])
+
+    def _changed_since_watermark(self, conn):
+        # an index range scan on idx_latest_updated; rows re-read because
+        # of the overlap are skipped unless their UpdatedAt moved.
+        # Returns {PatientID: UpdatedAt} for the rest
+        since = self._watermark - self.REFRESH_OVERLAP if self._watermark else datetime(1970, 1, 1)
+        cursor = conn.cursor(cursors.Cursor)
+        try:
+            cursor.execute("SELECT PatientID, UpdatedAt FROM VitalLatest WHERE UpdatedAt >= %s", (since,))
+            return {
+                patient_id: updated_at for patient_id, updated_at in cursor.fetchall()
+                if self._updated.get(patient_id) != updated_at
+            }
+        finally:
+            cursor.close()
+
+    def _rebuild(self):
+        try:
+            with db.connection() as conn:
+                scored = self._score(self._fetch(conn))
+            with self._lock:
+                self._install(scored)
+                # the census may have been read before these patients'
+                # writes committed, so score them again on the new arrays
+                self._dirty |= self._pending
+                self._built_at = time.monotonic()
+        except Exception as e:
+            self._logger.error(f'Rebuilding the early-warning score cache failed: {str(e)}')
+            with self._lock:
+                # try again after the next refresh interval, not every request
+                self._built_at = time.monotonic() - self.rebuild_interval + self.refresh_interval
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def ensure_fresh(self, conn):
+        now = time.monotonic()
+        with self._lock:
+            if self._ids is None:
+                # nothing to serve yet, so the first request builds it
+                self._install(self._score(self._fetch(conn)))
+                self._dirty.clear()
+                self._built_at = self._refreshed_at = now
+                return
+            if now - self._built_at > self.rebuild_interval and self._pending is None:
+                self._pending = set()
+                self._logger = current_app.logger
+                threading.Thread(target=self._rebuild, name="census-scores", daemon=True).start()
+            changed, self._dirty = self._dirty, set()
+            probed = {}
+            if now - self._refreshed_at > self.refresh_interval:
+                probed = self._changed_since_watermark(conn)
+                changed |= probed.keys()
+                self._refreshed_at = now
+            if changed:
+                if self._pending is not None:
+                    self._pending |= changed
+                scored = self._score(self._fetch(conn, sorted(changed)))
+                self._splice(changed, scored)
+                # patients who are not admitted stay out of the arrays;
+                # remember their UpdatedAt so the next probe skips them
+                self._track({
+                    patient_id: probed[patient_id]
+                    for patient_id in probed.keys() - scored["updated"].keys()
+                })
+
+    def invalidate(self, patient_ids):
+        """Re-score these patients on the next read (their vitals or admission changed)."""
+        with self._lock:
+            self._dirty.update(patient_ids)
+
+    def _payloads(self, positions):
+        # built column-wise; indexing NumPy scalars row by row is far slower
+        keys = ["PatientID", "Total", "Risk", "RecordedAt"] + [f"{metric}Points" for metric in SCORED_METRICS]
+        columns = [
+            self._ids[positions].tolist(),
+            self._totals[positions].tolist(),
+            [RISK_LEVELS[level] for level in self._risk[positions].tolist()],
+            self._recorded_at[positions].tolist(),
+        ]
+        for points in self._points[positions].T.tolist():
+            columns.append([None if value != value else int(value) for value in points])
+        return [dict(zip(keys, values)) for values in zip(*columns)]
+
+    def scores(self, conn, min_score=None, risk=None):
+        """
+        Return every scored patient, highest score first.
+
+        Args:
+            min_score: only patients scoring at least this
+            risk: only patients at one of these RISK_LEVELS
+        """
+        self.ensure_fresh(conn)
+        with self._lock:
+            mask = np.ones(len(self._ids), dtype=bool)
+            if min_score is not None:
+                mask &= self._totals >= min_score
+            if risk:
+                mask &= np.isin(self._risk, [RISK_LEVELS.index(level) for level in risk])
+            selected = np.flatnonzero(mask)
+            # highest score first, then patient ID
+            selected = selected[np.lexsort((self._ids[selected], -self._totals[selected]))]
+            return self._payloads(selected)
+
+    def lookup(self, conn, patient_ids):
+        """Return {PatientID: score payload} for the given patients that are scored."""
+        self.ensure_fresh(conn)
+        with self._lock:
+            wanted = np.array(list(patient_ids), dtype=np.int64)
+            positions = np.searchsorted(self._ids, wanted)
+            found = positions < len(self._ids)
+            found[found] = self._ids[positions[found]] == wanted[found]
+            return {payload.pop("PatientID"): payload for payload in self._payloads(positions[found])}
+
+    def annotate(self, conn, rows):
+        """Add a `score` field (None when not scored) to each patient row."""
+        scores = self.lookup(conn, [row["PatientID"] for row in rows])
+        return [dict(row, score=scores.get(row["PatientID"])) for row in rows]
+
+
+# One cache per API worker, shared by the patient and vital routes
+census_scores = ScoreCache()
@@ -0,0 +1,201 @@
+#------------------------------------------------------------
+# Conditional GET support: strong ETags and Last-Modified
+# derived from per-resource version counters, so unchanged
+# data is answered with 304 before any query runs
+#------------------------------------------------------------
+import hashlib
+import threading
+import time
+from datetime import timedelta, timezone
+from functools import wraps
+
+from flask import current_app, request
+from pymysql import cursors
+
+from backend.db_connection import db
+from backend.versions.cache import reference_cache
+
+
+# Version counters, one per resource (roughly one per blueprint); a GET
+# route depends on every resource whose tables it reads
+RESOURCES = [
+    "alert", "condition", "discharge", "doctor", "insurance", "medication",
+    "message", "nurse", "patient", "proxy", "visit", "vital",
+]
+
+# Seconds a worker trusts its copy of the counters. Writes through this
+# worker are seen at once; writes through other workers can be answered
+# with a stale 304 for at most this long.
+VERSION_TTL = 1.0
+
+# Last-Modified has one-second resolution, so it is only sent once the
+# newest change is at least this old; otherwise a second change within
+# the same second could be hidden behind If-Modified-Since
+LAST_MODIFIED_SETTLE = timedelta(seconds=1)
+
+
+class ResourceVersions:
+    """
+    This worker's cached copy of the ResourceVersion table.
+
+    Reads refresh the whole table (a dozen rows) at most every `ttl`
+    seconds; a write through this worker bumps its rows after committing
+    and drops the cache, so the next read sees the new versions.
+    """
+
+    def __init__(self, ttl=VERSION_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._db_now = None
+        self._loaded_at = 0.0
+        self._hits = 0
+        self._refreshes = 0
+
+    def current(self, resources):
+        """
+        Returns:
+            ({resource: version}, newest UpdatedAt as UTC or None,
+            True if that change is old enough to send as Last-Modified)
+        """
+        with self._lock:
+            if time.monotonic() - self._loaded_at > self.ttl:
+                self._refresh()
+            else:
+                self._hits += 1
+            versions = {name: self._versions.get(name, (0, None)) for name in resources}
+            updated = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+            newest = max(updated) if len(updated) == len(versions) else None
+            settled = newest is not None and self._db_now - newest >= LAST_MODIFIED_SETTLE
+            return {name: version for name, (version, _) in versions.items()}, newest, settled
+
+    def _refresh(self):
+        cursor = db.get_db().cursor(cursors.Cursor)
+        try:
+            cursor.execute("SELECT Resource, Version, UpdatedAt, UTC_TIMESTAMP(3) FROM ResourceVersion")
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        self._versions = {
+            name: (version, updated_at.replace(tzinfo=timezone.utc)) for name, version, updated_at, _ in rows
+        }
+        # compare against the database clock rather than this host's
+        self._db_now = rows[0][3].replace(tzinfo=timezone.utc) if rows else None
+        self._loaded_at = time.monotonic()
+        self._refreshes += 1
+
+    def bump(self, conn, resources):
+        """Advance the counters after the caller's write has committed."""
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(
+                "INSERT INTO ResourceVersion (Resource, Version, UpdatedAt) VALUES (%s, 1, UTC_TIMESTAMP(3)) "
+                "ON DUPLICATE KEY UPDATE Version = Version + 1, UpdatedAt = VALUES(UpdatedAt)",
+                [(name,) for name in sorted(resources)],
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+            with self._lock:
+                self._loaded_at = 0.0
+
+    def metrics(self):
+        with self._lock:
+            return {"cache_hits": self._hits, "refreshes": self._refreshes}
+
+
+# One cache per API worker
+resource_versions = ResourceVersions()
+
+
+def _etag(versions):
+    # the same versions can still produce different bodies for a
+    # different path, query string or Accept (JSON page vs NDJSON export)
+    key = "|".join([
+        request.path,
+        "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True))),
+        request.headers.get("Accept", ""),
+        ",".join(f"{name}:{version}" for name, version in sorted(versions.items())),
+    ])
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def conditional(*resources, cache=False):
+    """
+    Make a GET route conditional on the versions of `resources`.
+
+    The ETag and Last-Modified are computed from the counters before the
+    view runs, so a matching If-None-Match (or, without one, a satisfied
+    If-Modified-Since) returns 304 without calling the view. Counters are
+    read before the data, so a response is never labelled newer than it
+    is. Other methods (e.g. POST /batch) pass straight through.
+
+    With cache=True the encoded 200 response is kept in reference_cache
+    under its ETag and later requests are answered from those bytes
+    without running the view. Meant for small reference tables.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+
+            try:
+                versions, last_modified, settled = resource_versions.current(resources)
+            except Exception as e:
+                # serve the request unconditionally rather than fail it
+                current_app.logger.error(f'Could not read resource versions: {str(e)}')
+                return view(*args, **kwargs)
+            etag = _etag(versions)
+            # If-None-Match takes precedence over If-Modified-Since
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                not_modified = (
+                    settled and request.if_modified_since is not None
+                    and last_modified.replace(microsecond=0) <= request.if_modified_since
+                )
+            cached = reference_cache.get(etag) if cache and not not_modified else None
+            if not_modified:
+                response = current_app.response_class(status=304)
+            elif cached is not None:
+                body, headers = cached
+                response = current_app.response_class(body, status=200, headers=headers)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                # streamed exports are never held in memory
+                if cache and not response.is_streamed:
+                    headers = [(k, v) for k, v in response.headers.items() if k != "Content-Length"]
+                    reference_cache.put(etag, response.get_data(), headers, resources)
+
+            response.set_etag(etag)
+            if settled:
+                response.last_modified = last_modified
+            # cached copies must always be revalidated
+            response.headers["Cache-Control"] = "no-cache"
+            response.vary.add("Accept")
+            return response
+        return wrapper
+    return decorator
+
+
+def bumps(*resources):
+    """
+    Advance the versions of `resources` after a successful write route
+    and drop this worker's cached responses that depend on them.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code < 400:
+                reference_cache.invalidate(resources)
+                try:
+                    resource_versions.bump(db.get_db(), resources)
+                except Exception as e:
+                    current_app.logger.error(f'Failed to bump versions of {", ".join(resources)}: {str(e)}')
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,96 @@
+#------------------------------------------------------------
+# TTL + LRU cache of encoded response bytes for the small,
+# rarely changing reference tables (doctors, nurses, ...)
+#------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+
+
+# Most responses kept per API worker
+MAX_CACHED_RESPONSES = 512
+
+# Seconds a response is served before it is rebuilt even if no version
+# changed, which bounds staleness after edits made directly in MySQL
+RESPONSE_TTL = 300
+
+
+class ResponseCache:
+    """
+    Encoded response bodies keyed by ETag.
+
+    The ETag already covers the path, query string, Accept and the
+    versions of every resource the route reads, so a write anywhere makes
+    the old entries unreachable. Writes through this worker also drop the
+    entries of the resources they changed straight away, and
+    least-recently-used entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_RESPONSES, ttl=RESPONSE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # etag -> (body, headers, resources, stored_at)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evicted = 0
+        self._invalidated = 0
+
+    def get(self, etag):
+        """Return (body, headers) for `etag`, or None."""
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None:
+                self._misses += 1
+                return None
+            if time.monotonic() - entry[3] > self.ttl:
+                self._drop(etag)
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self._hits += 1
+            return entry[0], entry[1]
+
+    def put(self, etag, body, headers, resources):
+        with self._lock:
+            if etag in self._entries:
+                self._drop(etag)
+            self._entries[etag] = (body, headers, frozenset(resources), time.monotonic())
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._evicted += 1
+
+    def invalidate(self, resources):
+        """Drop every response that depends on any of `resources`."""
+        resources = set(resources)
+        with self._lock:
+            stale = [etag for etag, entry in self._entries.items() if entry[2] & resources]
+            for etag in stale:
+                self._drop(etag)
+            self._invalidated += len(stale)
+
+    def _drop(self, etag):
+        body = self._entries.pop(etag)[0]
+        self._bytes -= len(body)
+
+    def metrics(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else None,
+                "expired": self._expired,
+                "evicted": self._evicted,
+                "invalidated": self._invalidated,
+            }
+
+
+# One cache per API worker
+reference_cache = ResponseCache()
@@ -1,5 +1,9 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import bumps, conditional
+from backend.batch import parse_batch_ids, fetch_by_ids, batch_response, BatchError
+from backend.pagination import keyset_page, page_response, PaginationError
+from backend.search import SearchError, time_window
 from mysql.connector import Error
 from flask import current_app
 
@@ -9,24 +13,51 @@ visits = Blueprint("visits", __name__)
 
 # Get all visits
 @visits.route("/", methods=["GET"])
+@conditional("visit")
 def get_all_visits():
     try:
         current_app.logger.info('Starting get_all_visits request')
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM Visits")
-        visits_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM Visits", ["VisitID"])
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(visits_data)} visits')
-        return jsonify(visits_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} visits')
+        return page_response(page), 200
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_visits: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
+# Count visits for dashboard badges, optionally by AppointmentDate
+# ?from= / ?to= (served by idx_visit_date) -> {"count": 12}
+@visits.route("/count", methods=["GET"])
+@conditional("visit")
+def count_visits():
+    try:
+        where, params = time_window(request.args, "AppointmentDate")
+        cursor = db.get_db().cursor()
+        
+        cursor.execute(
+            "SELECT COUNT(*) AS Total FROM Visits" + (" WHERE " + " AND ".join(where) if where else ""),
+            params,
+        )
+        count = cursor.fetchone()["Total"]
+        cursor.close()
+        
+        return jsonify({"count": count}), 200
+    except SearchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in count_visits: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Create a new visit
 @visits.route("/", methods=["POST"])
+@bumps("visit")
 def create_visit():
     try:
         data = request.get_json()
@@ -61,9 +92,31 @@ def create_visit():
         return jsonify({"error": str(e)}), 500
 
 
+# Get several visits by ID in one query
+# GET /batch?ids=1,2,3 or POST /batch with {"ids": [1, 2, 3]}
+@visits.route("/batch", methods=["GET", "POST"])
+@conditional("visit")
+def get_visits_batch():
+    try:
+        ids = parse_batch_ids()
+        cursor = db.get_db().cursor()
+        
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM Visits", "VisitID", ids)
+        cursor.close()
+        
+        current_app.logger.info(f'Batch fetched {len(rows_by_id)} of {len(ids)} visits')
+        return batch_response(rows_by_id, ids), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_visits_batch: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Get details for a specific visit
 # Available to Proxy-4.2, Patient-3.6, and Proxy-4.5
 @visits.route("/<int:visit_id>", methods=["GET"])
+@conditional("visit")
 def get_visit(visit_id):
     try:
         cursor = db.get_db().cursor()
@@ -82,6 +135,7 @@ def get_visit(visit_id):
 
 # Update visit information (such as NextVisitDate)
 @visits.route("/<int:visit_id>", methods=["PUT"])
+@bumps("visit")
 def update_visit(visit_id):
     try:
         data = request.get_json()
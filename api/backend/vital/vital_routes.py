@@ -1,70 +1,341 @@
+import click
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.versions import bumps, conditional, resource_versions
+from backend.batch import parse_batch_ids, fetch_by_ids, batch_response, BatchError
+from backend.pagination import keyset_page, page_response, PaginationError
+from backend.streaming import stream_format, stream_keyset
+from backend.timeseries import (
+    VitalsRangeError, parse_resolution, parse_timestamp, rebuild_rollups, reading_range,
+    record_readings, rollup_select
+)
+from backend.timeseries.ingest import BulkIngestError, parse_bulk_body, validate_readings
+from backend.timeseries.pressure import (
+    PressureFilterError, format_blood_pressure, parse_blood_pressure, pressure_conditions
+)
+from backend.timeseries.scores import ScoreFilterError, census_scores, parse_score_filters
 from mysql.connector import Error
 from flask import current_app
+from datetime import datetime
 
 # Create a Blueprint for Vital Chart routes
 vitals = Blueprint("vitals", __name__)
 
 
-# Get all vital charts
+# Get all vital charts, optionally filtered by blood pressure thresholds
+# (systolic_min, systolic_max, diastolic_min, diastolic_max)
 @vitals.route("/", methods=["GET"])
+@conditional("vital")
 def get_all_vital_charts():
     try:
         current_app.logger.info('Starting get_all_vitalcharts request')
+        
+        # ?systolic_min=180 etc. are served by the Systolic/Diastolic indexes
+        where, params = pressure_conditions(request.args)
+        
+        # Exports opt in to a streamed body via Accept: application/x-ndjson
+        fmt = stream_format()
+        if fmt:
+            return stream_keyset(
+                "SELECT * FROM VitalChart", ["VitalID"], where=where, params=params, fmt=fmt
+            ), 200
+        
         cursor = db.get_db().cursor()
         
-        cursor.execute("SELECT * FROM VitalChart")
-        vitals_data = cursor.fetchall()
+        page = keyset_page(cursor, "SELECT * FROM VitalChart", ["VitalID"], where=where, params=params)
         cursor.close()
         
-        current_app.logger.info(f'Successfully retrieved {len(vitals_data)} vital charts')
-        return jsonify(vitals_data), 200
+        current_app.logger.info(f'Successfully retrieved {len(page["rows"])} vital charts')
+        return page_response(page), 200
+    except (PressureFilterError, PaginationError) as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
         current_app.logger.error(f'Database error in get_all_vitalcharts: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
+# Count vital charts for dashboard badges, with the same blood pressure
+# thresholds as GET / -> {"count": 250}
+@vitals.route("/count", methods=["GET"])
+@conditional("vital")
+def count_vital_charts():
+    try:
+        where, params = pressure_conditions(request.args)
+        cursor = db.get_db().cursor()
+        
+        cursor.execute(
+            "SELECT COUNT(*) AS Total FROM VitalChart" + (" WHERE " + " AND ".join(where) if where else ""),
+            params,
+        )
+        count = cursor.fetchone()["Total"]
+        cursor.close()
+        
+        return jsonify({"count": count}), 200
+    except PressureFilterError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in count_vital_charts: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
 # Create a new vital chart
+# With a PatientID the chart becomes that patient's current vitals and is
+# appended to their series at RecordedAt (default now)
 # Available to Nurse-2.1
 @vitals.route("/", methods=["POST"])
+@bumps("vital", "patient")
 def create_vital_chart():
     try:
         data = request.get_json()
         cursor = db.get_db().cursor()
         
         # Validate required fields
-        required_fields = ["HeartRate", "BloodPressure", "RespiratoryRate", "Temperature"]
+        required_fields = ["HeartRate", "RespiratoryRate", "Temperature"]
         for field in required_fields:
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
+        # Blood pressure may come as the legacy "120/80" string or as
+        # Systolic and Diastolic; both forms are stored
+        if "BloodPressure" in data:
+            blood_pressure = data["BloodPressure"]
+            systolic, diastolic = parse_blood_pressure(blood_pressure)
+        elif "Systolic" in data and "Diastolic" in data:
+            try:
+                systolic, diastolic = int(data["Systolic"]), int(data["Diastolic"])
+            except (TypeError, ValueError):
+                return jsonify({"error": "Systolic and Diastolic must be integers"}), 400
+            blood_pressure = format_blood_pressure(systolic, diastolic)
+        else:
+            return jsonify({"error": "Missing required field: BloodPressure (or Systolic and Diastolic)"}), 400
+        
+        patient_id = data.get("PatientID")
+        if patient_id is not None:
+            recorded_at = (
+                parse_timestamp(data["RecordedAt"], "RecordedAt") if data.get("RecordedAt") else datetime.now()
+            )
+            cursor.execute("SELECT PatientID FROM Patient WHERE PatientID = %s", (patient_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Patient not found"}), 404
+        
         # Insert new vital chart
         query = """
-        INSERT INTO VitalChart (HeartRate, BloodPressure, RespiratoryRate, Temperature)
-        VALUES (%s, %s, %s, %s)
+        INSERT INTO VitalChart (HeartRate, BloodPressure, RespiratoryRate, Temperature, Systolic, Diastolic)
+        VALUES (%s, %s, %s, %s, %s, %s)
         """
         cursor.execute(
             query,
             (
                 data["HeartRate"],
-                data["BloodPressure"],
+                blood_pressure,
                 data["RespiratoryRate"],
-                data["Temperature"]
+                data["Temperature"],
+                systolic,
+                diastolic
             ),
         )
+        new_vital_id = cursor.lastrowid
+        
+        if patient_id is not None:
+            # Relink and record in the same transaction so the current
+            # chart and the series never disagree
+            cursor.execute("UPDATE Patient SET VitalID = %s WHERE PatientID = %s", (new_vital_id, patient_id))
+            record_readings(cursor, [(
+                patient_id, recorded_at, data["HeartRate"], blood_pressure,
+                data["RespiratoryRate"], data["Temperature"], systolic, diastolic
+            )])
         
         db.get_db().commit()
-        new_vital_id = cursor.lastrowid
         cursor.close()
         
+        if patient_id is not None:
+            census_scores.invalidate([patient_id])
+        
         return jsonify({"message": "Vital chart created successfully", "vital_id": new_vital_id}), 201
+    except VitalsRangeError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Ingest many readings at once, e.g. from bedside monitors
+# Body: JSON array (or {"readings": [...]}) or NDJSON (application/x-ndjson)
+# of {PatientID, RecordedAt, HeartRate, BloodPressure (or Systolic and Diastolic),
+# RespiratoryRate, Temperature}
+# Valid readings are stored in one transaction; invalid ones are reported
+# by index and skipped
+@vitals.route("/bulk", methods=["POST"])
+@bumps("vital")
+def bulk_create_vitals():
+    try:
+        items, rejections = parse_bulk_body(request)
+        cursor = db.get_db().cursor()
+        
+        # One IN (...) lookup for every patient referenced in the batch
+        patient_ids = sorted({
+            item["PatientID"] for item in items
+            if item is not None and isinstance(item.get("PatientID"), int) and not isinstance(item["PatientID"], bool)
+        })
+        known = set()
+        if patient_ids:
+            cursor.execute(
+                f"SELECT PatientID FROM Patient WHERE PatientID IN ({', '.join(['%s'] * len(patient_ids))})",
+                patient_ids,
+            )
+            known = {row["PatientID"] for row in cursor.fetchall()}
+        
+        readings, invalid = validate_readings(items, known)
+        rejections = sorted(rejections + invalid, key=lambda rejection: rejection["index"])
+        
+        stored = 0
+        if readings:
+            stored = record_readings(cursor, readings)
+            db.get_db().commit()
+            census_scores.invalidate({reading[0] for reading in readings})
+        cursor.close()
+        
+        current_app.logger.info(
+            f'Bulk vitals: stored {stored}, resent {len(readings) - stored}, rejected {len(rejections)}'
+        )
+        return jsonify({
+            "accepted": len(readings),
+            "rejected": len(rejections),
+            "rejections": rejections,
+        }), 201 if readings else 400
+    except BulkIngestError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in bulk_create_vitals: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Get the early-warning (NEWS2-style) score of every patient with vitals,
+# highest first. Optional ?min_score=5 and ?risk=medium,high filters.
+# Scores come from the per-worker cache, so this does not scan the census.
+@vitals.route("/scores", methods=["GET"])
+@conditional("vital", "patient")
+def get_vital_scores():
+    try:
+        min_score, risk = parse_score_filters(request.args)
+        scores = census_scores.scores(db.get_db(), min_score, risk)
+        
+        current_app.logger.info(f'Retrieved early-warning scores for {len(scores)} patients')
+        return jsonify(scores), 200
+    except ScoreFilterError as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_vital_scores: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Get a patient's downsampled vitals: min/max/mean/last per bucket
+# GET /rollups?patient_id=1&resolution=15m&from=2025-08-01&to=2025-08-02
+# resolution is 1m, 15m or 1h; buckets come oldest first, keyset-paginated
+@vitals.route("/rollups", methods=["GET"])
+@conditional("vital")
+def get_vital_rollups():
+    try:
+        patient_id = request.args.get("patient_id", type=int)
+        if patient_id is None:
+            return jsonify({"error": "patient_id parameter is required"}), 400
+        resolution = parse_resolution(request.args.get("resolution", "15m"))
+        
+        # ?from= / ?to= bound the bucket start times
+        conditions, params = reading_range(request.args, "BucketStart")
+        where = ["PatientID = %s", "Resolution = %s"] + conditions
+        
+        cursor = db.get_db().cursor()
+        page = keyset_page(
+            cursor, rollup_select(), ["BucketStart"],
+            where=where, params=[patient_id, resolution] + params
+        )
+        cursor.close()
+        
+        current_app.logger.info(f'Retrieved {len(page["rows"])} vital rollup buckets for patient {patient_id}')
+        return page_response(page), 200
+    except (VitalsRangeError, PaginationError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Error as e:
+        current_app.logger.error(f'Database error in get_vital_rollups: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Recompute one patient's rollups from the raw series (?patient_id=)
+# Backfilling every patient is a long job, so it runs from the CLI
+# (flask --app backend_app vitals rebuild-rollups) instead of a request
+@vitals.route("/rollups/rebuild", methods=["POST"])
+@bumps("vital")
+def rebuild_vital_rollups():
+    try:
+        patient_id = request.args.get("patient_id", type=int)
+        if patient_id is None:
+            return jsonify({
+                "error": "patient_id parameter is required; rebuild every patient with "
+                         "`flask --app backend_app vitals rebuild-rollups`"
+            }), 400
+        
+        readings = rebuild_rollups(db.get_db(), patient_id)
+        
+        current_app.logger.info(f'Rebuilt vital rollups for patient {patient_id} from {readings} readings')
+        return jsonify({
+            "message": "Vital rollups rebuilt",
+            "patients": 1,
+            "readings": readings,
+        }), 200
+    except Error as e:
+        current_app.logger.error(f'Database error in rebuild_vital_rollups: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+
+
+# Recompute rollups for every patient with readings, e.g. after
+# migrations 004 or 006. Run next to the API, not inside a worker:
+#   docker exec -it web-api flask --app backend_app vitals rebuild-rollups
+# Each patient commits on its own, so an interrupted run resumes with
+# --after <last PatientID printed>
+@vitals.cli.command("rebuild-rollups")
+@click.option("--after", default=0, type=int, help="Only rebuild patients with a higher PatientID.")
+def rebuild_all_vital_rollups(after):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT PatientID FROM VitalLatest WHERE PatientID > %s ORDER BY PatientID", (after,))
+        patient_ids = [row["PatientID"] for row in cursor.fetchall()]
+        cursor.close()
+        
+        readings = 0
+        for patient_id in patient_ids:
+            count = rebuild_rollups(conn, patient_id)
+            readings += count
+            click.echo(f"Patient {patient_id}: {count} readings")
+        
+        # cached rollup responses (ETags) are stale now
+        resource_versions.bump(conn, ["vital"])
+    click.echo(f"Rebuilt vital rollups for {len(patient_ids)} patients from {readings} readings")
+
+
+# Get several vital charts by ID in one query
+# GET /batch?ids=1,2,3 or POST /batch with {"ids": [1, 2, 3]}
+@vitals.route("/batch", methods=["GET", "POST"])
+@conditional("vital")
+def get_vital_charts_batch():
+    try:
+        ids = parse_batch_ids()
+        cursor = db.get_db().cursor()
+        
+        rows_by_id = fetch_by_ids(cursor, "SELECT * FROM VitalChart", "VitalID", ids)
+        cursor.close()
+        
+        current_app.logger.info(f'Batch fetched {len(rows_by_id)} of {len(ids)} vital charts')
+        return batch_response(rows_by_id, ids), 200
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
     except Error as e:
+        current_app.logger.error(f'Database error in get_vital_charts_batch: {str(e)}')
         return jsonify({"error": str(e)}), 500
 
 
 # Get details for a specific vital chart
 @vitals.route("/<int:vital_id>", methods=["GET"])
+@conditional("vital")
 def get_vital_chart(vital_id):
     try:
         cursor = db.get_db().cursor()
@@ -2,6 +2,15 @@
 # Main application interface
 ###
 
+import os
+
+# API_SERVER=gevent serves every request (and every open /stream/events
+# connection) as a greenlet instead of a thread. Patching has to happen
+# before anything else imports socket or threading.
+if os.getenv("API_SERVER") == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
 # import the create app function 
 # that lives in src/__init__.py
 from backend.rest_entry import create_app
@@ -10,8 +19,12 @@ from backend.rest_entry import create_app
 app = create_app()
 
 if __name__ == '__main__':
-    # we want to run in debug mode (for hot reloading) 
-    # this app will be bound to port 4000. 
-    # Take a look at the docker-compose.yml to see 
-    # what port this might be mapped to... 
-    app.run(debug = True, host = '0.0.0.0', port = 4000)
+    if os.getenv("API_SERVER") == "gevent":
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(('0.0.0.0', 4000), app).serve_forever()
+    else:
+        # we want to run in debug mode (for hot reloading) 
+        # this app will be bound to port 4000. 
+        # Take a look at the docker-compose.yml to see 
+        # what port this might be mapped to... 
+        app.run(debug = True, host = '0.0.0.0', port = 4000)
@@ -0,0 +1,81 @@
+"""
+VitalFlow Medical App - API Client Module
+Revalidating GET for the API: responses are kept with their ETag and
+re-requested with If-None-Match, so a Streamlit rerun that finds the data
+unchanged gets an empty 304 instead of the full payload again
+"""
+
+import threading
+from collections import OrderedDict
+
+import requests
+
+# Most responses kept; shared by every session in this Streamlit process
+MAX_CACHED_RESPONSES = 256
+
+# Rows asked for by get_page(); the API's MAX_PAGE_SIZE
+PAGE_SIZE = 500
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def get(url, params=None, **kwargs):
+    """
+    Drop-in replacement for requests.get() that revalidates.
+
+    Returns the stored response (status 200) when the API answers 304,
+    otherwise the new response. Raises the same exceptions as requests.
+    """
+    key = requests.Request("GET", url, params=params).prepare().url
+    with _lock:
+        cached = _cache.get(key)
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if cached is not None:
+        headers["If-None-Match"] = cached.headers["ETag"]
+
+    response = requests.get(url, params=params, headers=headers, **kwargs)
+
+    with _lock:
+        if response.status_code == 304 and cached is not None:
+            _cache.move_to_end(key)
+            return cached
+        if response.status_code == 200 and "ETag" in response.headers:
+            _cache[key] = response
+            _cache.move_to_end(key)
+            while len(_cache) > MAX_CACHED_RESPONSES:
+                _cache.popitem(last=False)
+        else:
+            _cache.pop(key, None)
+    return response
+
+
+def get_page(url, params=None, **kwargs):
+    """
+    GET the first page of a paginated list endpoint.
+
+    Pages never walk a whole collection: lists show one page of up to
+    PAGE_SIZE rows (narrowed with the endpoint's filters), and badges ask
+    a count endpoint through get_count() instead.
+
+    Returns the list of rows, or None if the request fails.
+    """
+    params = dict(params or {})
+    params.setdefault("limit", PAGE_SIZE)
+    response = get(url, params=params, **kwargs)
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+def get_count(url, params=None, **kwargs):
+    """
+    GET a count endpoint answering {"count": n}.
+
+    Returns n, or None if the request fails.
+    """
+    response = get(url, params=params, **kwargs)
+    if response.status_code != 200:
+        return None
+    return response.json().get("count")
@@ -7,6 +7,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 
 ## Page config - MUST be first Streamlit command
 from modules.styles import apply_page_styling, create_metric_card, create_medical_divider
@@ -28,7 +29,7 @@ if "current_view" not in st.session_state:
 def get_patient_info(patient_id):
     """Get patient information from database"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}", timeout=5)
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}", timeout=5)
         if response.status_code == 200:
             return response.json()
         elif response.status_code == 404:
@@ -64,7 +65,7 @@ def get_patient_info(patient_id):
 def get_patient_visit(patient_id):
     """Get patient's current visit from database"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/visit", timeout=5)
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/visit", timeout=5)
         if response.status_code == 200:
             return response.json()
         elif response.status_code == 404:
@@ -91,7 +92,7 @@ def get_patient_visit(patient_id):
 def get_patient_vitals(patient_id):
     """Get patient's current vitals from database"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/vitals", timeout=5)
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/vitals", timeout=5)
         if response.status_code == 200:
             return response.json()
         elif response.status_code == 404:
@@ -119,7 +120,7 @@ def get_patient_vitals(patient_id):
 def get_patient_medications(patient_id):
     """Get patient's medications from database"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/medications", timeout=5)
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/medications", timeout=5)
         if response.status_code == 200:
             return response.json()
         elif response.status_code == 404:
@@ -154,7 +155,7 @@ def get_patient_medications(patient_id):
 def get_patient_insurance(patient_id):
     """Get patient's insurance information"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/insurance", timeout=5)
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/insurance", timeout=5)
         if response.status_code == 200:
             return response.json()
         elif response.status_code == 404:
@@ -182,14 +183,11 @@ def get_patient_insurance(patient_id):
 def get_patient_messages(patient_id):
     """Get messages for specific patient"""
     try:
-        response = requests.get(f"{API_BASE_URL}/message/?user_type=patient&user_id={patient_id}", timeout=5)
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 404:
-            return []
-        else:
-            st.warning(f"Messages API returned status {response.status_code}")
+        rows = api_client.get_page(f"{API_BASE_URL}/message/?user_type=patient&user_id={patient_id}", timeout=5)
+        if rows is None:
+            st.warning("Messages API request failed")
             return []
+        return rows
     except requests.exceptions.ConnectionError:
         st.warning("Could not connect to messages API. Using demo data.")
         # Return consistent demo data for patient ID 1
@@ -223,14 +221,13 @@ def get_patient_messages(patient_id):
         return get_patient_messages(1)  # Return demo data
 
 def get_doctors():
-    """Get all doctors for recipient selection"""
+    """Get a page of doctors for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/doctor/", timeout=5)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.warning(f"Doctors API returned status {response.status_code}")
+        rows = api_client.get_page(f"{API_BASE_URL}/doctor/", timeout=5)
+        if rows is None:
+            st.warning("Doctors API request failed")
             return []
+        return rows
     except requests.exceptions.ConnectionError:
         st.warning("Could not connect to doctors API. Using demo data.")
         return [
@@ -246,14 +243,13 @@ def get_doctors():
         return []
 
 def get_nurses():
-    """Get all nurses for recipient selection"""
+    """Get a page of nurses for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/nurse/", timeout=5)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.warning(f"Nurses API returned status {response.status_code}")
+        rows = api_client.get_page(f"{API_BASE_URL}/nurse/", timeout=5)
+        if rows is None:
+            st.warning("Nurses API request failed")
             return []
+        return rows
     except requests.exceptions.ConnectionError:
         st.warning("Could not connect to nurses API. Using demo data.")
         return [
@@ -269,9 +265,8 @@ def get_nurses():
         return []
 
 def create_message(subject, content, recipient_type, recipient_id, priority, sender_id, sender_role):
-    """Create and send a new message"""
+    """Create a message and deliver it to its recipient in one request"""
     try:
-        # Create the message with basic information
         message_data = {
             "Subject": subject,
             "Content": content,
@@ -280,33 +275,16 @@ def create_message(subject, content, recipient_type, recipient_id, priority, sen
             "SenderType": sender_role,
             "ReadStatus": False,
             "Priority": priority,
-            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "recipients": [{"user_type": recipient_type, "user_id": recipient_id}]
         }
         
-        # Actually call the API
-        response = requests.post(f"{API_BASE_URL}/message/", json=message_data)
+        # The message and its recipient link are stored in one transaction
+        response = requests.post(f"{API_BASE_URL}/message/send", json=message_data)
         
         if response.status_code == 201:
-            response_data = response.json()
-            
-            # Get the message ID from response
-            message_id = response_data.get('message_id')
-            
-            if message_id:
-                # Link message to recipient based on type
-                if recipient_type == "doctor":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_doctor", json={"DoctorID": recipient_id})
-                elif recipient_type == "nurse":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_nurse", json={"NurseID": recipient_id})
-                
-                if link_response.status_code == 200:
-                    return True
-                else:
-                    return False
-            else:
-                return False
-        else:
-            return False
+            return True
+        return False
         
     except Exception as e:
         return False
@@ -7,6 +7,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_metric_card, create_medical_divider
 
 ## Apply medical theme and styling
@@ -22,7 +23,7 @@ API_BASE_URL = "http://web-api:4000"
 def get_patient_info(patient_id):
     """Get patient information from database"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}")
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}")
         if response.status_code == 200:
             return response.json()
         return None
@@ -33,7 +34,7 @@ def get_patient_info(patient_id):
 def get_patient_insurance(patient_id):
     """Get patient's insurance information"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/insurance")
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/insurance")
         if response.status_code == 200:
             return response.json()
         return None
@@ -44,7 +45,7 @@ def get_patient_insurance(patient_id):
 def get_patient_visit(patient_id):
     """Get patient's current visit from database"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/visit")
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/visit")
         if response.status_code == 200:
             return response.json()
         return None
@@ -54,7 +55,7 @@ def get_patient_visit(patient_id):
 def get_patient_condition(patient_id):
     """Get patient's condition from database"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/condition")
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/condition")
         if response.status_code == 200:
             return response.json()
         return None
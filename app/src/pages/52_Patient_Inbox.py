@@ -7,6 +7,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_medical_divider
 
 ## Apply medical theme and styling
@@ -22,7 +23,7 @@ API_BASE_URL = "http://web-api:4000"
 def get_patient_info(patient_id):
     """Get patient information from database"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}")
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}")
         if response.status_code == 200:
             return response.json()
         return None
@@ -33,12 +34,11 @@ def get_patient_info(patient_id):
 def get_patient_messages(patient_id):
     """Get messages for specific patient"""
     try:
-        response = requests.get(f"{API_BASE_URL}/message/?user_type=patient&user_id={patient_id}")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"❌ API Error: {response.status_code}")
+        messages = api_client.get_page(f"{API_BASE_URL}/message/?user_type=patient&user_id={patient_id}")
+        if messages is None:
+            st.error("❌ API Error: could not load messages")
             return []
+        return messages
     except Exception as e:
         st.warning("Could not connect to messages API, using dummy data.")
         return [
@@ -64,30 +64,36 @@ def get_patient_messages(patient_id):
             }
         ]
 
-def get_doctors():
-    """Get all doctors for recipient selection"""
+def get_message_summary(user_type, user_id):
+    """Get unread/priority counts for a user's inbox, computed by the API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/doctor/")
+        response = api_client.get(
+            f"{API_BASE_URL}/message/summary",
+            params={"user_type": user_type, "user_id": user_id, "latest": 0},
+        )
         if response.status_code == 200:
             return response.json()
-        return []
+        return None
+    except:
+        return None
+
+def get_doctors():
+    """Get a page of doctors for recipient selection"""
+    try:
+        return api_client.get_page(f"{API_BASE_URL}/doctor/") or []
     except:
         return []
 
 def get_nurses():
-    """Get all nurses for recipient selection"""
+    """Get a page of nurses for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/nurse/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/nurse/") or []
     except:
         return []
 
 def create_message(subject, content, recipient_type, recipient_id, priority, sender_id, sender_role):
-    """Create and send a new message"""
+    """Create a message and deliver it to its recipient in one request"""
     try:
-        # Create the message with basic information
         message_data = {
             "Subject": subject,
             "Content": content,
@@ -96,33 +102,16 @@ def create_message(subject, content, recipient_type, recipient_id, priority, sen
             "SenderType": sender_role,
             "ReadStatus": False,
             "Priority": priority,
-            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "recipients": [{"user_type": recipient_type, "user_id": recipient_id}]
         }
         
-        # Actually call the API
-        response = requests.post(f"{API_BASE_URL}/message/", json=message_data)
+        # The message and its recipient link are stored in one transaction
+        response = requests.post(f"{API_BASE_URL}/message/send", json=message_data)
         
         if response.status_code == 201:
-            response_data = response.json()
-            
-            # Get the message ID from response
-            message_id = response_data.get('message_id')
-            
-            if message_id:
-                # Link message to recipient based on type
-                if recipient_type == "doctor":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_doctor", json={"DoctorID": recipient_id})
-                elif recipient_type == "nurse":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_nurse", json={"NurseID": recipient_id})
-                
-                if link_response.status_code == 200:
-                    return True
-                else:
-                    return False
-            else:
-                return False
-        else:
-            return False
+            return True
+        return False
         
     except Exception as e:
         return False
@@ -274,22 +263,26 @@ with col2:
 st.markdown(create_medical_divider(), unsafe_allow_html=True)
 st.markdown("### 📊 Message Statistics")
 
+# Counted by the API over the whole inbox, not just the loaded page
+summary = get_message_summary("patient", patient_id)
+if summary is None:
+    summary = {"total": len(messages), "unread": sum(1 for msg in messages if not msg.get('ReadStatus', False)), "by_priority": {}}
+    for msg in messages:
+        counts = summary["by_priority"].setdefault(msg.get('Priority', 'Normal'), {"total": 0, "unread": 0})
+        counts["total"] += 1
+
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_messages = len(messages)
-    st.metric("Total Messages", total_messages)
+    st.metric("Total Messages", summary["total"])
 
 with col2:
-    unread_count = sum(1 for msg in messages if not msg.get('ReadStatus', False))
-    st.metric("Unread Messages", unread_count)
+    st.metric("Unread Messages", summary["unread"])
 
 with col3:
-    high_priority = sum(1 for msg in messages if msg.get('Priority') == 'High')
-    st.metric("High Priority", high_priority)
+    st.metric("High Priority", summary["by_priority"].get("High", {}).get("total", 0))
 
 with col4:
-    urgent_count = sum(1 for msg in messages if msg.get('Priority') == 'Urgent')
-    st.metric("Urgent", urgent_count)
+    st.metric("Urgent", summary["by_priority"].get("Urgent", {}).get("total", 0))
 
 
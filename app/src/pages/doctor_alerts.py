@@ -9,6 +9,7 @@ import pandas as pd
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_metric_card, create_medical_divider
 
 ## Apply medical theme and styling
@@ -36,10 +37,11 @@ API_BASE_URL = "http://web-api:4000"
 DEFAULT_DOCTOR_ID = 1
 
 ## API functions
-def get_alerts():
-    """Get all alerts - doctors and nurses see the same alerts"""
+def get_alerts(doctor_id):
+    """Get the alerts this doctor has not acknowledged, most urgent first, then oldest"""
     try:
-        response = requests.get(f"{API_BASE_URL}/alert/")
+        response = api_client.get(f"{API_BASE_URL}/alert/queue",
+                                params={"user_type": "doctor", "user_id": doctor_id, "limit": 500})
         if response.status_code == 200:
             return response.json()
         return []
@@ -57,6 +59,19 @@ def get_alerts():
             }
         ]
 
+def search_alerts(query, urgency=None):
+    """Full-text search over alert messages and protocols, best match first"""
+    params = {"q": query}
+    if urgency:
+        params["urgency"] = urgency
+    try:
+        response = api_client.get(f"{API_BASE_URL}/alert/search", params=params)
+        if response.status_code == 200:
+            return response.json()
+        return []
+    except:
+        return None
+
 def ack_alert(alert_id, doctor_id):
     """Acknowledge an alert"""
     try:
@@ -71,7 +86,7 @@ def ack_alert(alert_id, doctor_id):
 def get_alert(alert_id):
     """Get specific alert details"""
     try:
-        response = requests.get(f"{API_BASE_URL}/alert/{alert_id}")
+        response = api_client.get(f"{API_BASE_URL}/alert/{alert_id}")
         if response.status_code == 200:
             return response.json()
         return None
@@ -100,7 +115,7 @@ def delete_alert(alert_id):
 doctor_id = st.session_state.get('current_doctor_id', DEFAULT_DOCTOR_ID)
 
 # Load data
-alerts = get_alerts()
+alerts = get_alerts(doctor_id)
 
 if not alerts:
     st.info("No active alerts at this time.")
@@ -108,15 +123,13 @@ if not alerts:
 
 # Convert to DataFrame for enhanced functionality
 df = pd.DataFrame(alerts)
-if not df.empty:
-    if "SentTime" in df.columns:
-        df["SentTime"] = pd.to_datetime(df["SentTime"], errors="coerce")
-    if "UrgencyLevel" in df.columns:
-        df = df.sort_values(by=["UrgencyLevel", "SentTime"], ascending=[False, False])
+# The queue already arrives most urgent first, then oldest
+if not df.empty and "SentTime" in df.columns:
+    df["SentTime"] = pd.to_datetime(df["SentTime"], errors="coerce")
 
 # Dashboard metrics
 metric_1, metric_2, metric_3 = st.columns(3)
-metric_1.markdown(create_metric_card("Total Alerts", len(df) if not df.empty else 0, "📊"), unsafe_allow_html=True)
+metric_1.markdown(create_metric_card("Unacknowledged", len(df) if not df.empty else 0, "📊"), unsafe_allow_html=True)
 metric_2.markdown(create_metric_card("High Urgency (≥4)", int((df["UrgencyLevel"] >= 4).sum()) if not df.empty and "UrgencyLevel" in df.columns else 0, "⚠️"), unsafe_allow_html=True)
 metric_3.markdown(create_metric_card("Last Alert", "-" if df.empty or "SentTime" not in df.columns else df["SentTime"].max().strftime("%Y-%m-%d %H:%M"), "🕐"), unsafe_allow_html=True)
 
@@ -131,13 +144,20 @@ with left:
     urgency = f2.selectbox("Urgency", ["All", "5", "4", "3", "2", "1"], index=0)
 
     view = df.copy() if not df.empty else pd.DataFrame()
-    if not view.empty and query:
-        ql = query.lower()
-        cols = [c for c in ["Message", "Protocol", "PostedBy", "PostedByRole"] if c in view.columns]
-        if cols:
-            view = view[view[cols].astype(str).apply(lambda r: any(ql in str(x).lower() for x in r), axis=1)]
-    if not view.empty and urgency != "All" and "UrgencyLevel" in view.columns:
-        view = view[view["UrgencyLevel"] == int(urgency)]
+    results = search_alerts(query, None if urgency == "All" else urgency) if query.strip() else None
+    if results is not None:
+        # The API ranks matches by relevance, so keep its order
+        view = pd.DataFrame(results)
+        if not view.empty and "SentTime" in view.columns:
+            view["SentTime"] = pd.to_datetime(view["SentTime"], errors="coerce")
+    else:
+        if not view.empty and query:
+            ql = query.lower()
+            cols = [c for c in ["Message", "Protocol", "PostedBy", "PostedByRole"] if c in view.columns]
+            if cols:
+                view = view[view[cols].astype(str).apply(lambda r: any(ql in str(x).lower() for x in r), axis=1)]
+        if not view.empty and urgency != "All" and "UrgencyLevel" in view.columns:
+            view = view[view["UrgencyLevel"] == int(urgency)]
 
     display_cols = [c for c in ["AlertID", "UrgencyLevel", "Message", "Protocol", "PostedBy", "SentTime"] if c in view.columns]
     st.dataframe(
@@ -156,10 +176,11 @@ with left:
                 st.rerun()
     with c2:
         if st.button("Acknowledge", type="primary", use_container_width=True, disabled=(int(selected_id) <= 0)):
-            if delete_alert(int(selected_id)):
+            # acknowledged alerts drop out of this doctor's queue only
+            if ack_alert(int(selected_id), doctor_id):
                 st.rerun()
             else:
-                st.error("Failed to delete alert")
+                st.error("Failed to acknowledge alert")
 
 
 
@@ -10,6 +10,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_metric_card, create_patient_card, create_medical_divider
  
 ## Apply medical theme and styling
@@ -43,21 +44,9 @@ def render_patient_card(patient_data):
     conditions = patient_data.get('conditions', [])
     medications = patient_data.get('medications', [])
 
-    ## Get admit date - check multiple sources
+    ## Get admit date from the patient's current visit (already in the chart)
     admit_date = 'N/A'
-    
-    # First check if patient has a direct VisitID
-    if patient.get('VisitID'):
-        try:
-            visit_response = requests.get(f"{API_BASE_URL}/visit/{patient.get('VisitID')}")
-            if visit_response.status_code == 200:
-                visit_data = visit_response.json()
-                admit_date = visit_data.get('AppointmentDate', 'N/A')
-        except:
-            pass
-    
-    # If no direct visit, check the visits list
-    if admit_date == 'N/A' and visits:
+    if visits:
         latest_visit = visits[-1] if len(visits) > 0 else {}
         admit_date = latest_visit.get('AppointmentDate', 'N/A')
     
@@ -121,25 +110,23 @@ def render_patient_card(patient_data):
                 except Exception as e:
                     st.error(f"Error displaying medications: {str(e)}")
  
+# Patient cards listed when nothing is searched; each card is one chart request
+PATIENT_CARDS = 20
+
 ## API functions with proper error handling
-def get_doctors():
-    """Get all doctors from API"""
+def get_doctor():
+    """Get the doctor this page is shown for (the first doctor)"""
     try:
-        response = requests.get(f"{API_BASE_URL}/doctor/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        doctors = api_client.get_page(f"{API_BASE_URL}/doctor/", params={"limit": 1})
+        return doctors[0] if doctors else None
     except:
         st.warning("Could not connect to doctors API, using dummy data.")
-        return [{"DoctorID": 1, "FirstName": "Maya", "LastName": "Ellison"}]
+        return {"DoctorID": 1, "FirstName": "Maya", "LastName": "Ellison"}
  
-def get_patients():
-    """Get all patients from API"""
+def get_patients(limit):
+    """Get the first page of patients from API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/patient/", params={"limit": limit}) or []
     except:
         st.warning("Could not connect to patients API, using dummy data.")
         return [
@@ -147,139 +134,56 @@ def get_patients():
             {"PatientID": 2, "FirstName": "John", "LastName": "Smith", "DOB": "1985-05-15", "BloodType": "A-", "Weight": 180}
         ]
  
-def get_patient_details(patient_id):
-    """Get detailed patient information"""
+def get_count(path, params=None):
+    """Get a dashboard count from one of the API's /count endpoints"""
     try:
-        ## Get patient basic info
-        patient_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}")
-        if patient_response.status_code != 200:
-            return None
- 
-        patient = patient_response.json()
- 
-        ## Get patient vitals
-        try:
-            vitals_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/vitals")
-            vitals = vitals_response.json() if vitals_response.status_code == 200 else []
-        except:
-            vitals = []
- 
-        ## Get patient conditions
-        try:
-            conditions_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/condition")
-            conditions = conditions_response.json() if conditions_response.status_code == 200 else []
-        except:
-            conditions = []
- 
-        ## Get patient medications
-        try:
-            meds_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/medications")
-            medications = meds_response.json() if meds_response.status_code == 200 else []
-        except:
-            medications = []
- 
-        ## Get patient visits - try multiple approaches
-        patient_visits = []
-        
-        # Method 1: Get all visits and filter by patient ID
-        try:
-            visits_response = requests.get(f"{API_BASE_URL}/visit/")
-            if visits_response.status_code == 200:
-                all_visits = visits_response.json()
-                patient_visits = [v for v in all_visits if v.get('PatientID') == patient_id]
-        except:
-            pass
-        
-        # Method 2: If patient has VisitID, get that specific visit
-        if not patient_visits and patient.get('VisitID'):
-            try:
-                specific_visit_response = requests.get(f"{API_BASE_URL}/visit/{patient.get('VisitID')}")
-                if specific_visit_response.status_code == 200:
-                    specific_visit = specific_visit_response.json()
-                    patient_visits = [specific_visit]
-            except:
-                pass
- 
-        return {
-            'patient': patient,
-            'vitals': vitals,
-            'conditions': conditions,
-            'medications': medications,
-            'visits': patient_visits
-        }
-    except Exception as e:
-        return None
- 
-def get_visits():
-    """Get all visits from API"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/visit/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_count(f"{API_BASE_URL}{path}", params=params)
     except:
-        st.warning("Could not connect to visits API, using dummy data.")
-        return [
-            {"VisitID": 1, "PatientID": 1, "Status": "Active", "AppointmentDate": "2024-01-15"},
-            {"VisitID": 2, "PatientID": 2, "Status": "Active", "AppointmentDate": "2024-01-20"},
-            {"VisitID": 3, "PatientID": 1, "Status": "Scheduled", "AppointmentDate": "2024-02-01", "NextVisitDate": "2024-02-01"}
-        ]
+        st.warning(f"Could not connect to {path} API.")
+        return None
  
-def get_vitals():
-    """Get all vital charts from API"""
+def search_patients(query):
+    """Ranked, typo-tolerant patient name search on the API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/vital/")
+        response = api_client.get(f"{API_BASE_URL}/patient/search", params={"q": query, "limit": 25})
         if response.status_code == 200:
             return response.json()
         return []
     except:
-        st.warning("Could not connect to vitals API, using dummy data.")
-        return [{"VitalID": 1, "PatientID": 1, "HeartRate": 75, "BloodPressure": "120/80"}]
- 
-def get_conditions():
-    """Get all conditions from API"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/condition/")
-        if response.status_code == 200:
-            return response.json()
+        st.warning("Could not connect to patient search API.")
         return []
-    except:
-        st.warning("Could not connect to conditions API, using dummy data.")
-        return [{"ConditionID": 1, "PatientID": 1, "Condition": "Hypertension", "Severity": "Mild"}]
  
-def get_alerts():
-    """Get all alerts - doctors and nurses see the same alerts"""
+def get_patient_details(patient_id):
+    """Get detailed patient information in a single chart request"""
     try:
-        response = requests.get(f"{API_BASE_URL}/alert/")
-        if response.status_code == 200:
-            return response.json()
-        return []
-    except:
-        st.warning("Could not connect to alerts API, using dummy data.")
-        return [{"AlertID": 1, "Title": "High Blood Pressure", "Description": "Patient BP elevated", "Severity": "High"}]
+        response = api_client.get(
+            f"{API_BASE_URL}/patient/{patient_id}/chart",
+            params={"include": "vitals,condition,medications,visit"}
+        )
+        if response.status_code != 200:
+            return None
  
-def get_messages(doctor_id):
-    """Get messages for specific doctor"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/message/?user_type=doctor&user_id={doctor_id}")
-        if response.status_code == 200:
-            return response.json()
-        return []
-    except:
-        st.warning("Could not connect to messages API, using dummy data.")
-        return [{"MessageID": 1, "Subject": "Patient Update", "Content": "Patient condition improved", "Priority": "Normal"}]
+        chart = response.json()
+        return {
+            'patient': chart.get('patient', {}),
+            'vitals': chart.get('vitals', []),
+            'conditions': chart.get('condition') or [],
+            'medications': chart.get('medications', []),
+            'visits': [chart['visit']] if chart.get('visit') else []
+        }
+    except Exception as e:
+        return None
  
 ## Get doctor information for the current session
-doctors = get_doctors()
-if doctors:
-    current_doctor = doctors[0]
+current_doctor = get_doctor()
+if current_doctor:
     st.session_state.current_doctor_id = current_doctor.get('DoctorID', 1)
 else:
     st.session_state.current_doctor_id = 1
  
 ## Welcome message
-if doctors:
-    doctor_name = f"Dr. {doctors[0].get('LastName', 'Ellison')}"
+if current_doctor:
+    doctor_name = f"Dr. {current_doctor.get('LastName', 'Ellison')}"
     st.markdown(f"### Welcome, {doctor_name}")
 else:
     st.markdown("### Welcome, Dr. Ellison")
@@ -291,11 +195,11 @@ st.markdown("### Dashboard Overview")
 col1, col2, col3, col4 = st.columns(4)
  
 with col1:
-    patients = get_patients()
+    total_patients = get_count("/patient/count")
     st.markdown(
         f"""
         <div class="metric-card">
-            <div class="metric-value">{len(patients) if patients else 0}</div>
+            <div class="metric-value">{total_patients or 0}</div>
             <div class="metric-label">Total Patients</div>
         </div>
         """,
@@ -303,24 +207,23 @@ with col1:
     )
  
 with col2:
-    visits = get_visits()
-    active_visits = len([v for v in visits if v.get('Status') == 'Active']) if visits else 0
+    upcoming_visits = get_count("/visit/count", params={"from": datetime.now().date().isoformat()})
     st.markdown(
         f"""
         <div class="metric-card">
-            <div class="metric-value">{active_visits}</div>
-            <div class="metric-label">Active Visits</div>
+            <div class="metric-value">{upcoming_visits or 0}</div>
+            <div class="metric-label">Upcoming Visits</div>
         </div>
         """,
         unsafe_allow_html=True
     )
  
 with col3:
-    vitals = get_vitals()
+    vital_records = get_count("/vital/count")
     st.markdown(
         f"""
         <div class="metric-card">
-            <div class="metric-value">{len(vitals) if vitals else 0}</div>
+            <div class="metric-value">{vital_records or 0}</div>
             <div class="metric-label">Vital Records</div>
         </div>
         """,
@@ -328,11 +231,11 @@ with col3:
     )
  
 with col4:
-    conditions = get_conditions()
+    condition_count = get_count("/condition/count")
     st.markdown(
         f"""
         <div class="metric-card">
-            <div class="metric-value">{len(conditions) if conditions else 0}</div>
+            <div class="metric-value">{condition_count or 0}</div>
             <div class="metric-label">Conditions</div>
         </div>
         """,
@@ -345,16 +248,9 @@ st.markdown("---")
 st.markdown("### Patient Search & Management")
 patient_search = st.text_input("Search Patients", placeholder="Search patients by name...", label_visibility="visible")
  
-## Get all patients and filter based on search
-all_patients = get_patients()
+## Search patients by name on the server
 if patient_search:
-    # Search patients by their names
-    filtered_patients = []
-    if all_patients:
-        for patient in all_patients:
-            full_name = f"{patient.get('FirstName', '')} {patient.get('LastName', '')}".lower()
-            if patient_search.lower() in full_name:
-                filtered_patients.append(patient)
+    filtered_patients = search_patients(patient_search)
  
     if filtered_patients:
         st.info(f"Found {len(filtered_patients)} patients matching '{patient_search}'")
@@ -362,7 +258,9 @@ if patient_search:
         st.warning(f"No patients found matching '{patient_search}'")
         filtered_patients = []
 else:
-    filtered_patients = all_patients if all_patients else []
+    filtered_patients = get_patients(PATIENT_CARDS)
+    if total_patients and total_patients > len(filtered_patients):
+        st.caption(f"Showing the first {len(filtered_patients)} of {total_patients} patients. Search to find others.")
  
 ## Display patient cards
 if filtered_patients:
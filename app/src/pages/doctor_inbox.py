@@ -9,6 +9,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_medical_divider
 
 ## Apply medical theme and styling
@@ -36,48 +37,48 @@ API_BASE_URL = "http://web-api:4000"
 def get_messages(doctor_id):
     """Get messages for specific doctor"""
     try:
-        response = requests.get(f"{API_BASE_URL}/message/?user_type=doctor&user_id={doctor_id}")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/message/?user_type=doctor&user_id={doctor_id}") or []
     except:
         st.warning("Could not connect to messages API, using dummy data.")
         return [{"MessageID": 1, "Subject": "Patient Update", "Content": "Patient condition improved", "Priority": "Normal", "SentTime": "2024-01-15 10:30:00", "SenderType": "Nurse", "PostedBy": 1, "ReadStatus": False}]
 
-def get_doctors():
-    """Get all doctors for recipient selection"""
+def get_message_summary(user_type, user_id):
+    """Get unread/priority counts for a user's inbox, computed by the API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/doctor/")
+        response = api_client.get(
+            f"{API_BASE_URL}/message/summary",
+            params={"user_type": user_type, "user_id": user_id, "latest": 0},
+        )
         if response.status_code == 200:
             return response.json()
-        return []
+        return None
+    except:
+        return None
+
+def get_doctors():
+    """Get a page of doctors for recipient selection"""
+    try:
+        return api_client.get_page(f"{API_BASE_URL}/doctor/") or []
     except:
         return []
 
 def get_nurses():
-    """Get all nurses for recipient selection"""
+    """Get a page of nurses for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/nurse/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/nurse/") or []
     except:
         return []
 
 def get_patients():
-    """Get all patients for recipient selection"""
+    """Get a page of patients for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/patient/") or []
     except:
         return []
 
 def create_message(subject, content, recipient_type, recipient_id, priority, sender_id, sender_role):
-    """Create and send a new message"""
+    """Create a message and deliver it to its recipient in one request"""
     try:
-        # Create the message with basic information
         message_data = {
             "Subject": subject,
             "Content": content,
@@ -86,56 +87,45 @@ def create_message(subject, content, recipient_type, recipient_id, priority, sen
             "SenderType": sender_role,
             "ReadStatus": False,
             "Priority": priority,
-            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "recipients": [{"user_type": recipient_type, "user_id": recipient_id}]
         }
         
-        st.info(f"Creating message: {message_data}")
-        
-        # Actually call the API
-        response = requests.post(f"{API_BASE_URL}/message/", json=message_data)
-        
-        st.info(f"Message creation response: {response.status_code} - {response.text}")
+        # The message and its recipient link are stored in one transaction
+        response = requests.post(f"{API_BASE_URL}/message/send", json=message_data)
         
         if response.status_code == 201:
-            response_data = response.json()
-            st.info(f"Response data: {response_data}")
-            
-            # Get the message ID from response
-            message_id = response_data.get('message_id')
-            
-            if message_id:
-                st.info(f"Message created with ID: {message_id}")
-                
-                # Try to link message to recipient based on type
-                try:
-                    if recipient_type == "doctor":
-                        link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_doctor", json={"DoctorID": recipient_id})
-                    elif recipient_type == "nurse":
-                        link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_nurse", json={"NurseID": recipient_id})
-                    elif recipient_type == "patient":
-                        link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_patient", json={"PatientID": recipient_id})
-                    
-                    st.info(f"Link response: {link_response.status_code} - {link_response.text}")
-                    
-                    if link_response.status_code == 200:
-                        return True
-                    else:
-                        st.error(f"Failed to link message: {link_response.status_code}")
-                        return False
-                except Exception as link_error:
-                    st.error(f"Error linking message: {str(link_error)}")
-                    return False
-            else:
-                st.error("No message ID returned from API")
-                return False
-        else:
-            st.error(f"Failed to create message: {response.status_code}")
-            return False
+            return True
+        st.error(f"Failed to send message: {response.status_code}")
+        return False
         
     except Exception as e:
-        st.error(f"Exception in create_message: {str(e)}")
+        st.error(f"Error sending message: {str(e)}")
         return False
 
+def broadcast_message(subject, content, targets, priority, sender_id, sender_role):
+    """Send one message to a group (e.g. all nurses on my patients), expanded by the API"""
+    try:
+        message_data = {
+            "Subject": subject,
+            "Content": content,
+            "PostedBy": sender_id,
+            "PostedByRole": sender_role,
+            "SenderType": sender_role,
+            "ReadStatus": False,
+            "Priority": priority,
+            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "targets": targets
+        }
+        response = requests.post(f"{API_BASE_URL}/message/send", json=message_data)
+        if response.status_code == 201:
+            return response.json().get("recipients", 0)
+        st.error(f"Failed to send message: {response.json().get('error', response.status_code)}")
+        return 0
+    except Exception as e:
+        st.error(f"Error sending message: {str(e)}")
+        return 0
+
 def delete_message(message_id):
     """Delete a message (acknowledge it)"""
     try:
@@ -173,7 +163,11 @@ if 'message_sent_success' in st.session_state:
 col1, col2 = st.columns([1.5, 1])  # Give compose section more space
 
 with col1:
-    st.markdown("### 📥 Inbox")
+    summary = get_message_summary("doctor", doctor_id)
+    if summary and summary["unread"]:
+        st.markdown(f"### 📥 Inbox ({summary['unread']} unread)")
+    else:
+        st.markdown("### 📥 Inbox")
     
     if not messages:
         st.info("No messages in your inbox.")
@@ -204,7 +198,12 @@ with col2:
     if 'recipient_type' not in st.session_state:
         st.session_state.recipient_type = "doctor"
     
-    recipient_type = st.selectbox("Send to:", ["doctor", "nurse", "patient"], key="recipient_type_selector")
+    # Group options are expanded into recipients by the API in one request
+    broadcast_targets = {
+        "all nurses on my patients": [{"role": "nurse", "doctor_id": doctor_id}],
+        "all my patients": [{"role": "patient", "doctor_id": doctor_id}],
+    }
+    recipient_type = st.selectbox("Send to:", ["doctor", "nurse", "patient"] + list(broadcast_targets), key="recipient_type_selector")
     
     # Update session state when selection changes
     if st.session_state.recipient_type != recipient_type:
@@ -262,7 +261,15 @@ with col2:
         submitted = st.form_submit_button("📤 Send Message", type="primary", use_container_width=True)
     
     # Handle form submission outside the form
-    if submitted:
+    if submitted and st.session_state.recipient_type in broadcast_targets:
+        if subject and content:
+            sent = broadcast_message(subject, content, broadcast_targets[st.session_state.recipient_type], priority, doctor_id, "Doctor")
+            if sent:
+                st.session_state['message_sent_success'] = True
+                st.rerun()
+        else:
+            st.warning("Please fill in all required fields.")
+    elif submitted:
         if subject and content and recipient_id:
             # Call create_message function
             if create_message(subject, content, st.session_state.recipient_type, recipient_id, priority, doctor_id, "Doctor"):
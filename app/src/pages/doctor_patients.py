@@ -9,6 +9,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 
 ## Page config - MUST be first Streamlit command
 from modules.styles import apply_page_styling, create_metric_card, create_patient_card, create_medical_divider
@@ -29,13 +30,10 @@ if "current_view" not in st.session_state:
 API_BASE_URL = "http://web-api:4000"
 
 ## API functions
-def get_patients():
-    """Get all patients from API"""
+def get_patients(params=None):
+    """Get the first page of patients matching the roster filters"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/patient/", params=params) or []
     except:
         st.warning("Could not connect to patients API, using dummy data.")
         return [
@@ -43,99 +41,64 @@ def get_patients():
             {"PatientID": 2, "FirstName": "John", "LastName": "Smith", "DOB": "1985-05-15", "BloodType": "A-", "Weight": 180}
         ]
 
-def get_doctor_patients(doctor_id):
-    """Get patients assigned to a specific doctor"""
-    try:
-        # First try to get patients directly assigned to this doctor
-        response = requests.get(f"{API_BASE_URL}/patient/")
-        if response.status_code == 200:
-            all_patients = response.json()
-            
-            # Look for patients with this doctor assigned
-            assigned_patients = []
-            
-            # Check different possible field names for doctor assignment
-            for patient in all_patients:
-                if (patient.get('DoctorID') == doctor_id or 
-                    patient.get('AssignedDoctorID') == doctor_id or
-                    patient.get('PrimaryDoctorID') == doctor_id or
-                    patient.get('AttendingDoctorID') == doctor_id):
-                    assigned_patients.append(patient)
-            
-            if assigned_patients:
-                return assigned_patients
-            
-            # If no direct assignment, try to find through visits (as fallback)
-            visits_response = requests.get(f"{API_BASE_URL}/visit/")
-            if visits_response.status_code == 200:
-                visits = visits_response.json()
-                
-                # Get unique patient IDs from doctor's visits
-                doctor_visits = [v for v in visits if v.get('DoctorID') == doctor_id]
-                patient_ids = list(set([v.get('PatientID') for v in doctor_visits if v.get('PatientID')]))
-                
-                if patient_ids:
-                    # Get patient details for each patient ID
-                    patients = []
-                    for patient_id in patient_ids:
-                        patient_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}")
-                        if patient_response.status_code == 200:
-                            patients.append(patient_response.json())
-                    return patients
-            
-            return []
-        else:
-            return []
-    except Exception as e:
-        return []
+def get_visit_dates(patients):
+    """Get the appointment date of each patient's current visit in one batch request"""
+    visit_ids = {p.get('PatientID'): p.get('VisitID') for p in patients if p.get('VisitID')}
+    if not visit_ids:
+        return {}
+    response = api_client.get(
+        f"{API_BASE_URL}/visit/batch",
+        params={"ids": ",".join(str(vid) for vid in set(visit_ids.values()))}
+    )
+    if response.status_code != 200:
+        return None
+    visits = response.json().get('results', {})
+    return {
+        patient_id: visits[str(visit_id)].get('AppointmentDate')
+        for patient_id, visit_id in visit_ids.items() if str(visit_id) in visits
+    }
 
 def get_patient_details(patient_id):
-    """Get detailed patient information"""
+    """Get detailed patient information in a single chart request"""
     try:
-        # Get patient basic info
-        patient_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}")
-        if patient_response.status_code != 200:
+        response = api_client.get(
+            f"{API_BASE_URL}/patient/{patient_id}/chart",
+            params={"include": "vitals,medications,condition"}
+        )
+        if response.status_code != 200:
             return None
             
-        patient = patient_response.json()
-        
-        # Get patient vitals
-        vitals_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/vitals")
-        if vitals_response.status_code == 200:
-            vitals = vitals_response.json()
-            # Ensure vitals is a list
-            if not isinstance(vitals, list):
-                vitals = []
-        else:
-            vitals = []
-        
-        # Get patient medications
-        meds_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/medications")
-        medications = meds_response.json() if meds_response.status_code == 200 else []
-        
-        # Get patient conditions
-        conditions_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/condition")
-        if conditions_response.status_code == 200:
-            conditions = conditions_response.json()
-            # Ensure conditions is a list
-            if not isinstance(conditions, list):
-                conditions = [conditions] if conditions else []
-        else:
-            conditions = []
+        chart = response.json()
+        condition = chart.get('condition')
         
         return {
-            'patient': patient,
-            'vitals': vitals,
-            'medications': medications,
-            'conditions': conditions
+            'patient': chart.get('patient', {}),
+            'vitals': chart.get('vitals', []),
+            'medications': chart.get('medications', []),
+            'conditions': [condition] if condition else []
         }
     except:
         return None
 
-def get_all_medications():
-    """Get all available medications from API"""
+def search_medication_catalog(prefix):
+    """Autocomplete drug names from the medication catalog"""
+    try:
+        response = api_client.get(
+            f"{API_BASE_URL}/medication/search", params={"prefix": prefix, "limit": 20}, timeout=5
+        )
+        if response.status_code == 200:
+            return response.json()
+        return []
+    except:
+        return []
+
+def get_vital_trends(patient_id, resolution):
+    """Get downsampled vitals (min/max/mean/last per bucket) for charting"""
     try:
-        response = requests.get(f"{API_BASE_URL}/medication/")
+        response = api_client.get(
+            f"{API_BASE_URL}/vital/rollups",
+            params={"patient_id": patient_id, "resolution": resolution, "limit": 500},
+        )
         if response.status_code == 200:
             return response.json()
         return []
@@ -153,40 +116,40 @@ def update_patient_vitals(patient_id, vitals_data):
 def update_patient_medications(patient_id, medication_data):
     """Prescribe new medication to patient"""
     try:
-        # First create the medication
+        # First find the drug in the catalog (added if it is new)
         medication_create_data = {
             "PrescriptionName": medication_data["MedicationName"],
             "DosageAmount": medication_data["DosageAmount"],
-            "DosageUnit": medication_data["DosageUnit"],
-            "PickUpLocation": medication_data["PickUpLocation"],
-            "RefillsLeft": medication_data["RefillsLeft"],
-            "FrequencyAmount": medication_data["FrequencyAmount"],
-            "FrequencyPeriod": medication_data["FrequencyPeriod"]
+            "DosageUnit": medication_data["DosageUnit"]
         }
         
         med_response = requests.post(f"{API_BASE_URL}/medication/", json=medication_create_data)
         
-        if med_response.status_code != 201:
+        if med_response.status_code not in (200, 201):
             st.error(f"Failed to create medication: {med_response.text}")
             return False
         
-        # Get the created medication ID
+        # Get the catalog medication ID
         medication_id = med_response.json().get("medication_id")
         if not medication_id:
             st.error("No medication ID returned from creation")
             return False
         
-        # Then link the medication to the patient
+        # Then prescribe it to the patient
         patient_med_data = {
             "PatientID": patient_id,
             "MedicationID": medication_id,
             "PrescribedDate": medication_data["StartDate"],
-            "EndDate": medication_data["EndDate"]
+            "EndDate": medication_data["EndDate"],
+            "PickUpLocation": medication_data["PickUpLocation"],
+            "RefillsLeft": medication_data["RefillsLeft"],
+            "FrequencyAmount": medication_data["FrequencyAmount"],
+            "FrequencyPeriod": medication_data["FrequencyPeriod"]
         }
         
         link_response = requests.post(f"{API_BASE_URL}/medication/patient_medications", json=patient_med_data)
         
-        if link_response.status_code != 201:
+        if link_response.status_code not in (200, 201):
             st.error(f"Failed to link patient to medication: {link_response.text}")
             return False
             
@@ -231,18 +194,6 @@ def show_patient_list():
         if st.button("🔄 Refresh", use_container_width=True):
             st.rerun()
     
-    # Get patients based on filter
-    if show_my_patients and doctor_id:
-        patients = get_doctor_patients(doctor_id)
-        if not patients:
-            st.info(f"No patients found assigned to Doctor {doctor_id}")
-            patients = get_patients()  # Fallback to all patients
-    else:
-        patients = get_patients()
-        if not patients:
-            st.warning("No patients found.")
-            st.stop()
-    
     # Patient search and filtering
     col1, col2 = st.columns([3, 1])
     with col1:
@@ -250,14 +201,21 @@ def show_patient_list():
     with col2:
         sort_by = st.selectbox("Sort by", ["Name", "DOB", "Recent Visit"])
     
-    # Filter patients by their names
+    # Filter by doctor and name on the server, one page at a time
+    params = {}
     if patient_filter:
-        filtered_patients = [
-            p for p in patients 
-            if patient_filter.lower() in f"{p.get('FirstName', '')} {p.get('LastName', '')}".lower()
-        ]
+        params["name"] = patient_filter
+    if show_my_patients and doctor_id:
+        patients = get_patients(dict(params, doctor_id=doctor_id))
+        if not patients:
+            st.info(f"No patients found assigned to Doctor {doctor_id}")
+            patients = get_patients(params)  # Fallback to all patients
     else:
-        filtered_patients = patients
+        patients = get_patients(params)
+        if not patients and not patient_filter:
+            st.warning("No patients found.")
+            st.stop()
+    filtered_patients = patients
     
     # Sort patients based on selected criteria
     if sort_by == "Name":
@@ -265,25 +223,12 @@ def show_patient_list():
     elif sort_by == "DOB":
         filtered_patients.sort(key=lambda x: x.get('DOB', ''), reverse=True)  # Most recent first
     elif sort_by == "Recent Visit":
-        # Production-ready: Fetch actual visit data and sort by visit dates
+        # Sort by the appointment date of each patient's current visit
         try:
-            # Get all visits to find the most recent visit for each patient
-            visits_response = requests.get(f"{API_BASE_URL}/visit/")
-            if visits_response.status_code == 200:
-                all_visits = visits_response.json()
-                
-                # Create a mapping of patient_id to their most recent visit date
-                patient_last_visit = {}
-                for visit in all_visits:
-                    patient_id = visit.get('PatientID')
-                    visit_date = visit.get('VisitDate') or visit.get('CreatedAt') or visit.get('Timestamp')
-                    if patient_id and visit_date:
-                        if patient_id not in patient_last_visit or visit_date > patient_last_visit[patient_id]:
-                            patient_last_visit[patient_id] = visit_date
-                
-                # Sort patients by their most recent visit date
+            visit_dates = get_visit_dates(filtered_patients)
+            if visit_dates is not None:
                 filtered_patients.sort(
-                    key=lambda x: patient_last_visit.get(x.get('PatientID'), '1900-01-01'),
+                    key=lambda x: str(visit_dates.get(x.get('PatientID')) or '1900-01-01'),
                     reverse=True  # Most recent visits first
                 )
             else:
@@ -479,6 +424,18 @@ def show_patient_chart():
     else:
         st.info("No vital records found")
     
+    # Trends come from server-side rollups, never raw monitor readings
+    st.markdown("### Vital Trends")
+    resolution = st.radio("Resolution", ["1m", "15m", "1h"], index=1, horizontal=True)
+    trends = get_vital_trends(patient_id, resolution)
+    if trends:
+        df_t = pd.DataFrame(trends)
+        df_t["BucketStart"] = pd.to_datetime(df_t["BucketStart"], errors="coerce")
+        mean_cols = [c for c in ["HeartRateMean", "SystolicMean", "DiastolicMean", "RespiratoryRateMean"] if c in df_t.columns]
+        st.line_chart(df_t.set_index("BucketStart")[mean_cols])
+    else:
+        st.info("No vital history recorded yet")
+    
     # Add new vitals
     st.markdown("### Add New Vital Signs")
     with st.form("new_vitals"):
@@ -495,6 +452,7 @@ def show_patient_chart():
         if st.form_submit_button("💾 Add New Vitals"):
             new_vitals = {
                 "PatientID": patient_id,
+                "RecordedAt": timestamp.isoformat(),
                 "HeartRate": heart_rate,
                 "BloodPressure": blood_pressure,
                 "Temperature": temperature,
@@ -522,7 +480,6 @@ def show_patient_medications():
     
     patient = patient_data['patient']
     medications = patient_data['medications']
-    all_meds = get_all_medications()
     
     # Header
     col1, col2 = st.columns([4, 1])
@@ -558,12 +515,33 @@ def show_patient_medications():
     
     # Add new medication
     st.markdown("### Prescribe New Medication")
+    
+    # Pick from the catalog so the same drug is not entered twice;
+    # outside the form so suggestions update as the doctor types
+    catalog_prefix = st.text_input("Search medication catalog", placeholder="e.g., lisin")
+    chosen = {}
+    if catalog_prefix.strip():
+        matches = search_medication_catalog(catalog_prefix)
+        if matches:
+            labels = ["New medication"] + [
+                f"{m.get('PrescriptionName')} {m.get('DosageAmount') or ''} {m.get('DosageUnit') or ''}".strip()
+                for m in matches
+            ]
+            picked = st.selectbox("Catalog matches", range(len(labels)), format_func=lambda i: labels[i], index=1)
+            chosen = matches[picked - 1] if picked else {}
+        else:
+            st.caption("No catalog match; the medication will be added to the catalog.")
+    
+    dosage_units = ["mg", "mcg", "g", "units", "ml", "tablets", "capsules"]
+    if chosen.get("DosageUnit") and chosen["DosageUnit"] not in dosage_units:
+        dosage_units.append(chosen["DosageUnit"])
+    
     with st.form("new_medication"):
         col1, col2 = st.columns(2)
         with col1:
-            medication_name = st.text_input("Medication Name", placeholder="e.g., Aspirin", help="Enter the name of the medication to prescribe")
-            dosage_amount = st.number_input("Dosage Amount", min_value=0.0, step=0.1, placeholder="e.g., 10.0")
-            dosage_unit = st.selectbox("Dosage Unit", ["mg", "mcg", "g", "units", "ml", "tablets", "capsules"])
+            medication_name = st.text_input("Medication Name", value=chosen.get("PrescriptionName", catalog_prefix.strip()), placeholder="e.g., Aspirin", help="Enter the name of the medication to prescribe")
+            dosage_amount = st.number_input("Dosage Amount", min_value=0.0, step=0.1, value=float(chosen.get("DosageAmount") or 0.0), placeholder="e.g., 10.0")
+            dosage_unit = st.selectbox("Dosage Unit", dosage_units, index=dosage_units.index(chosen["DosageUnit"]) if chosen.get("DosageUnit") else 0)
             frequency_amount = st.number_input("Frequency Amount", min_value=1, value=1, help="How many times per period")
             frequency_period = st.selectbox("Frequency Period", ["daily", "twice daily", "three times daily", "weekly", "as needed"])
         
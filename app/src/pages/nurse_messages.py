@@ -7,6 +7,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_medical_divider
 
 ## Apply medical theme and styling
@@ -30,12 +31,9 @@ API_BASE_URL = "http://web-api:4000"
 
 ## API functions
 def get_nurses():
-    """Get all nurses from API"""
+    """Get a page of nurses from API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/nurse/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/nurse/") or []
     except:
         st.warning("Could not connect to nurses API, using dummy data.")
         return [{"NurseID": 1, "FirstName": "Nic", "LastName": "Nevin"}]
@@ -43,41 +41,31 @@ def get_nurses():
 def get_nurse_by_name(first_name, last_name):
     """Get nurse information by name"""
     try:
-        response = requests.get(f"{API_BASE_URL}/nurse/")
+        response = api_client.get(f"{API_BASE_URL}/nurse/name/{first_name}/{last_name}")
         if response.status_code == 200:
-            nurses = response.json()
-            for nurse in nurses:
-                if nurse.get('FirstName') == first_name and nurse.get('LastName') == last_name:
-                    return nurse
+            return response.json()
         return None
     except:
         st.warning("Could not connect to nurse API, using dummy data.")
         return {"NurseID": 1, "FirstName": "Nic", "LastName": "Nevin"}
 
 def get_doctors():
-    """Get all doctors for recipient selection"""
+    """Get a page of doctors for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/doctor/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/doctor/") or []
     except:
         return []
 
 def get_patients():
-    """Get all patients for recipient selection"""
+    """Get a page of patients for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/patient/") or []
     except:
         return []
 
 def create_message(subject, content, recipient_type, recipient_id, priority, sender_id, sender_role):
-    """Create and send a new message"""
+    """Create a message and deliver it to its recipient in one request"""
     try:
-        # Create the message with basic information
         message_data = {
             "Subject": subject,
             "Content": content,
@@ -86,49 +74,26 @@ def create_message(subject, content, recipient_type, recipient_id, priority, sen
             "SenderType": sender_role,
             "ReadStatus": False,
             "Priority": priority,
-            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "recipients": [{"user_type": recipient_type, "user_id": recipient_id}]
         }
         
-        # Actually call the API
-        response = requests.post(f"{API_BASE_URL}/message/", json=message_data)
+        # The message and its recipient link are stored in one transaction
+        response = requests.post(f"{API_BASE_URL}/message/send", json=message_data)
         
         if response.status_code == 201:
-            response_data = response.json()
-            
-            # Get the message ID from response
-            message_id = response_data.get('message_id')
-            
-            if message_id:
-                # Link message to recipient based on type
-                if recipient_type == "doctor":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_doctor", json={"DoctorID": recipient_id})
-                elif recipient_type == "nurse":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_nurse", json={"NurseID": recipient_id})
-                elif recipient_type == "patient":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_patient", json={"PatientID": recipient_id})
-                
-                if link_response.status_code == 200:
-                    return True
-                else:
-                    st.error("Message created but failed to link to recipient")
-                    return False
-            else:
-                st.error("Message created but no message ID returned")
-                return False
-        else:
-            st.error(f"Failed to create message: {response.status_code}")
-            return False
+            return True
+        st.error(f"Failed to send message: {response.status_code}")
+        return False
+        
     except Exception as e:
-        st.error(f"Error creating message: {str(e)}")
+        st.error(f"Error sending message: {str(e)}")
         return False
 
 def get_messages(nurse_id):
     """Get messages for specific nurse"""
     try:
-        response = requests.get(f"{API_BASE_URL}/message/?user_type=nurse&user_id={nurse_id}")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/message/?user_type=nurse&user_id={nurse_id}") or []
     except:
         st.warning("Could not connect to messages API, using dummy data.")
         return [
@@ -136,6 +101,19 @@ def get_messages(nurse_id):
             {"MessageID": 2, "Subject": "Schedule Change", "Content": "Your shift has been changed to 3-11 PM", "Priority": "High", "SentTime": "2024-01-16 08:00:00", "SenderType": "System", "PostedBy": 1, "ReadStatus": True}
         ]
 
+def get_message_summary(user_type, user_id):
+    """Get unread/priority counts for a user's inbox, computed by the API"""
+    try:
+        response = api_client.get(
+            f"{API_BASE_URL}/message/summary",
+            params={"user_type": user_type, "user_id": user_id, "latest": 0},
+        )
+        if response.status_code == 200:
+            return response.json()
+        return None
+    except:
+        return None
+
 def delete_message(message_id):
     """Delete a message (acknowledge it)"""
     try:
@@ -194,7 +172,11 @@ if 'message_sent_success' in st.session_state:
 col1, col2 = st.columns([1.5, 1])  # Give compose section more space
 
 with col1:
-    st.markdown("### 📥 Inbox")
+    summary = get_message_summary("nurse", nurse_id)
+    if summary and summary["unread"]:
+        st.markdown(f"### 📥 Inbox ({summary['unread']} unread)")
+    else:
+        st.markdown("### 📥 Inbox")
     
     if not messages:
         st.info("No messages in your inbox.")
@@ -8,6 +8,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 
 ## Page config - MUST be first Streamlit command
 from modules.styles import apply_page_styling, create_metric_card, create_medical_divider
@@ -33,12 +34,9 @@ API_BASE_URL = "http://web-api:4000"
 
 ## API functions
 def get_proxies():
-    """Get all proxies"""
+    """Get the first proxy from API (the fallback user)"""
     try:
-        response = requests.get(f"{API_BASE_URL}/proxy/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/proxy/", params={"limit": 1}) or []
     except:
         st.warning("Could not connect to proxies API, using dummy data.")
         return [{"ProxyID": 1, "FirstName": "Nina", "LastName": "Pesci", "Relationship": "Child"}]
@@ -46,7 +44,7 @@ def get_proxies():
 def get_proxy_by_name(first_name, last_name):
     """Get proxy information by name"""
     try:
-        response = requests.get(f"{API_BASE_URL}/proxy/name/{first_name}/{last_name}")
+        response = api_client.get(f"{API_BASE_URL}/proxy/name/{first_name}/{last_name}")
         if response.status_code == 200:
             return response.json()
         return None
@@ -57,7 +55,7 @@ def get_proxy_by_name(first_name, last_name):
 def get_proxy_patients(proxy_id):
     """Get patients for specific proxy"""
     try:
-        response = requests.get(f"{API_BASE_URL}/proxy/{proxy_id}/patients")
+        response = api_client.get(f"{API_BASE_URL}/proxy/{proxy_id}/patients")
         if response.status_code == 200:
             return response.json()
         return []
@@ -71,7 +69,7 @@ def get_proxy_patients(proxy_id):
 def get_insurance_info(patient_id):
     """Get insurance information for patient"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/insurance")
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/insurance")
         if response.status_code == 200:
             insurance_data = response.json()
             # Backend returns a single insurance record, wrap it in a list for consistency
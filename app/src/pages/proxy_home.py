@@ -8,6 +8,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 
 ## Page config - MUST be first Streamlit command
 from modules.styles import apply_page_styling, create_metric_card, create_patient_card, create_medical_divider
@@ -32,12 +33,9 @@ API_BASE_URL = "http://web-api:4000"
 
 ## API functions with proper error handling
 def get_proxies():
-    """Get all proxies from API"""
+    """Get the first proxy from API (the fallback user)"""
     try:
-        response = requests.get(f"{API_BASE_URL}/proxy/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/proxy/", params={"limit": 1}) or []
     except:
         st.warning("Could not connect to proxies API, using dummy data.")
         return [{"ProxyID": 1, "FirstName": "Nina", "LastName": "Pesci", "Relationship": "Child"}]
@@ -45,7 +43,7 @@ def get_proxies():
 def get_proxy_patients(proxy_id):
     """Get patients for specific proxy"""
     try:
-        response = requests.get(f"{API_BASE_URL}/proxy/{proxy_id}/patients")
+        response = api_client.get(f"{API_BASE_URL}/proxy/{proxy_id}/patients")
         if response.status_code == 200:
             return response.json()
         return []
@@ -57,50 +55,22 @@ def get_proxy_patients(proxy_id):
         ]
 
 def get_patient_details(patient_id):
-    """Get detailed patient information"""
+    """Get detailed patient information in a single chart request"""
     try:
-        ## Get patient basic info
-        patient_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}")
-        if patient_response.status_code != 200:
+        response = api_client.get(
+            f"{API_BASE_URL}/patient/{patient_id}/chart",
+            params={"include": "vitals,condition,medications,visit"}
+        )
+        if response.status_code != 200:
             return None
 
-        patient = patient_response.json()
-
-        ## Get patient vitals
-        try:
-            vitals_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/vitals")
-            vitals = vitals_response.json() if vitals_response.status_code == 200 else []
-        except:
-            vitals = []
-
-        ## Get patient conditions
-        try:
-            conditions_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/condition")
-            conditions = conditions_response.json() if conditions_response.status_code == 200 else []
-        except:
-            conditions = []
-
-        ## Get patient medications
-        try:
-            meds_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/medications")
-            medications = meds_response.json() if meds_response.status_code == 200 else []
-        except:
-            medications = []
-
-        ## Get patient visits
-        try:
-            visits_response = requests.get(f"{API_BASE_URL}/visit/")
-            visits = visits_response.json() if visits_response.status_code == 200 else []
-            patient_visits = [v for v in visits if v.get('PatientID') == patient_id]
-        except:
-            patient_visits = []
-
+        chart = response.json()
         return {
-            'patient': patient,
-            'vitals': vitals,
-            'conditions': conditions,
-            'medications': medications,
-            'visits': patient_visits
+            'patient': chart.get('patient', {}),
+            'vitals': chart.get('vitals', []),
+            'conditions': chart.get('condition') or [],
+            'medications': chart.get('medications', []),
+            'visits': [chart['visit']] if chart.get('visit') else []
         }
     except:
         return None
@@ -108,7 +78,7 @@ def get_patient_details(patient_id):
 def get_insurance_info(patient_id):
     """Get insurance information for patient"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/insurance")
+        response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/insurance")
         if response.status_code == 200:
             return response.json()
         return []
@@ -118,16 +88,23 @@ def get_insurance_info(patient_id):
 
 
 
-def get_messages(proxy_id):
-    """Get messages for specific proxy"""
+def get_unread_count(proxy_id):
+    """Count unread messages in the inbox of the proxy's associated patient"""
     try:
-        response = requests.get(f"{API_BASE_URL}/message/?user_type=proxy&user_id={proxy_id}")
+        proxy_response = api_client.get(f"{API_BASE_URL}/proxy/{proxy_id}")
+        patient_id = proxy_response.json().get('PatientID') if proxy_response.status_code == 200 else None
+        if not patient_id:
+            return 0
+        response = api_client.get(
+            f"{API_BASE_URL}/message/summary",
+            params={"user_type": "patient", "user_id": patient_id, "latest": 0},
+        )
         if response.status_code == 200:
-            return response.json()
-        return []
+            return response.json()["unread"]
+        return 0
     except:
-        st.warning("Could not connect to messages API, using dummy data.")
-        return [{"MessageID": 1, "Subject": "Appointment Reminder", "Content": "Patient has appointment tomorrow", "Priority": "Normal"}]
+        st.warning("Could not connect to messages API.")
+        return 0
 
 ## Get proxy information for the current session
 proxies = get_proxies()
@@ -252,8 +229,7 @@ with col2:
     st.markdown(create_metric_card(insurance_count, "Insurance Policies", "🛡️", "success"), unsafe_allow_html=True)
 
 with col3:
-    messages = get_messages(proxy_id)
-    message_count = len(messages) if messages else 0
+    message_count = get_unread_count(proxy_id)
     st.markdown(create_metric_card(message_count, "Unread Messages", "📬", "danger"), unsafe_allow_html=True)
 
 # Add medical divider
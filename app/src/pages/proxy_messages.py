@@ -7,6 +7,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_medical_divider
 
 ## Apply medical theme and styling
@@ -30,12 +31,9 @@ API_BASE_URL = "http://web-api:4000"
 
 ## API functions
 def get_proxies():
-    """Get all proxies from API"""
+    """Get the first proxy from API (the fallback user)"""
     try:
-        response = requests.get(f"{API_BASE_URL}/proxy/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/proxy/", params={"limit": 1}) or []
     except:
         st.warning("Could not connect to proxies API, using dummy data.")
         return [{"ProxyID": 1, "FirstName": "Nina", "LastName": "Pesci", "Relationship": "Child"}]
@@ -43,7 +41,7 @@ def get_proxies():
 def get_proxy_by_name(first_name, last_name):
     """Get proxy information by name"""
     try:
-        response = requests.get(f"{API_BASE_URL}/proxy/name/{first_name}/{last_name}")
+        response = api_client.get(f"{API_BASE_URL}/proxy/name/{first_name}/{last_name}")
         if response.status_code == 200:
             return response.json()
         return None
@@ -52,39 +50,29 @@ def get_proxy_by_name(first_name, last_name):
         return {"ProxyID": 1, "FirstName": "Nina", "LastName": "Pesci", "Relationship": "Child"}
 
 def get_doctors():
-    """Get all doctors for recipient selection"""
+    """Get a page of doctors for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/doctor/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/doctor/") or []
     except:
         return []
 
 def get_nurses():
-    """Get all nurses for recipient selection"""
+    """Get a page of nurses for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/nurse/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/nurse/") or []
     except:
         return []
 
 def get_patients():
-    """Get all patients for recipient selection"""
+    """Get a page of patients for recipient selection"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patient/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/patient/") or []
     except:
         return []
 
 def create_message(subject, content, recipient_type, recipient_id, priority, sender_id, sender_role):
-    """Create and send a new message"""
+    """Create a message and deliver it to its recipient in one request"""
     try:
-        # Create the message with basic information
         message_data = {
             "Subject": subject,
             "Content": content,
@@ -93,35 +81,16 @@ def create_message(subject, content, recipient_type, recipient_id, priority, sen
             "SenderType": sender_role,
             "ReadStatus": False,
             "Priority": priority,
-            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            "SentTime": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "recipients": [{"user_type": recipient_type, "user_id": recipient_id}]
         }
         
-        # Actually call the API
-        response = requests.post(f"{API_BASE_URL}/message/", json=message_data)
+        # The message and its recipient link are stored in one transaction
+        response = requests.post(f"{API_BASE_URL}/message/send", json=message_data)
         
         if response.status_code == 201:
-            response_data = response.json()
-            
-            # Get the message ID from response
-            message_id = response_data.get('message_id')
-            
-            if message_id:
-                # Link message to recipient based on type
-                if recipient_type == "doctor":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_doctor", json={"DoctorID": recipient_id})
-                elif recipient_type == "nurse":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_nurse", json={"NurseID": recipient_id})
-                elif recipient_type == "patient":
-                    link_response = requests.post(f"{API_BASE_URL}/message/messages/{message_id}/link_patient", json={"PatientID": recipient_id})
-                
-                if link_response.status_code == 200:
-                    return True
-                else:
-                    return False
-            else:
-                return False
-        else:
-            return False
+            return True
+        return False
         
     except Exception as e:
         return False
@@ -148,16 +117,16 @@ def get_messages(proxy_id):
     """Get messages for specific proxy (via their associated patient)"""
     try:
         # First get the proxy's associated patient ID
-        proxy_response = requests.get(f"{API_BASE_URL}/proxy/{proxy_id}")
+        proxy_response = api_client.get(f"{API_BASE_URL}/proxy/{proxy_id}")
         if proxy_response.status_code == 200:
             proxy_data = proxy_response.json()
             patient_id = proxy_data.get('PatientID')
             
             if patient_id:
                 # Get messages for the associated patient
-                response = requests.get(f"{API_BASE_URL}/message/?user_type=patient&user_id={patient_id}")
-                if response.status_code == 200:
-                    return response.json()
+                messages = api_client.get_page(f"{API_BASE_URL}/message/?user_type=patient&user_id={patient_id}")
+                if messages is not None:
+                    return messages
         
         # Fallback to dummy data if anything fails
         return [
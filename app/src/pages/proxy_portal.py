@@ -8,6 +8,7 @@ import requests
 from datetime import datetime
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_medical_divider
 
 ## Apply medical theme and styling
@@ -31,12 +32,9 @@ API_BASE_URL = "http://web-api:4000"
 
 ## API functions
 def get_proxies():
-    """Get all proxies from API"""
+    """Get the first proxy from API (the fallback user)"""
     try:
-        response = requests.get(f"{API_BASE_URL}/proxy/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE_URL}/proxy/", params={"limit": 1}) or []
     except:
         st.warning("Could not connect to proxies API, using dummy data.")
         return [{"ProxyID": 1, "FirstName": "Nina", "LastName": "Pesci", "Relationship": "Child"}]
@@ -44,7 +42,7 @@ def get_proxies():
 def get_proxy_patients(proxy_id):
     """Get patients for specific proxy"""
     try:
-        response = requests.get(f"{API_BASE_URL}/proxy/{proxy_id}/patients")
+        response = api_client.get(f"{API_BASE_URL}/proxy/{proxy_id}/patients")
         if response.status_code == 200:
             return response.json()
         return []
@@ -58,7 +56,7 @@ def get_proxy_patients(proxy_id):
 def get_patient_details(patient_id):
     """Get detailed patient information"""
     try:
-        patient_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}")
+        patient_response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}")
         if patient_response.status_code != 200:
             return None
 
@@ -66,21 +64,21 @@ def get_patient_details(patient_id):
 
         # Get patient vitals
         try:
-            vitals_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/vitals")
+            vitals_response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/vitals")
             vitals = vitals_response.json() if vitals_response.status_code == 200 else []
         except:
             vitals = []
 
         # Get patient conditions
         try:
-            conditions_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/condition")
+            conditions_response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/condition")
             conditions = conditions_response.json() if conditions_response.status_code == 200 else []
         except:
             conditions = []
 
         # Get patient medications
         try:
-            meds_response = requests.get(f"{API_BASE_URL}/patient/{patient_id}/medications")
+            meds_response = api_client.get(f"{API_BASE_URL}/patient/{patient_id}/medications")
             medications = meds_response.json() if meds_response.status_code == 200 else []
         except:
             medications = []
@@ -6,6 +6,7 @@ import requests
 import streamlit as st
 
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_metric_card, create_medical_divider
 
 ## Apply medical theme and styling
@@ -33,12 +34,9 @@ if DEFAULT_NURSE_ID == 0:
 
 
 def get_nurses():
-    """Get all nurses from API"""
+    """Get the first nurse from API (the fallback user)"""
     try:
-        response = requests.get(f"{API_BASE}/nurse/")
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return api_client.get_page(f"{API_BASE}/nurse/", params={"limit": 1}) or []
     except:
         st.warning("Could not connect to nurses API, using dummy data.")
         return [{"NurseID": 1, "FirstName": "Nic", "LastName": "Nevin"}]
@@ -46,24 +44,25 @@ def get_nurses():
 def get_nurse_by_name(first_name, last_name):
     """Get nurse information by name"""
     try:
-        response = requests.get(f"{API_BASE}/nurse/")
+        response = api_client.get(f"{API_BASE}/nurse/name/{first_name}/{last_name}")
         if response.status_code == 200:
-            nurses = response.json()
-            for nurse in nurses:
-                if nurse.get('FirstName') == first_name and nurse.get('LastName') == last_name:
-                    return nurse
+            return response.json()
         return None
     except:
         st.warning("Could not connect to nurse API, using dummy data.")
         return {"NurseID": 1, "FirstName": "Nic", "LastName": "Nevin"}
 
 
-def list_alerts():
-    """Get all alerts - doctors and nurses see the same alerts"""
+def list_alerts(nurse_id: int):
+    """Get the alerts this nurse has not acknowledged, most urgent first, then oldest"""
     try:
-        r = requests.get(f"{API_BASE}/alert/", timeout=10)
+        r = api_client.get(
+            f"{API_BASE}/alert/queue",
+            params={"user_type": "nurse", "user_id": nurse_id, "limit": 500},
+            timeout=10,
+        )
         if r.status_code != 200:
-            st.error(f"GET /alert/ → {r.status_code}")
+            st.error(f"GET /alert/queue → {r.status_code}")
             return []
         return r.json() or []
     except requests.exceptions.RequestException as ex:
@@ -73,7 +72,7 @@ def list_alerts():
 
 def get_alert(alert_id: int):
     try:
-        r = requests.get(f"{API_BASE}/alert/{alert_id}", timeout=10)
+        r = api_client.get(f"{API_BASE}/alert/{alert_id}", timeout=10)
         if r.status_code != 200:
             st.error(f"GET /alert/{alert_id} → {r.status_code}")
             return None
@@ -99,6 +98,23 @@ def ack_alert(alert_id: int, nurse_id: int):
         return False
 
 
+def ack_alerts(alert_ids: list, nurse_id: int):
+    """Acknowledge several alerts in one request; returns how many were acknowledged"""
+    try:
+        r = requests.put(
+            f"{API_BASE}/alert/ack",
+            json={"ids": alert_ids, "user_type": "nurse", "user_id": nurse_id},
+            timeout=10,
+        )
+        if r.status_code != 200:
+            st.error(f"PUT /alert/ack → {r.status_code}")
+            return 0
+        return r.json().get("acknowledged", 0)
+    except requests.exceptions.RequestException as ex:
+        st.error(f"Acknowledge failed at {API_BASE}. Details: {ex}")
+        return 0
+
+
 def create_alert(payload: dict):
     try:
         r = requests.post(f"{API_BASE}/alert/", json=payload, timeout=10)
@@ -182,17 +198,15 @@ with ctrl_r:
     st.markdown("**Nurse ID:** " + str(nurse_id))
 
 # Load data
-alerts = list_alerts()
+# The queue already arrives most urgent first, then oldest
+alerts = list_alerts(nurse_id)
 df = pd.DataFrame(alerts)
-if not df.empty:
-    if "SentTime" in df.columns:
-        df["SentTime"] = pd.to_datetime(df["SentTime"], errors="coerce")
-    if "UrgencyLevel" in df.columns:
-        df = df.sort_values(by=["UrgencyLevel", "SentTime"], ascending=[False, False])
+if not df.empty and "SentTime" in df.columns:
+    df["SentTime"] = pd.to_datetime(df["SentTime"], errors="coerce")
 
 # Dashboard metrics
 metric_1, metric_2, metric_3 = st.columns(3)
-metric_1.markdown(create_metric_card("Total Alerts", len(df) if not df.empty else 0, "📊"), unsafe_allow_html=True)
+metric_1.markdown(create_metric_card("Unacknowledged", len(df) if not df.empty else 0, "📊"), unsafe_allow_html=True)
 metric_2.markdown(create_metric_card("High Urgency (≥4)", int((df["UrgencyLevel"] >= 4).sum()) if not df.empty and "UrgencyLevel" in df.columns else 0, "⚠️"), unsafe_allow_html=True)
 metric_3.markdown(create_metric_card("Last Alert", "-" if df.empty or "SentTime" not in df.columns else df["SentTime"].max().strftime("%Y-%m-%d %H:%M"), "🕐"), unsafe_allow_html=True)
 
@@ -231,10 +245,22 @@ with left:
             st.rerun()
     with c2:
         if st.button("Acknowledge", type="primary", use_container_width=True, disabled=(int(selected_id) <= 0)):
-            if delete_alert(int(selected_id)):
+            # acknowledged alerts drop out of this nurse's queue only
+            if ack_alert(int(selected_id), nurse_id):
+                st.rerun()
+
+    # Clear an alert storm in one go instead of one alert at a time
+    visible_ids = [int(i) for i in view["AlertID"].tolist()] if not view.empty and "AlertID" in view.columns else []
+    bulk_ids = st.multiselect("Select alerts to acknowledge", visible_ids)
+    b1, b2 = st.columns(2)
+    with b1:
+        if st.button("Acknowledge selected", use_container_width=True, disabled=not bulk_ids):
+            if ack_alerts(bulk_ids, nurse_id):
+                st.rerun()
+    with b2:
+        if st.button(f"Acknowledge all shown ({len(visible_ids)})", use_container_width=True, disabled=not visible_ids):
+            if ack_alerts(visible_ids, nurse_id):
                 st.rerun()
-            else:
-                st.error("Failed to delete alert")
 
 with right:
     st.markdown("### ✨ Create Alert")
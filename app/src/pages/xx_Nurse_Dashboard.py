@@ -4,6 +4,7 @@ import pandas as pd
 from datetime import datetime
 import os
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_metric_card, create_medical_divider
 
 ## Apply medical theme and styling
@@ -26,21 +27,39 @@ if not API_BASE:
 if DEFAULT_NURSE_ID == 0:
     DEFAULT_NURSE_ID = 1
 
-def get_alerts():
-    """Get all alerts - doctors and nurses see the same alerts"""
+def get_alerts(nurse_id: int):
+    """Get the alerts this nurse has not acknowledged, most urgent first, then oldest"""
     try:
-        r = requests.get(f"{API_BASE}/alert/", timeout=10)
+        r = api_client.get(
+            f"{API_BASE}/alert/queue",
+            params={"user_type": "nurse", "user_id": nurse_id, "limit": 500},
+            timeout=10,
+        )
         if r.status_code != 200:
-            st.error(f"GET /alert/ → {r.status_code}")
+            st.error(f"GET /alert/queue → {r.status_code}")
             return []
         return r.json() or []
     except requests.exceptions.RequestException as ex:
         st.error(f"Alerts service unreachable at {API_BASE}. Details: {ex}")
         return []
 
+def get_unread_counts(nurse_id: int):
+    """Unacknowledged alert counts for the metric badges"""
+    try:
+        r = api_client.get(
+            f"{API_BASE}/alert/queue/count",
+            params={"user_type": "nurse", "user_id": nurse_id},
+            timeout=10,
+        )
+        if r.status_code == 200:
+            return r.json()
+    except requests.exceptions.RequestException:
+        pass
+    return None
+
 def get_alert(alert_id: int):
     try:
-        r = requests.get(f"{API_BASE}/alert/{alert_id}", timeout=10)
+        r = api_client.get(f"{API_BASE}/alert/{alert_id}", timeout=10)
         if r.status_code != 200:
             st.error(f"GET /alert/{alert_id} → {r.status_code}")
             return None
@@ -82,17 +101,24 @@ def delete_alert(alert_id: int):
         st.error(f"Delete alert failed at {API_BASE}. Details: {ex}")
         return False
 
-def get_patients():
+def get_patients(nurse_id=None):
     try:
-        r = requests.get(f"{API_BASE}/patient/", timeout=10)
-        if r.status_code != 200:
-            st.error(f"GET /patient/ → {r.status_code}")
+        params = {"nurse_id": nurse_id} if nurse_id else None
+        patients = api_client.get_page(f"{API_BASE}/patient/", params=params, timeout=10)
+        if patients is None:
+            st.error("GET /patient/ failed")
             return []
-        return r.json() or []
+        return patients
     except requests.exceptions.RequestException as ex:
         st.error(f"Patients service unreachable at {API_BASE}. Details: {ex}")
         return []
 
+def get_patient_count(nurse_id):
+    try:
+        return api_client.get_count(f"{API_BASE}/patient/count", params={"nurse_id": nurse_id}, timeout=10)
+    except requests.exceptions.RequestException:
+        return None
+
 SideBarLinks()
 
 # Display success message if exists
@@ -112,13 +138,15 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load data
-alerts = get_alerts()
-patients = get_patients()
+alerts = get_alerts(DEFAULT_NURSE_ID)
+unread = get_unread_counts(DEFAULT_NURSE_ID)
+my_patients = get_patients(DEFAULT_NURSE_ID)
+my_patient_count = get_patient_count(DEFAULT_NURSE_ID)
 
+# The queue already arrives most urgent first, then oldest
 df_alerts = pd.DataFrame(alerts)
 if not df_alerts.empty:
     df_alerts["SentTime"] = pd.to_datetime(df_alerts.get("SentTime", None), errors="coerce")
-    df_alerts = df_alerts.sort_values(by=["UrgencyLevel", "SentTime"], ascending=[False, False])
 
 # Dashboard metrics with beautiful styling
 st.markdown("""
@@ -130,17 +158,20 @@ st.markdown("""
 
 with st.container():
     c1, c2, c3, c4 = st.columns(4)
-    total_alerts = len(df_alerts) if not df_alerts.empty else 0
-    high_urg = int((df_alerts["UrgencyLevel"] >= 4).sum()) if not df_alerts.empty and "UrgencyLevel" in df_alerts else 0
+    if unread is not None:
+        total_alerts = unread["unread"]
+        high_urg = sum(count for level, count in unread["by_urgency"].items() if level.isdigit() and int(level) >= 4)
+    else:
+        total_alerts = len(df_alerts) if not df_alerts.empty else 0
+        high_urg = int((df_alerts["UrgencyLevel"] >= 4).sum()) if not df_alerts.empty and "UrgencyLevel" in df_alerts else 0
     last_alert_time = df_alerts["SentTime"].max() if not df_alerts.empty and "SentTime" in df_alerts else None
-    my_patients = [p for p in patients if str(p.get("NurseID", "")) == str(DEFAULT_NURSE_ID)]
     
     with c1:
-        st.markdown(create_metric_card(total_alerts, "Total Alerts", "⚠️", "primary"), unsafe_allow_html=True)
+        st.markdown(create_metric_card(total_alerts, "Unacknowledged", "⚠️", "primary"), unsafe_allow_html=True)
     with c2:
         st.markdown(create_metric_card(high_urg, "High Urgency (≥4)", "🚨", "danger"), unsafe_allow_html=True)
     with c3:
-        st.markdown(create_metric_card(len(my_patients), "My Patients", "👥", "success"), unsafe_allow_html=True)
+        st.markdown(create_metric_card(my_patient_count if my_patient_count is not None else len(my_patients), "My Patients", "👥", "success"), unsafe_allow_html=True)
     with c4:
         last_alert_display = "-" if not last_alert_time else last_alert_time.strftime("%H:%M")
         st.markdown(create_metric_card(last_alert_display, "Last Alert", "⏰", "warning"), unsafe_allow_html=True)
@@ -177,10 +208,9 @@ with lc:
             st.session_state["selected_alert_id"] = int(sel_id)
     with cc2:
         if st.button("Acknowledge Selected", type="primary", disabled=(int(sel_id) <= 0)):
-            if delete_alert(int(sel_id)):
+            # acknowledged alerts drop out of this nurse's queue only
+            if put_alert_ack(int(sel_id), DEFAULT_NURSE_ID):
                 st.rerun()
-            else:
-                st.error("Failed to delete alert")
 
 with rc:
     st.markdown("""
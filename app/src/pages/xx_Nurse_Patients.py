@@ -6,6 +6,7 @@ import requests
 import streamlit as st
 
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_metric_card, create_patient_card, create_medical_divider
 
 ## Apply medical theme and styling
@@ -30,13 +31,14 @@ if DEFAULT_NURSE_ID == 0:
     DEFAULT_NURSE_ID = 2
 
 
-def list_patients():
+def list_patients(nurse_id=None):
     try:
-        r = requests.get(f"{API_BASE}/patient/", timeout=10)
-        if r.status_code != 200:
-            st.error(f"GET /patient/ → {r.status_code}")
+        params = {"nurse_id": nurse_id} if nurse_id else None
+        patients = api_client.get_page(f"{API_BASE}/patient/", params=params, timeout=10)
+        if patients is None:
+            st.error("GET /patient/ failed")
             return []
-        return r.json() or []
+        return patients
     except requests.exceptions.RequestException as ex:
         st.error(f"Patients service unreachable at {API_BASE}. Details: {ex}")
         return []
@@ -44,7 +46,7 @@ def list_patients():
 
 def get_patient(pid: int):
     try:
-        r = requests.get(f"{API_BASE}/patient/{pid}", timeout=10)
+        r = api_client.get(f"{API_BASE}/patient/{pid}", timeout=10)
         if r.status_code != 200:
             st.error(f"GET /patient/{pid} → {r.status_code}")
             return None
@@ -56,7 +58,7 @@ def get_patient(pid: int):
 
 def get_patient_vitals(pid: int):
     try:
-        r = requests.get(f"{API_BASE}/patient/{pid}/vitals", timeout=10)
+        r = api_client.get(f"{API_BASE}/patient/{pid}/vitals", timeout=10)
         if r.status_code != 200:
             return None
         return r.json()
@@ -66,7 +68,7 @@ def get_patient_vitals(pid: int):
 
 def get_patient_condition(pid: int):
     try:
-        r = requests.get(f"{API_BASE}/patient/{pid}/condition", timeout=10)
+        r = api_client.get(f"{API_BASE}/patient/{pid}/condition", timeout=10)
         if r.status_code != 200:
             return None
         return r.json()
@@ -76,7 +78,7 @@ def get_patient_condition(pid: int):
 
 def get_patient_medications(pid: int):
     try:
-        r = requests.get(f"{API_BASE}/patient/{pid}/medications", timeout=10)
+        r = api_client.get(f"{API_BASE}/patient/{pid}/medications", timeout=10)
         if r.status_code != 200:
             return None
         return r.json()
@@ -89,7 +91,8 @@ def administer_medication(patient_id: int, medication_id: int):
     try:
         data = {
             "PatientID": patient_id,
-            "MedicationID": medication_id
+            "MedicationID": medication_id,
+            "NurseID": DEFAULT_NURSE_ID
         }
         r = requests.post(f"{API_BASE}/medication/administer", json=data, timeout=10)
         if r.status_code == 200:
@@ -126,10 +129,8 @@ with ctrl_l:
 with ctrl_r:
     pass  # Removed NurseID input since we know which nurse is logged in
 
-patients = list_patients()
+patients = list_patients(int(DEFAULT_NURSE_ID) if only_mine else None)
 df_pat = pd.DataFrame(patients)
-if only_mine and not df_pat.empty and "NurseID" in df_pat.columns:
-    df_pat = df_pat[df_pat["NurseID"].astype(str) == str(int(DEFAULT_NURSE_ID))]
 
 # Patient selector
 options = []
@@ -6,6 +6,7 @@ import requests
 import streamlit as st
 
 from modules.nav import SideBarLinks
+from modules import api_client
 from modules.styles import apply_page_styling, create_medical_divider
 
 ## Apply medical theme and styling
@@ -30,13 +31,14 @@ if DEFAULT_NURSE_ID == 0:
     DEFAULT_NURSE_ID = 2
 
 
-def list_patients():
+def list_patients(nurse_id=None):
     try:
-        r = requests.get(f"{API_BASE}/patient/", timeout=10)
-        if r.status_code != 200:
-            st.error(f"GET /patient/ → {r.status_code}")
+        params = {"nurse_id": nurse_id} if nurse_id else None
+        patients = api_client.get_page(f"{API_BASE}/patient/", params=params, timeout=10)
+        if patients is None:
+            st.error("GET /patient/ failed")
             return []
-        return r.json() or []
+        return patients
     except requests.exceptions.RequestException as ex:
         st.error(f"Patients service unreachable at {API_BASE}. Details: {ex}")
         return []
@@ -44,7 +46,7 @@ def list_patients():
 
 def get_patient(pid: int):
     try:
-        r = requests.get(f"{API_BASE}/patient/{pid}", timeout=10)
+        r = api_client.get(f"{API_BASE}/patient/{pid}", timeout=10)
         if r.status_code != 200:
             return None
         return r.json()
@@ -54,7 +56,7 @@ def get_patient(pid: int):
 
 def get_patient_medications(pid: int):
     try:
-        r = requests.get(f"{API_BASE}/patient/{pid}/medications", timeout=10)
+        r = api_client.get(f"{API_BASE}/patient/{pid}/medications", timeout=10)
         if r.status_code != 200:
             st.error(f"GET /patient/{pid}/medications → {r.status_code}")
             return []
@@ -69,7 +71,8 @@ def administer_medication(patient_id: int, medication_id: int):
     try:
         data = {
             "PatientID": patient_id,
-            "MedicationID": medication_id
+            "MedicationID": medication_id,
+            "NurseID": DEFAULT_NURSE_ID
         }
         r = requests.post(f"{API_BASE}/medication/administer", json=data, timeout=10)
         if r.status_code == 200:
@@ -81,6 +84,24 @@ def administer_medication(patient_id: int, medication_id: int):
         return False, f"Service unreachable: {ex}"
 
 
+def administer_medication_pass(doses: list):
+    """Submit a whole medication pass in one request; returns the per-dose results"""
+    try:
+        r = requests.post(
+            f"{API_BASE}/medication/administer/batch",
+            json={"NurseID": DEFAULT_NURSE_ID, "doses": doses},
+            timeout=30,
+        )
+        data = r.json() if r.headers.get("Content-Type", "").startswith("application/json") else {}
+        if "results" not in data:
+            st.error(data.get("error", f"POST /medication/administer/batch → {r.status_code}"))
+            return []
+        return data["results"]
+    except requests.exceptions.RequestException as ex:
+        st.error(f"Medication pass failed at {API_BASE}. Details: {ex}")
+        return []
+
+
 # Medical-themed header
 st.markdown("""
 <div style="text-align: center; margin-bottom: 2rem;">
@@ -98,10 +119,8 @@ with top_l:
 with top_r:
     pass  # Removed NurseID input since we know which nurse is logged in
 
-patients = list_patients()
+patients = list_patients(int(DEFAULT_NURSE_ID) if only_mine else None)
 df_pat = pd.DataFrame(patients)
-if only_mine and not df_pat.empty and "NurseID" in df_pat.columns:
-    df_pat = df_pat[df_pat["NurseID"].astype(str) == str(int(DEFAULT_NURSE_ID))]
 
 # Patient selector
 options = []
@@ -231,3 +250,47 @@ if selected_pid:
         st.info("No medications found for this patient.")
 
 
+# Medication pass: every due dose across the listed patients, submitted at once
+st.markdown(create_medical_divider(), unsafe_allow_html=True)
+st.markdown("### 🧾 Medication Pass")
+
+if options:
+    pass_rows = []
+    for pid, label in options:
+        for med in get_patient_medications(pid):
+            if (med.get("RefillsLeft", 0) or 0) > 0:
+                pass_rows.append({
+                    "Give": False,
+                    "Patient": label,
+                    "Medication": med.get("PrescriptionName", "Unknown"),
+                    "Dose": f"{med.get('DosageAmount', '')} {med.get('DosageUnit', '')}",
+                    "RefillsLeft": med.get("RefillsLeft"),
+                    "PatientID": pid,
+                    "MedicationID": med.get("MedicationID"),
+                })
+
+    if pass_rows:
+        edited = st.data_editor(
+            pd.DataFrame(pass_rows),
+            use_container_width=True,
+            hide_index=True,
+            disabled=["Patient", "Medication", "Dose", "RefillsLeft", "PatientID", "MedicationID"],
+            key="medication_pass",
+        )
+        chosen = edited[edited["Give"]]
+        if st.button(f"Submit pass ({len(chosen)} doses)", type="primary", disabled=chosen.empty):
+            given_at = datetime.now().isoformat(timespec="seconds")
+            results = administer_medication_pass([
+                {"PatientID": int(row["PatientID"]), "MedicationID": int(row["MedicationID"]), "AdministeredAt": given_at}
+                for _, row in chosen.iterrows()
+            ])
+            if results:
+                done = sum(1 for result in results if result["status"] == "administered")
+                st.success(f"Administered {done} of {len(results)} doses")
+                failed = [result for result in results if result["status"] != "administered"]
+                if failed:
+                    st.dataframe(pd.DataFrame(failed), use_container_width=True, hide_index=True)
+    else:
+        st.info("No doses due: none of these patients have medications with refills left.")
+else:
+    st.info("No patients available for a medication pass.")
@@ -0,0 +1,9 @@
+-- Name indexes for patient search and the first_name / last_name
+-- prefix filters on GET /patient/. Already part of vitalflow_db.sql;
+-- run this against databases created before it.
+USE vitalflow_database;
+
+ALTER TABLE Patient
+    ADD INDEX idx_patient_last_name (LastName, FirstName),
+    ADD INDEX idx_patient_first_name (FirstName),
+    ALGORITHM = INPLACE, LOCK = NONE;
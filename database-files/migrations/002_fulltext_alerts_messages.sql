@@ -0,0 +1,11 @@
+-- FULLTEXT indexes behind GET /alert/search and GET /message/search.
+-- Already part of vitalflow_db.sql; run this against databases created
+-- before it. InnoDB builds each FULLTEXT index with a table copy the
+-- first time, so run it outside peak hours on large tables.
+USE vitalflow_database;
+
+ALTER TABLE AlertDetails
+    ADD FULLTEXT INDEX ft_alert_text (Message, Protocol);
+
+ALTER TABLE MessageDetails
+    ADD FULLTEXT INDEX ft_msg_text (Subject, Content);
@@ -0,0 +1,38 @@
+-- Per-patient vitals series (VitalReading) and latest-reading table
+-- (VitalLatest). Already part of vitalflow_db.sql; run this against
+-- databases created before it. Each patient's current VitalChart row
+-- becomes the first reading of their series.
+USE vitalflow_database;
+
+CREATE TABLE IF NOT EXISTS VitalReading (
+    PatientID INTEGER NOT NULL,
+    RecordedAt DATETIME(3) NOT NULL,
+    HeartRate SMALLINT,
+    BloodPressure VARCHAR(20),
+    RespiratoryRate SMALLINT,
+    Temperature DECIMAL(5,2),
+    PRIMARY KEY (PatientID, RecordedAt)
+);
+
+CREATE TABLE IF NOT EXISTS VitalLatest (
+    PatientID INTEGER PRIMARY KEY,
+    RecordedAt DATETIME(3) NOT NULL,
+    HeartRate SMALLINT,
+    BloodPressure VARCHAR(20),
+    RespiratoryRate SMALLINT,
+    Temperature DECIMAL(5,2),
+    FOREIGN KEY (PatientID) REFERENCES Patient(PatientID) ON DELETE CASCADE
+);
+
+INSERT IGNORE INTO VitalReading (PatientID, RecordedAt, HeartRate, BloodPressure, RespiratoryRate, Temperature)
+SELECT p.PatientID, COALESCE(v.AppointmentDate, CURRENT_DATE), vc.HeartRate, vc.BloodPressure, vc.RespiratoryRate, vc.Temperature
+FROM Patient p
+JOIN VitalChart vc ON vc.VitalID = p.VitalID
+LEFT JOIN Visits v ON v.VisitID = p.VisitID;
+
+INSERT IGNORE INTO VitalLatest (PatientID, RecordedAt, HeartRate, BloodPressure, RespiratoryRate, Temperature)
+SELECT r.PatientID, r.RecordedAt, r.HeartRate, r.BloodPressure, r.RespiratoryRate, r.Temperature
+FROM VitalReading r
+JOIN (
+    SELECT PatientID, MAX(RecordedAt) AS RecordedAt FROM VitalReading GROUP BY PatientID
+) newest ON newest.PatientID = r.PatientID AND newest.RecordedAt = r.RecordedAt;
@@ -0,0 +1,39 @@
+-- VitalRollup, the 1m / 15m / 1h downsampled vitals. Already part of
+-- vitalflow_db.sql; run this against databases created before it, then
+-- backfill from existing readings with
+--   docker exec -it web-api flask --app backend_app vitals rebuild-rollups
+USE vitalflow_database;
+
+CREATE TABLE IF NOT EXISTS VitalRollup (
+    PatientID INTEGER NOT NULL,
+    Resolution INTEGER NOT NULL,
+    BucketStart DATETIME NOT NULL,
+    SampleCount INTEGER NOT NULL,
+    LastAt DATETIME(3) NOT NULL,
+    HeartRateCount INTEGER NOT NULL DEFAULT 0,
+    HeartRateSum DOUBLE NOT NULL DEFAULT 0,
+    HeartRateMin DOUBLE,
+    HeartRateMax DOUBLE,
+    HeartRateLast DOUBLE,
+    RespiratoryRateCount INTEGER NOT NULL DEFAULT 0,
+    RespiratoryRateSum DOUBLE NOT NULL DEFAULT 0,
+    RespiratoryRateMin DOUBLE,
+    RespiratoryRateMax DOUBLE,
+    RespiratoryRateLast DOUBLE,
+    TemperatureCount INTEGER NOT NULL DEFAULT 0,
+    TemperatureSum DOUBLE NOT NULL DEFAULT 0,
+    TemperatureMin DOUBLE,
+    TemperatureMax DOUBLE,
+    TemperatureLast DOUBLE,
+    SystolicCount INTEGER NOT NULL DEFAULT 0,
+    SystolicSum DOUBLE NOT NULL DEFAULT 0,
+    SystolicMin DOUBLE,
+    SystolicMax DOUBLE,
+    SystolicLast DOUBLE,
+    DiastolicCount INTEGER NOT NULL DEFAULT 0,
+    DiastolicSum DOUBLE NOT NULL DEFAULT 0,
+    DiastolicMin DOUBLE,
+    DiastolicMax DOUBLE,
+    DiastolicLast DOUBLE,
+    PRIMARY KEY (PatientID, Resolution, BucketStart)
+);
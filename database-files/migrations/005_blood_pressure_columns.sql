@@ -0,0 +1,34 @@
+-- Structured blood pressure: Systolic / Diastolic integer columns next to
+-- the legacy BloodPressure string. Already part of vitalflow_db.sql; run
+-- this against older databases BEFORE deploying the API that writes them,
+-- then fill existing rows with 006_blood_pressure_backfill.sql.
+--
+-- ADD COLUMN ... ALGORITHM=INSTANT only touches the data dictionary, and
+-- the indexes are built in place without blocking reads or writes.
+USE vitalflow_database;
+
+ALTER TABLE VitalChart
+    ADD COLUMN Systolic SMALLINT,
+    ADD COLUMN Diastolic SMALLINT,
+    ALGORITHM=INSTANT;
+
+ALTER TABLE VitalReading
+    ADD COLUMN Systolic SMALLINT,
+    ADD COLUMN Diastolic SMALLINT,
+    ALGORITHM=INSTANT;
+
+ALTER TABLE VitalLatest
+    ADD COLUMN Systolic SMALLINT,
+    ADD COLUMN Diastolic SMALLINT,
+    ALGORITHM=INSTANT;
+
+-- Threshold filters (?systolic_min= and friends) range-scan these
+ALTER TABLE VitalChart
+    ADD INDEX idx_vital_systolic (Systolic),
+    ADD INDEX idx_vital_diastolic (Diastolic),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE VitalLatest
+    ADD INDEX idx_latest_systolic (Systolic),
+    ADD INDEX idx_latest_diastolic (Diastolic),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,87 @@
+-- Fill Systolic / Diastolic from the legacy "120/80" strings for rows
+-- written before 005_blood_pressure_columns.sql. Safe to run while the
+-- API is live and safe to re-run: rows that already have values are
+-- skipped and strings that do not parse are left NULL.
+--
+-- Each table is walked along its primary key in committed chunks of
+-- chunk_size keys, so every UPDATE is a bounded primary-key range scan:
+-- it only locks the rows in its own range, however many rows before it
+-- were already filled or could not be parsed.
+USE vitalflow_database;
+
+DROP PROCEDURE IF EXISTS backfill_blood_pressure;
+DROP PROCEDURE IF EXISTS backfill_reading_blood_pressure;
+
+DELIMITER //
+-- Tables keyed by one integer column (VitalChart, VitalLatest)
+CREATE PROCEDURE backfill_blood_pressure(IN table_name VARCHAR(64), IN key_column VARCHAR(64), IN chunk_size INT)
+BEGIN
+    SET @backfill_sql = CONCAT(
+        'SELECT COALESCE(MIN(', key_column, ') - 1, 0), COALESCE(MAX(', key_column, '), 0)',
+        ' INTO @backfill_last, @backfill_max FROM ', table_name);
+    PREPARE bounds FROM @backfill_sql;
+    EXECUTE bounds;
+    DEALLOCATE PREPARE bounds;
+
+    SET @backfill_sql = CONCAT(
+        'UPDATE ', table_name,
+        ' SET Systolic = CAST(TRIM(SUBSTRING_INDEX(BloodPressure, ''/'', 1)) AS UNSIGNED),',
+        '     Diastolic = CAST(TRIM(SUBSTRING_INDEX(BloodPressure, ''/'', -1)) AS UNSIGNED)',
+        ' WHERE ', key_column, ' > ? AND ', key_column, ' <= ?',
+        '   AND Systolic IS NULL',
+        '   AND BloodPressure REGEXP ''^ *[0-9]{1,3} */ *[0-9]{1,3} *$''');
+    PREPARE backfill FROM @backfill_sql;
+    WHILE @backfill_last < @backfill_max DO
+        SET @backfill_next = @backfill_last + chunk_size;
+        EXECUTE backfill USING @backfill_last, @backfill_next;
+        COMMIT;
+        SET @backfill_last = @backfill_next;
+    END WHILE;
+    DEALLOCATE PREPARE backfill;
+END //
+
+-- VitalReading, keyed by (PatientID, RecordedAt): each chunk ends at the
+-- key chunk_size rows past the previous one, found with a non-locking
+-- read of the primary key
+CREATE PROCEDURE backfill_reading_blood_pressure(IN chunk_size INT)
+BEGIN
+    DECLARE last_patient INT DEFAULT -1;
+    DECLARE last_at DATETIME(3) DEFAULT '1000-01-01 00:00:00.000';
+    DECLARE next_patient INT;
+    DECLARE next_at DATETIME(3);
+    DECLARE done BOOLEAN DEFAULT FALSE;
+    DECLARE skip_rows INT DEFAULT chunk_size - 1;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET next_patient = NULL;
+
+    WHILE NOT done DO
+        SET next_patient = NULL;
+        SELECT PatientID, RecordedAt INTO next_patient, next_at
+        FROM VitalReading
+        WHERE PatientID > last_patient OR (PatientID = last_patient AND RecordedAt > last_at)
+        ORDER BY PatientID, RecordedAt
+        LIMIT 1 OFFSET skip_rows;
+
+        -- last chunk: everything after the previous key
+        IF next_patient IS NULL THEN
+            SET next_patient = 2147483647, next_at = '9999-12-31 23:59:59.999', done = TRUE;
+        END IF;
+
+        UPDATE VitalReading
+        SET Systolic = CAST(TRIM(SUBSTRING_INDEX(BloodPressure, '/', 1)) AS UNSIGNED),
+            Diastolic = CAST(TRIM(SUBSTRING_INDEX(BloodPressure, '/', -1)) AS UNSIGNED)
+        WHERE (PatientID > last_patient OR (PatientID = last_patient AND RecordedAt > last_at))
+          AND (PatientID < next_patient OR (PatientID = next_patient AND RecordedAt <= next_at))
+          AND Systolic IS NULL
+          AND BloodPressure REGEXP '^ *[0-9]{1,3} */ *[0-9]{1,3} *$';
+        COMMIT;
+        SET last_patient = next_patient, last_at = next_at;
+    END WHILE;
+END //
+DELIMITER ;
+
+CALL backfill_blood_pressure('VitalChart', 'VitalID', 5000);
+CALL backfill_reading_blood_pressure(5000);
+CALL backfill_blood_pressure('VitalLatest', 'PatientID', 5000);
+
+DROP PROCEDURE backfill_blood_pressure;
+DROP PROCEDURE backfill_reading_blood_pressure;
@@ -0,0 +1,13 @@
+-- VitalLatest.UpdatedAt, used by the early-warning score cache to find
+-- patients whose latest vitals changed. Already part of vitalflow_db.sql;
+-- run this against older databases. Existing rows take the current time,
+-- which only means they are re-scored once.
+--
+-- A CURRENT_TIMESTAMP default cannot be added instantly, but VitalLatest
+-- holds one row per patient, so the online rebuild is quick.
+USE vitalflow_database;
+
+ALTER TABLE VitalLatest
+    ADD COLUMN UpdatedAt TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+    ADD INDEX idx_latest_updated (UpdatedAt),
+    ALGORITHM=INPLACE, LOCK=NONE;
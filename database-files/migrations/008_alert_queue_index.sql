@@ -0,0 +1,7 @@
+-- Covering index for GET /alert/queue: most urgent first, then oldest.
+-- Already part of vitalflow_db.sql; run this against older databases.
+USE vitalflow_database;
+
+ALTER TABLE AlertDetails
+    ADD INDEX idx_alert_queue (UrgencyLevel DESC, SentTime, AlertID),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,13 @@
+-- EventLog, the outbox behind GET /stream/events. Already part of
+-- vitalflow_db.sql; run this against older databases.
+USE vitalflow_database;
+
+CREATE TABLE IF NOT EXISTS EventLog (
+    EventID BIGINT PRIMARY KEY AUTO_INCREMENT,
+    EventType VARCHAR(40) NOT NULL,
+    UserType VARCHAR(20),
+    UserID INTEGER,
+    Payload JSON NOT NULL,
+    CreatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    INDEX idx_event_created (CreatedAt)
+);
@@ -0,0 +1,24 @@
+-- ResourceVersion, the counters behind ETag / Last-Modified on GET
+-- routes. Already part of vitalflow_db.sql; run this against older
+-- databases. Re-running it leaves existing counters alone.
+USE vitalflow_database;
+
+CREATE TABLE IF NOT EXISTS ResourceVersion (
+    Resource VARCHAR(30) PRIMARY KEY,
+    Version BIGINT NOT NULL DEFAULT 1,
+    UpdatedAt DATETIME(3) NOT NULL
+);
+
+INSERT IGNORE INTO ResourceVersion (Resource, Version, UpdatedAt) VALUES
+('alert', 1, UTC_TIMESTAMP(3)),
+('condition', 1, UTC_TIMESTAMP(3)),
+('discharge', 1, UTC_TIMESTAMP(3)),
+('doctor', 1, UTC_TIMESTAMP(3)),
+('insurance', 1, UTC_TIMESTAMP(3)),
+('medication', 1, UTC_TIMESTAMP(3)),
+('message', 1, UTC_TIMESTAMP(3)),
+('nurse', 1, UTC_TIMESTAMP(3)),
+('patient', 1, UTC_TIMESTAMP(3)),
+('proxy', 1, UTC_TIMESTAMP(3)),
+('visit', 1, UTC_TIMESTAMP(3)),
+('vital', 1, UTC_TIMESTAMP(3));
@@ -0,0 +1,16 @@
+-- MedicationAdministration, the log written by POST /medication/administer.
+-- Already part of vitalflow_db.sql; run this against older databases.
+USE vitalflow_database;
+
+CREATE TABLE IF NOT EXISTS MedicationAdministration (
+    AdministrationID BIGINT PRIMARY KEY AUTO_INCREMENT,
+    PatientID INTEGER NOT NULL,
+    MedicationID INTEGER NOT NULL,
+    NurseID INTEGER,
+    Amount INTEGER NOT NULL,
+    RefillsLeft INTEGER NOT NULL,
+    AdministeredAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    INDEX idx_admin_patient (PatientID, AdministeredAt),
+    INDEX idx_admin_medication (MedicationID, AdministeredAt),
+    INDEX idx_admin_time (AdministeredAt)
+);
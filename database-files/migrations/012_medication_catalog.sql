@@ -0,0 +1,93 @@
+-- Split Medication into a deduplicated drug catalog and per-patient
+-- prescription state. Already part of vitalflow_db.sql; run this against
+-- older databases with the API stopped, then deploy the API that reads
+-- RefillsLeft, PickUpLocation and frequency from Patient_Medications.
+--
+-- Every prescription used to create its own Medication row, so the same
+-- drug could appear thousands of times. Rows with the same name, amount
+-- and unit (ignoring case and extra spaces) collapse into the lowest
+-- MedicationID. Where a patient held several prescriptions of one drug,
+-- the most recently prescribed one is kept.
+USE vitalflow_database;
+
+-- 1. Prescription state moves onto the patient link
+ALTER TABLE Patient_Medications
+    ADD COLUMN PickUpLocation VARCHAR(100),
+    ADD COLUMN RefillsLeft INTEGER,
+    ADD COLUMN FrequencyAmount INTEGER,
+    ADD COLUMN FrequencyPeriod VARCHAR(20),
+    ALGORITHM=INSTANT;
+
+START TRANSACTION;
+
+UPDATE Patient_Medications pm
+JOIN Medication m ON m.MedicationID = pm.MedicationID
+SET pm.PickUpLocation = m.PickUpLocation,
+    pm.RefillsLeft = m.RefillsLeft,
+    pm.FrequencyAmount = m.FrequencyAmount,
+    pm.FrequencyPeriod = m.FrequencyPeriod;
+
+-- 2. Normalize names and units the way POST /medication/ does
+UPDATE Medication
+SET PrescriptionName = REGEXP_REPLACE(TRIM(PrescriptionName), '[[:space:]]+', ' '),
+    DosageUnit = NULLIF(REGEXP_REPLACE(TRIM(DosageUnit), '[[:space:]]+', ' '), '');
+
+-- 3. Map every row to the lowest MedicationID of its drug; PARTITION BY
+-- groups NULL amounts and units together and compares names with the
+-- column collation, like the unique key added below
+CREATE TEMPORARY TABLE MedicationCanonical (PRIMARY KEY (MedicationID))
+SELECT MedicationID,
+       MIN(MedicationID) OVER (PARTITION BY PrescriptionName, DosageAmount, DosageUnit) AS CanonicalID
+FROM Medication;
+
+-- 4. One prescription per patient and drug: keep the newest
+CREATE TEMPORARY TABLE PrescriptionKeep (PRIMARY KEY (PatientID, MedicationID))
+SELECT PatientID, MedicationID FROM (
+    SELECT pm.PatientID, pm.MedicationID,
+           ROW_NUMBER() OVER (
+               PARTITION BY pm.PatientID, c.CanonicalID
+               ORDER BY pm.PrescribedDate DESC, pm.MedicationID DESC
+           ) AS Newest
+    FROM Patient_Medications pm
+    JOIN MedicationCanonical c ON c.MedicationID = pm.MedicationID
+) ranked
+WHERE Newest = 1;
+
+DELETE pm FROM Patient_Medications pm
+LEFT JOIN PrescriptionKeep k ON k.PatientID = pm.PatientID AND k.MedicationID = pm.MedicationID
+WHERE k.PatientID IS NULL;
+
+-- 5. Point prescriptions and the administration log at the catalog row,
+-- then drop the duplicates
+UPDATE Patient_Medications pm
+JOIN MedicationCanonical c ON c.MedicationID = pm.MedicationID
+SET pm.MedicationID = c.CanonicalID
+WHERE c.CanonicalID <> c.MedicationID;
+
+UPDATE MedicationAdministration a
+JOIN MedicationCanonical c ON c.MedicationID = a.MedicationID
+SET a.MedicationID = c.CanonicalID
+WHERE c.CanonicalID <> c.MedicationID;
+
+DELETE m FROM Medication m
+JOIN MedicationCanonical c ON c.MedicationID = m.MedicationID
+WHERE c.CanonicalID <> c.MedicationID;
+
+-- Cached responses (ETags) for medication data are no longer valid
+UPDATE ResourceVersion SET Version = Version + 1, UpdatedAt = UTC_TIMESTAMP(3)
+WHERE Resource = 'medication';
+
+COMMIT;
+
+DROP TEMPORARY TABLE MedicationCanonical;
+DROP TEMPORARY TABLE PrescriptionKeep;
+
+-- 6. Medication is now only the catalog; the unique key stops new duplicates
+ALTER TABLE Medication
+    DROP COLUMN PickUpLocation,
+    DROP COLUMN RefillsLeft,
+    DROP COLUMN FrequencyAmount,
+    DROP COLUMN FrequencyPeriod,
+    ADD COLUMN CatalogKey VARCHAR(140)
+        AS (CONCAT_WS('|', PrescriptionName, COALESCE(DosageAmount, ''), COALESCE(DosageUnit, ''))) STORED INVISIBLE,
+    ADD UNIQUE INDEX uq_medication_catalog (CatalogKey);
@@ -0,0 +1,26 @@
+-- OPTIONAL: monthly RANGE partitioning for VitalReading.
+--
+-- Worth it once the table holds hundreds of millions of rows: inserts
+-- only touch the current month's (small, hot) B-tree, time-range queries
+-- prune to the months they cover, and old months can be archived with
+-- ALTER TABLE ... DROP PARTITION instead of a huge DELETE.
+-- Not numbered because it is not required; edit the months to cover your
+-- oldest data before running it. It rebuilds the table.
+USE vitalflow_database;
+
+ALTER TABLE VitalReading
+    PARTITION BY RANGE COLUMNS (RecordedAt) (
+        PARTITION p_old VALUES LESS THAN ('2025-01-01'),
+        PARTITION p2025_01 VALUES LESS THAN ('2025-02-01'),
+        PARTITION p2025_02 VALUES LESS THAN ('2025-03-01'),
+        PARTITION p2025_03 VALUES LESS THAN ('2025-04-01'),
+        PARTITION p_future VALUES LESS THAN (MAXVALUE)
+    );
+
+-- Monthly maintenance: split the next month out of p_future before it
+-- starts, e.g.
+--
+-- ALTER TABLE VitalReading REORGANIZE PARTITION p_future INTO (
+--     PARTITION p2025_04 VALUES LESS THAN ('2025-05-01'),
+--     PARTITION p_future VALUES LESS THAN (MAXVALUE)
+-- );
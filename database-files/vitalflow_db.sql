@@ -40,7 +40,11 @@ CREATE TABLE IF NOT EXISTS VitalChart (
     HeartRate INTEGER,
     BloodPressure VARCHAR(20),
     RespiratoryRate INTEGER,
-    Temperature DECIMAL(5,2)
+    Temperature DECIMAL(5,2),
+    Systolic SMALLINT,
+    Diastolic SMALLINT,
+    INDEX idx_vital_systolic (Systolic),
+    INDEX idx_vital_diastolic (Diastolic)
 );
 
 CREATE TABLE IF NOT EXISTS `Condition` (
@@ -84,7 +88,83 @@ CREATE TABLE IF NOT EXISTS Patient (
     INDEX idx_patient_discharge (DischargeID),
     INDEX idx_patient_condition (ConditionID),
     INDEX idx_patient_visit (VisitID),
-    INDEX idx_patient_vital (VitalID)
+    INDEX idx_patient_vital (VitalID),
+    INDEX idx_patient_last_name (LastName, FirstName),
+    INDEX idx_patient_first_name (FirstName)
+);
+
+-- Append-only vitals series, one row per reading. The primary key is the
+-- clustered index, so one patient's readings are stored contiguously in
+-- time order and range scans by (PatientID, RecordedAt) touch few pages.
+-- No foreign key so the table can be partitioned by month (see
+-- migrations/partition_vital_readings.sql).
+CREATE TABLE IF NOT EXISTS VitalReading (
+    PatientID INTEGER NOT NULL,
+    RecordedAt DATETIME(3) NOT NULL,
+    HeartRate SMALLINT,
+    BloodPressure VARCHAR(20),
+    RespiratoryRate SMALLINT,
+    Temperature DECIMAL(5,2),
+    Systolic SMALLINT,
+    Diastolic SMALLINT,
+    PRIMARY KEY (PatientID, RecordedAt)
+);
+
+-- Newest reading per patient, maintained on every insert into
+-- VitalReading so "current vitals" is a single primary-key lookup.
+-- UpdatedAt moves only when the row actually changes, which lets the
+-- early-warning score cache find re-scored patients with a range scan.
+CREATE TABLE IF NOT EXISTS VitalLatest (
+    PatientID INTEGER PRIMARY KEY,
+    RecordedAt DATETIME(3) NOT NULL,
+    HeartRate SMALLINT,
+    BloodPressure VARCHAR(20),
+    RespiratoryRate SMALLINT,
+    Temperature DECIMAL(5,2),
+    Systolic SMALLINT,
+    Diastolic SMALLINT,
+    UpdatedAt TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+    FOREIGN KEY (PatientID) REFERENCES Patient(PatientID) ON DELETE CASCADE,
+    INDEX idx_latest_systolic (Systolic),
+    INDEX idx_latest_diastolic (Diastolic),
+    INDEX idx_latest_updated (UpdatedAt)
+);
+
+-- Downsampled vitals: per patient, min/max/sum/count/last of each metric
+-- in 1m, 15m and 1h buckets (Resolution is the bucket width in seconds).
+-- Maintained incrementally by the API on every reading insert.
+CREATE TABLE IF NOT EXISTS VitalRollup (
+    PatientID INTEGER NOT NULL,
+    Resolution INTEGER NOT NULL,
+    BucketStart DATETIME NOT NULL,
+    SampleCount INTEGER NOT NULL,
+    LastAt DATETIME(3) NOT NULL,
+    HeartRateCount INTEGER NOT NULL DEFAULT 0,
+    HeartRateSum DOUBLE NOT NULL DEFAULT 0,
+    HeartRateMin DOUBLE,
+    HeartRateMax DOUBLE,
+    HeartRateLast DOUBLE,
+    RespiratoryRateCount INTEGER NOT NULL DEFAULT 0,
+    RespiratoryRateSum DOUBLE NOT NULL DEFAULT 0,
+    RespiratoryRateMin DOUBLE,
+    RespiratoryRateMax DOUBLE,
+    RespiratoryRateLast DOUBLE,
+    TemperatureCount INTEGER NOT NULL DEFAULT 0,
+    TemperatureSum DOUBLE NOT NULL DEFAULT 0,
+    TemperatureMin DOUBLE,
+    TemperatureMax DOUBLE,
+    TemperatureLast DOUBLE,
+    SystolicCount INTEGER NOT NULL DEFAULT 0,
+    SystolicSum DOUBLE NOT NULL DEFAULT 0,
+    SystolicMin DOUBLE,
+    SystolicMax DOUBLE,
+    SystolicLast DOUBLE,
+    DiastolicCount INTEGER NOT NULL DEFAULT 0,
+    DiastolicSum DOUBLE NOT NULL DEFAULT 0,
+    DiastolicMin DOUBLE,
+    DiastolicMax DOUBLE,
+    DiastolicLast DOUBLE,
+    PRIMARY KEY (PatientID, Resolution, BucketStart)
 );
 
 CREATE TABLE IF NOT EXISTS Proxy (
@@ -97,15 +177,16 @@ CREATE TABLE IF NOT EXISTS Proxy (
     INDEX idx_proxy_patient (PatientID)
 );
 
+-- The drug catalog: one row per name and strength. CatalogKey makes a
+-- re-entered drug collide with its existing row (the default collation
+-- ignores case); it is INVISIBLE, so SELECT * does not return it.
 CREATE TABLE IF NOT EXISTS Medication (
     MedicationID INTEGER PRIMARY KEY AUTO_INCREMENT,
     PrescriptionName VARCHAR(100) NOT NULL,
     DosageAmount DECIMAL(10,2),
     DosageUnit VARCHAR(20),
-    PickUpLocation VARCHAR(100),
-    RefillsLeft INTEGER,
-    FrequencyAmount INTEGER,
-    FrequencyPeriod VARCHAR(20)
+    CatalogKey VARCHAR(140) AS (CONCAT_WS('|', PrescriptionName, COALESCE(DosageAmount, ''), COALESCE(DosageUnit, ''))) STORED INVISIBLE,
+    UNIQUE INDEX uq_medication_catalog (CatalogKey)
 );
 
 CREATE TABLE IF NOT EXISTS Patient_Medications (
@@ -113,6 +194,10 @@ CREATE TABLE IF NOT EXISTS Patient_Medications (
     MedicationID INTEGER,
     PrescribedDate DATE DEFAULT (CURRENT_DATE),
     EndDate DATE,
+    PickUpLocation VARCHAR(100),
+    RefillsLeft INTEGER,
+    FrequencyAmount INTEGER,
+    FrequencyPeriod VARCHAR(20),
     PRIMARY KEY (PatientID, MedicationID),
     FOREIGN KEY (PatientID) REFERENCES Patient(PatientID) ON DELETE CASCADE,
     FOREIGN KEY (MedicationID) REFERENCES Medication(MedicationID),
@@ -121,6 +206,21 @@ CREATE TABLE IF NOT EXISTS Patient_Medications (
     INDEX idx_patient_meds_date (PrescribedDate)
 );
 
+-- Append-only log of medication administrations, one row per dose.
+-- No foreign keys, so the history outlives the patient or medication.
+CREATE TABLE IF NOT EXISTS MedicationAdministration (
+    AdministrationID BIGINT PRIMARY KEY AUTO_INCREMENT,
+    PatientID INTEGER NOT NULL,
+    MedicationID INTEGER NOT NULL,
+    NurseID INTEGER,
+    Amount INTEGER NOT NULL,
+    RefillsLeft INTEGER NOT NULL,
+    AdministeredAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    INDEX idx_admin_patient (PatientID, AdministeredAt),
+    INDEX idx_admin_medication (MedicationID, AdministeredAt),
+    INDEX idx_admin_time (AdministeredAt)
+);
+
 CREATE TABLE IF NOT EXISTS MessageDetails (
     MessageID INTEGER PRIMARY KEY AUTO_INCREMENT,
     Subject VARCHAR(255) NOT NULL,
@@ -132,7 +232,8 @@ CREATE TABLE IF NOT EXISTS MessageDetails (
     ReadStatus BOOLEAN DEFAULT FALSE,
     Priority VARCHAR(20) DEFAULT 'Normal',
     INDEX idx_msg_senttime (SentTime),
-    INDEX idx_msg_postedby (PostedBy, PostedByRole)
+    INDEX idx_msg_postedby (PostedBy, PostedByRole),
+    FULLTEXT INDEX ft_msg_text (Subject, Content)
 );
 
 CREATE TABLE IF NOT EXISTS MessagePatients (
@@ -172,7 +273,10 @@ CREATE TABLE IF NOT EXISTS AlertDetails (
     Protocol TEXT,
     INDEX idx_alert_senttime (SentTime),
     INDEX idx_alert_urgency (UrgencyLevel),
-    INDEX idx_alert_postedby (PostedBy, PostedByRole)
+    INDEX idx_alert_postedby (PostedBy, PostedByRole),
+    -- Covers the per-user queue (most urgent first, then oldest)
+    INDEX idx_alert_queue (UrgencyLevel DESC, SentTime, AlertID),
+    FULLTEXT INDEX ft_alert_text (Message, Protocol)
 );
 
 CREATE TABLE IF NOT EXISTS AlertsDoctors (
@@ -197,6 +301,30 @@ CREATE TABLE IF NOT EXISTS AlertsNurse (
     INDEX idx_alert_nurse_ack (AcknowledgedTime)
 );
 
+-- Outbox for the /stream/events push channel. Alert and message writes
+-- append here in the same transaction; each API process tails it by
+-- EventID, which is also the SSE event id clients resume from. UserType /
+-- UserID address one recipient (NULL = every subscriber). Rows are
+-- pruned after a day.
+CREATE TABLE IF NOT EXISTS EventLog (
+    EventID BIGINT PRIMARY KEY AUTO_INCREMENT,
+    EventType VARCHAR(40) NOT NULL,
+    UserType VARCHAR(20),
+    UserID INTEGER,
+    Payload JSON NOT NULL,
+    CreatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    INDEX idx_event_created (CreatedAt)
+);
+
+-- Version counter per API resource, advanced by every write route after
+-- it commits. GET routes derive their ETag / Last-Modified from these
+-- (UpdatedAt is UTC) so unchanged data is answered with 304 unqueried.
+CREATE TABLE IF NOT EXISTS ResourceVersion (
+    Resource VARCHAR(30) PRIMARY KEY,
+    Version BIGINT NOT NULL DEFAULT 1,
+    UpdatedAt DATETIME(3) NOT NULL
+);
+
 -- =====================================================
 -- DATA INSERTION
 -- =====================================================
@@ -318,42 +446,42 @@ INSERT INTO Insurance (InsuranceProvider, PolicyNumber, Deductible, DueDate) VAL
 ('Humana', 'HUM-2024-040', 1100.00, '2024-09-20');
 
 -- STRONG ENTITY: Medication (35 rows)
-INSERT INTO Medication (PrescriptionName, DosageAmount, DosageUnit, PickUpLocation, RefillsLeft, FrequencyAmount, FrequencyPeriod) VALUES
-('Lisinopril', 10, 'mg', 'CVS Pharmacy - Main St', 5, 1, 'daily'),
-('Metformin', 500, 'mg', 'Walgreens - Oak Ave', 3, 2, 'daily'),
-('Atorvastatin', 20, 'mg', 'Hospital Pharmacy', 6, 1, 'daily'),
-('Amoxicillin', 500, 'mg', 'CVS Pharmacy - Main St', 0, 3, 'daily'),
-('Ibuprofen', 400, 'mg', 'Rite Aid - Center Blvd', 2, 3, 'daily'),
-('Sertraline', 50, 'mg', 'Walgreens - Oak Ave', 4, 1, 'daily'),
-('Omeprazole', 20, 'mg', 'Hospital Pharmacy', 5, 1, 'daily'),
-('Levothyroxine', 75, 'mcg', 'CVS Pharmacy - Main St', 6, 1, 'daily'),
-('Albuterol', 90, 'mcg', 'Walgreens - Oak Ave', 1, 2, 'as needed'),
-('Prednisone', 10, 'mg', 'Hospital Pharmacy', 0, 1, 'daily'),
-('Metoprolol', 25, 'mg', 'CVS Pharmacy - Main St', 3, 2, 'daily'),
-('Gabapentin', 300, 'mg', 'Rite Aid - Center Blvd', 4, 3, 'daily'),
-('Insulin Glargine', 10, 'units', 'Hospital Pharmacy', 5, 1, 'daily'),
-('Aspirin', 81, 'mg', 'Walgreens - Oak Ave', 6, 1, 'daily'),
-('Acetaminophen', 500, 'mg', 'CVS Pharmacy - Main St', 2, 4, 'daily'),
-('Warfarin', 5, 'mg', 'Hospital Pharmacy', 8, 1, 'daily'),
-('Furosemide', 40, 'mg', 'CVS Pharmacy - Main St', 4, 2, 'daily'),
-('Lorazepam', 1, 'mg', 'Walgreens - Oak Ave', 3, 1, 'as needed'),
-('Amlodipine', 5, 'mg', 'CVS Pharmacy - Main St', 4, 1, 'daily'),
-('Losartan', 50, 'mg', 'Walgreens - Oak Ave', 5, 1, 'daily'),
-('Carvedilol', 6.25, 'mg', 'Hospital Pharmacy', 3, 2, 'daily'),
-('Diltiazem', 30, 'mg', 'CVS Pharmacy - Main St', 6, 1, 'daily'),
-('Verapamil', 80, 'mg', 'Rite Aid - Center Blvd', 4, 3, 'daily'),
-('Nifedipine', 30, 'mg', 'Walgreens - Oak Ave', 5, 1, 'daily'),
-('Propranolol', 40, 'mg', 'Hospital Pharmacy', 3, 2, 'daily'),
-('Atenolol', 25, 'mg', 'CVS Pharmacy - Main St', 6, 1, 'daily'),
-('Bisoprolol', 5, 'mg', 'Rite Aid - Center Blvd', 4, 1, 'daily'),
-('Nebivolol', 5, 'mg', 'Walgreens - Oak Ave', 5, 1, 'daily'),
-('Valsartan', 80, 'mg', 'Hospital Pharmacy', 4, 1, 'daily'),
-('Candesartan', 8, 'mg', 'CVS Pharmacy - Main St', 6, 1, 'daily'),
-('Irbesartan', 150, 'mg', 'Rite Aid - Center Blvd', 3, 1, 'daily'),
-('Olmesartan', 20, 'mg', 'Walgreens - Oak Ave', 5, 1, 'daily'),
-('Telmisartan', 40, 'mg', 'Hospital Pharmacy', 4, 1, 'daily'),
-('Enalapril', 5, 'mg', 'CVS Pharmacy - Main St', 6, 1, 'daily'),
-('Ramipril', 2.5, 'mg', 'Rite Aid - Center Blvd', 3, 1, 'daily');
+INSERT INTO Medication (PrescriptionName, DosageAmount, DosageUnit) VALUES
+('Lisinopril', 10, 'mg'),
+('Metformin', 500, 'mg'),
+('Atorvastatin', 20, 'mg'),
+('Amoxicillin', 500, 'mg'),
+('Ibuprofen', 400, 'mg'),
+('Sertraline', 50, 'mg'),
+('Omeprazole', 20, 'mg'),
+('Levothyroxine', 75, 'mcg'),
+('Albuterol', 90, 'mcg'),
+('Prednisone', 10, 'mg'),
+('Metoprolol', 25, 'mg'),
+('Gabapentin', 300, 'mg'),
+('Insulin Glargine', 10, 'units'),
+('Aspirin', 81, 'mg'),
+('Acetaminophen', 500, 'mg'),
+('Warfarin', 5, 'mg'),
+('Furosemide', 40, 'mg'),
+('Lorazepam', 1, 'mg'),
+('Amlodipine', 5, 'mg'),
+('Losartan', 50, 'mg'),
+('Carvedilol', 6.25, 'mg'),
+('Diltiazem', 30, 'mg'),
+('Verapamil', 80, 'mg'),
+('Nifedipine', 30, 'mg'),
+('Propranolol', 40, 'mg'),
+('Atenolol', 25, 'mg'),
+('Bisoprolol', 5, 'mg'),
+('Nebivolol', 5, 'mg'),
+('Valsartan', 80, 'mg'),
+('Candesartan', 8, 'mg'),
+('Irbesartan', 150, 'mg'),
+('Olmesartan', 20, 'mg'),
+('Telmisartan', 40, 'mg'),
+('Enalapril', 5, 'mg'),
+('Ramipril', 2.5, 'mg');
 
 -- WEAK ENTITY: Visits (60 rows)
 INSERT INTO Visits (AdmitReason, AppointmentDate, NextVisitDate) VALUES
@@ -487,6 +615,12 @@ INSERT INTO VitalChart (HeartRate, BloodPressure, RespiratoryRate, Temperature)
 (88, '136/88', 19, 98.9),
 (82, '130/82', 18, 98.7);
 
+-- Structured blood pressure for the seeded "120/80" strings
+UPDATE VitalChart
+SET Systolic = CAST(TRIM(SUBSTRING_INDEX(BloodPressure, '/', 1)) AS UNSIGNED),
+    Diastolic = CAST(TRIM(SUBSTRING_INDEX(BloodPressure, '/', -1)) AS UNSIGNED)
+WHERE BloodPressure REGEXP '^ *[0-9]{1,3} */ *[0-9]{1,3} *$';
+
 -- WEAK ENTITY: Condition (55 rows)
 INSERT INTO `Condition` (Description, Treatment) VALUES
 ('Healthy - no significant findings', 'Continue regular checkups'),
@@ -943,189 +1077,189 @@ INSERT INTO AlertDetails (Message, PostedBy, PostedByRole, UrgencyLevel, Protoco
 
 -- BRIDGE TABLE: Patient_Medications (140 rows)
 -- Realistic prescription patterns with multiple medications per patient
-INSERT INTO Patient_Medications (PatientID, MedicationID, PrescribedDate, EndDate) VALUES
+INSERT INTO Patient_Medications (PatientID, MedicationID, PrescribedDate, EndDate, PickUpLocation, RefillsLeft, FrequencyAmount, FrequencyPeriod) VALUES
 -- Patient 1 medications
-(1, 1, '2024-01-15', NULL),
-(1, 14, '2024-01-15', NULL),
-(1, 19, '2024-03-15', NULL),
+(1, 1, '2024-01-15', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(1, 14, '2024-01-15', NULL, 'Walgreens - Oak Ave', 6, 1, 'daily'),
+(1, 19, '2024-03-15', NULL, 'CVS Pharmacy - Main St', 4, 1, 'daily'),
 -- Patient 2 medications  
-(2, 2, '2024-02-20', NULL),
-(2, 3, '2024-02-20', NULL),
-(2, 11, '2024-02-20', NULL),
-(2, 14, '2024-02-20', NULL),
+(2, 2, '2024-02-20', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(2, 3, '2024-02-20', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(2, 11, '2024-02-20', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
+(2, 14, '2024-02-20', NULL, 'Walgreens - Oak Ave', 6, 1, 'daily'),
 -- Patient 3 medications
-(3, 15, '2024-03-10', '2024-03-20'),
+(3, 15, '2024-03-10', '2024-03-20', 'CVS Pharmacy - Main St', 2, 4, 'daily'),
 -- Patient 4 medications
-(4, 1, '2024-03-25', NULL),
-(4, 5, '2024-03-25', '2024-04-25'),
-(4, 15, '2024-03-25', '2024-04-05'),
+(4, 1, '2024-03-25', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(4, 5, '2024-03-25', '2024-04-25', 'Rite Aid - Center Blvd', 2, 3, 'daily'),
+(4, 15, '2024-03-25', '2024-04-05', 'CVS Pharmacy - Main St', 2, 4, 'daily'),
 -- Patient 5 medications
-(5, 2, '2024-04-05', NULL),
-(5, 6, '2024-04-05', NULL),
-(5, 12, '2024-04-05', NULL),
-(5, 16, '2024-04-05', NULL),
+(5, 2, '2024-04-05', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(5, 6, '2024-04-05', NULL, 'Walgreens - Oak Ave', 4, 1, 'daily'),
+(5, 12, '2024-04-05', NULL, 'Rite Aid - Center Blvd', 4, 3, 'daily'),
+(5, 16, '2024-04-05', NULL, 'Hospital Pharmacy', 8, 1, 'daily'),
 -- Patient 6 medications
-(6, 7, '2024-04-18', NULL),
-(6, 8, '2024-04-18', NULL),
-(6, 14, '2024-04-18', NULL),
-(6, 17, '2024-04-18', NULL),
+(6, 7, '2024-04-18', NULL, 'Hospital Pharmacy', 5, 1, 'daily'),
+(6, 8, '2024-04-18', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
+(6, 14, '2024-04-18', NULL, 'Walgreens - Oak Ave', 6, 1, 'daily'),
+(6, 17, '2024-04-18', NULL, 'CVS Pharmacy - Main St', 4, 2, 'daily'),
 -- Patient 7 medications
-(7, 10, '2024-05-01', '2024-05-15'),
-(7, 15, '2024-05-01', '2024-05-15'),
+(7, 10, '2024-05-01', '2024-05-15', 'Hospital Pharmacy', 0, 1, 'daily'),
+(7, 15, '2024-05-01', '2024-05-15', 'CVS Pharmacy - Main St', 2, 4, 'daily'),
 -- Patient 8 medications
-(8, 6, '2024-05-10', NULL),
-(8, 18, '2024-05-10', '2024-06-10'),
+(8, 6, '2024-05-10', NULL, 'Walgreens - Oak Ave', 4, 1, 'daily'),
+(8, 18, '2024-05-10', '2024-06-10', 'Walgreens - Oak Ave', 3, 1, 'as needed'),
 -- Patient 9 medications
-(9, 1, '2024-05-20', NULL),
-(9, 2, '2024-05-20', NULL),
-(9, 3, '2024-05-20', NULL),
-(9, 4, '2024-05-20', '2024-05-30'),
+(9, 1, '2024-05-20', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(9, 2, '2024-05-20', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(9, 3, '2024-05-20', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(9, 4, '2024-05-20', '2024-05-30', 'CVS Pharmacy - Main St', 0, 3, 'daily'),
 -- Patient 10 medications
-(10, 4, '2024-06-01', '2024-06-11'),
-(10, 15, '2024-06-01', '2024-06-15'),
+(10, 4, '2024-06-01', '2024-06-11', 'CVS Pharmacy - Main St', 0, 3, 'daily'),
+(10, 15, '2024-06-01', '2024-06-15', 'CVS Pharmacy - Main St', 2, 4, 'daily'),
 -- Patient 11 medications
-(11, 2, '2024-06-10', NULL),
-(11, 11, '2024-06-10', NULL),
-(11, 13, '2024-06-10', NULL),
-(11, 14, '2024-06-10', NULL),
-(11, 20, '2024-06-10', NULL),
+(11, 2, '2024-06-10', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(11, 11, '2024-06-10', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
+(11, 13, '2024-06-10', NULL, 'Hospital Pharmacy', 5, 1, 'daily'),
+(11, 14, '2024-06-10', NULL, 'Walgreens - Oak Ave', 6, 1, 'daily'),
+(11, 20, '2024-06-10', NULL, 'Walgreens - Oak Ave', 5, 1, 'daily'),
 -- Patient 12 medications
-(12, 1, '2024-06-15', NULL),
-(12, 11, '2024-06-15', NULL),
+(12, 1, '2024-06-15', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(12, 11, '2024-06-15', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
 -- Patient 13 medications
-(13, 7, '2024-06-20', NULL),
-(13, 8, '2024-06-20', NULL),
-(13, 16, '2024-06-20', NULL),
-(13, 21, '2024-06-20', NULL),
+(13, 7, '2024-06-20', NULL, 'Hospital Pharmacy', 5, 1, 'daily'),
+(13, 8, '2024-06-20', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
+(13, 16, '2024-06-20', NULL, 'Hospital Pharmacy', 8, 1, 'daily'),
+(13, 21, '2024-06-20', NULL, 'Hospital Pharmacy', 3, 2, 'daily'),
 -- Patient 14 medications
-(14, 9, '2024-06-25', '2024-07-25'),
-(14, 10, '2024-06-25', '2024-06-30'),
-(14, 18, '2024-06-25', '2024-07-25'),
+(14, 9, '2024-06-25', '2024-07-25', 'Walgreens - Oak Ave', 1, 2, 'as needed'),
+(14, 10, '2024-06-25', '2024-06-30', 'Hospital Pharmacy', 0, 1, 'daily'),
+(14, 18, '2024-06-25', '2024-07-25', 'Walgreens - Oak Ave', 3, 1, 'as needed'),
 -- Patient 15 medications
-(15, 1, '2024-07-01', NULL),
-(15, 3, '2024-07-01', NULL),
-(15, 11, '2024-07-01', NULL),
-(15, 15, '2024-07-01', '2024-07-08'),
-(15, 22, '2024-07-01', NULL),
+(15, 1, '2024-07-01', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(15, 3, '2024-07-01', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(15, 11, '2024-07-01', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
+(15, 15, '2024-07-01', '2024-07-08', 'CVS Pharmacy - Main St', 2, 4, 'daily'),
+(15, 22, '2024-07-01', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
 -- Patient 16 medications
-(16, 16, '2024-07-15', NULL),
-(16, 17, '2024-07-15', NULL),
+(16, 16, '2024-07-15', NULL, 'Hospital Pharmacy', 8, 1, 'daily'),
+(16, 17, '2024-07-15', NULL, 'CVS Pharmacy - Main St', 4, 2, 'daily'),
 -- Patient 17 medications
-(17, 2, '2024-07-20', NULL),
-(17, 13, '2024-07-20', NULL),
-(17, 19, '2024-07-20', NULL),
-(17, 20, '2024-07-20', NULL),
-(17, 23, '2024-07-20', NULL),
+(17, 2, '2024-07-20', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(17, 13, '2024-07-20', NULL, 'Hospital Pharmacy', 5, 1, 'daily'),
+(17, 19, '2024-07-20', NULL, 'CVS Pharmacy - Main St', 4, 1, 'daily'),
+(17, 20, '2024-07-20', NULL, 'Walgreens - Oak Ave', 5, 1, 'daily'),
+(17, 23, '2024-07-20', NULL, 'Rite Aid - Center Blvd', 4, 3, 'daily'),
 -- Patient 18 medications
-(18, 21, '2024-07-25', NULL),
-(18, 24, '2024-07-25', NULL),
+(18, 21, '2024-07-25', NULL, 'Hospital Pharmacy', 3, 2, 'daily'),
+(18, 24, '2024-07-25', NULL, 'Walgreens - Oak Ave', 5, 1, 'daily'),
 -- Patient 19 medications
-(19, 1, '2024-08-01', NULL),
-(19, 11, '2024-08-01', NULL),
-(19, 22, '2024-08-01', NULL),
-(19, 23, '2024-08-01', NULL),
-(19, 25, '2024-08-01', NULL),
+(19, 1, '2024-08-01', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(19, 11, '2024-08-01', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
+(19, 22, '2024-08-01', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
+(19, 23, '2024-08-01', NULL, 'Rite Aid - Center Blvd', 4, 3, 'daily'),
+(19, 25, '2024-08-01', NULL, 'Hospital Pharmacy', 3, 2, 'daily'),
 -- Patient 20 medications
-(20, 8, '2024-08-05', NULL),
-(20, 24, '2024-08-05', NULL),
+(20, 8, '2024-08-05', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
+(20, 24, '2024-08-05', NULL, 'Walgreens - Oak Ave', 5, 1, 'daily'),
 -- Patient 21 medications
-(21, 2, '2024-08-10', NULL),
-(21, 13, '2024-08-10', NULL),
-(21, 25, '2024-08-10', NULL),
-(21, 26, '2024-08-10', NULL),
+(21, 2, '2024-08-10', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(21, 13, '2024-08-10', NULL, 'Hospital Pharmacy', 5, 1, 'daily'),
+(21, 25, '2024-08-10', NULL, 'Hospital Pharmacy', 3, 2, 'daily'),
+(21, 26, '2024-08-10', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
 -- Patient 22 medications
-(22, 27, '2024-08-15', NULL),
+(22, 27, '2024-08-15', NULL, 'Rite Aid - Center Blvd', 4, 1, 'daily'),
 -- Patient 23 medications
-(23, 1, '2024-08-20', NULL),
-(23, 3, '2024-08-20', NULL),
-(23, 16, '2024-08-20', NULL),
-(23, 28, '2024-08-20', NULL),
-(23, 29, '2024-08-20', NULL),
+(23, 1, '2024-08-20', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(23, 3, '2024-08-20', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(23, 16, '2024-08-20', NULL, 'Hospital Pharmacy', 8, 1, 'daily'),
+(23, 28, '2024-08-20', NULL, 'Walgreens - Oak Ave', 5, 1, 'daily'),
+(23, 29, '2024-08-20', NULL, 'Hospital Pharmacy', 4, 1, 'daily'),
 -- Patient 24 medications
-(24, 15, '2024-08-25', '2024-09-25'),
-(24, 30, '2024-08-25', NULL),
+(24, 15, '2024-08-25', '2024-09-25', 'CVS Pharmacy - Main St', 2, 4, 'daily'),
+(24, 30, '2024-08-25', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
 -- Patient 25 medications
-(25, 1, '2024-09-01', NULL),
-(25, 2, '2024-09-01', NULL),
-(25, 3, '2024-09-01', NULL),
-(25, 11, '2024-09-01', NULL),
-(25, 31, '2024-09-01', NULL),
-(25, 32, '2024-09-01', NULL),
+(25, 1, '2024-09-01', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(25, 2, '2024-09-01', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(25, 3, '2024-09-01', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(25, 11, '2024-09-01', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
+(25, 31, '2024-09-01', NULL, 'Rite Aid - Center Blvd', 3, 1, 'daily'),
+(25, 32, '2024-09-01', NULL, 'Walgreens - Oak Ave', 5, 1, 'daily'),
 -- Patient 26 medications
-(26, 33, '2024-09-05', NULL),
+(26, 33, '2024-09-05', NULL, 'Hospital Pharmacy', 4, 1, 'daily'),
 -- Patient 27 medications
-(27, 2, '2024-09-10', NULL),
-(27, 13, '2024-09-10', NULL),
-(27, 16, '2024-09-10', NULL),
-(27, 34, '2024-09-10', NULL),
-(27, 35, '2024-09-10', NULL),
+(27, 2, '2024-09-10', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(27, 13, '2024-09-10', NULL, 'Hospital Pharmacy', 5, 1, 'daily'),
+(27, 16, '2024-09-10', NULL, 'Hospital Pharmacy', 8, 1, 'daily'),
+(27, 34, '2024-09-10', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
+(27, 35, '2024-09-10', NULL, 'Rite Aid - Center Blvd', 3, 1, 'daily'),
 -- Patient 28 medications
-(28, 1, '2024-09-15', NULL),
+(28, 1, '2024-09-15', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
 -- Patient 29 medications
-(29, 1, '2024-09-20', NULL),
-(29, 2, '2024-09-20', NULL),
-(29, 3, '2024-09-20', NULL),
-(29, 11, '2024-09-20', NULL),
-(29, 14, '2024-09-20', NULL),
-(29, 17, '2024-09-20', NULL),
+(29, 1, '2024-09-20', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(29, 2, '2024-09-20', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(29, 3, '2024-09-20', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(29, 11, '2024-09-20', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
+(29, 14, '2024-09-20', NULL, 'Walgreens - Oak Ave', 6, 1, 'daily'),
+(29, 17, '2024-09-20', NULL, 'CVS Pharmacy - Main St', 4, 2, 'daily'),
 -- Patient 30 medications
-(30, 6, '2024-09-25', NULL),
-(30, 18, '2024-09-25', '2024-10-25'),
+(30, 6, '2024-09-25', NULL, 'Walgreens - Oak Ave', 4, 1, 'daily'),
+(30, 18, '2024-09-25', '2024-10-25', 'Walgreens - Oak Ave', 3, 1, 'as needed'),
 -- Patient 31 medications
-(31, 1, '2024-10-01', NULL),
-(31, 2, '2024-10-01', NULL),
-(31, 3, '2024-10-01', NULL),
-(31, 5, '2024-10-01', '2024-10-15'),
-(31, 6, '2024-10-01', NULL),
-(31, 11, '2024-10-01', NULL),
+(31, 1, '2024-10-01', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(31, 2, '2024-10-01', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(31, 3, '2024-10-01', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(31, 5, '2024-10-01', '2024-10-15', 'Rite Aid - Center Blvd', 2, 3, 'daily'),
+(31, 6, '2024-10-01', NULL, 'Walgreens - Oak Ave', 4, 1, 'daily'),
+(31, 11, '2024-10-01', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
 -- Patient 32 medications
-(32, 7, '2024-10-05', NULL),
+(32, 7, '2024-10-05', NULL, 'Hospital Pharmacy', 5, 1, 'daily'),
 -- Patient 33 medications
-(33, 1, '2024-10-10', NULL),
-(33, 3, '2024-10-10', NULL),
-(33, 8, '2024-10-10', NULL),
-(33, 9, '2024-10-10', '2024-11-10'),
-(33, 16, '2024-10-10', NULL),
-(33, 21, '2024-10-10', NULL),
+(33, 1, '2024-10-10', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(33, 3, '2024-10-10', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(33, 8, '2024-10-10', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
+(33, 9, '2024-10-10', '2024-11-10', 'Walgreens - Oak Ave', 1, 2, 'as needed'),
+(33, 16, '2024-10-10', NULL, 'Hospital Pharmacy', 8, 1, 'daily'),
+(33, 21, '2024-10-10', NULL, 'Hospital Pharmacy', 3, 2, 'daily'),
 -- Patient 34 medications
-(34, 10, '2024-10-15', '2024-10-30'),
+(34, 10, '2024-10-15', '2024-10-30', 'Hospital Pharmacy', 0, 1, 'daily'),
 -- Patient 35 medications
-(35, 1, '2024-10-20', NULL),
-(35, 2, '2024-10-20', NULL),
-(35, 3, '2024-10-20', NULL),
-(35, 11, '2024-10-20', NULL),
-(35, 12, '2024-10-20', NULL),
-(35, 17, '2024-10-20', NULL),
-(35, 19, '2024-10-20', NULL),
+(35, 1, '2024-10-20', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(35, 2, '2024-10-20', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(35, 3, '2024-10-20', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(35, 11, '2024-10-20', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
+(35, 12, '2024-10-20', NULL, 'Rite Aid - Center Blvd', 4, 3, 'daily'),
+(35, 17, '2024-10-20', NULL, 'CVS Pharmacy - Main St', 4, 2, 'daily'),
+(35, 19, '2024-10-20', NULL, 'CVS Pharmacy - Main St', 4, 1, 'daily'),
 -- Patient 36 medications
-(36, 13, '2024-10-25', NULL),
+(36, 13, '2024-10-25', NULL, 'Hospital Pharmacy', 5, 1, 'daily'),
 -- Patient 37 medications
-(37, 1, '2024-11-01', NULL),
-(37, 2, '2024-11-01', NULL),
-(37, 14, '2024-11-01', NULL),
-(37, 15, '2024-11-01', '2024-11-15'),
-(37, 16, '2024-11-01', NULL),
-(37, 20, '2024-11-01', NULL),
+(37, 1, '2024-11-01', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(37, 2, '2024-11-01', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(37, 14, '2024-11-01', NULL, 'Walgreens - Oak Ave', 6, 1, 'daily'),
+(37, 15, '2024-11-01', '2024-11-15', 'CVS Pharmacy - Main St', 2, 4, 'daily'),
+(37, 16, '2024-11-01', NULL, 'Hospital Pharmacy', 8, 1, 'daily'),
+(37, 20, '2024-11-01', NULL, 'Walgreens - Oak Ave', 5, 1, 'daily'),
 -- Patient 38 medications
-(38, 8, '2024-11-05', NULL),
-(38, 16, '2024-11-05', NULL),
+(38, 8, '2024-11-05', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
+(38, 16, '2024-11-05', NULL, 'Hospital Pharmacy', 8, 1, 'daily'),
 -- Patient 39 medications
-(39, 1, '2024-11-10', NULL),
-(39, 2, '2024-11-10', NULL),
-(39, 3, '2024-11-10', NULL),
-(39, 11, '2024-11-10', NULL),
-(39, 17, '2024-11-10', NULL),
-(39, 22, '2024-11-10', NULL),
-(39, 26, '2024-11-10', NULL),
+(39, 1, '2024-11-10', NULL, 'CVS Pharmacy - Main St', 5, 1, 'daily'),
+(39, 2, '2024-11-10', NULL, 'Walgreens - Oak Ave', 3, 2, 'daily'),
+(39, 3, '2024-11-10', NULL, 'Hospital Pharmacy', 6, 1, 'daily'),
+(39, 11, '2024-11-10', NULL, 'CVS Pharmacy - Main St', 3, 2, 'daily'),
+(39, 17, '2024-11-10', NULL, 'CVS Pharmacy - Main St', 4, 2, 'daily'),
+(39, 22, '2024-11-10', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
+(39, 26, '2024-11-10', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily'),
 -- Patient 40 medications
-(40, 18, '2024-11-15', '2024-12-15'),
-(40, 27, '2024-11-15', NULL),
+(40, 18, '2024-11-15', '2024-12-15', 'Walgreens - Oak Ave', 3, 1, 'as needed'),
+(40, 27, '2024-11-15', NULL, 'Rite Aid - Center Blvd', 4, 1, 'daily'),
 -- Additional prescriptions for bridge table requirement
-(1, 21, '2024-11-20', NULL),
-(2, 23, '2024-11-25', NULL),
-(3, 24, '2024-12-01', NULL),
-(4, 25, '2024-12-05', NULL),
-(5, 26, '2024-12-10', NULL);
+(1, 21, '2024-11-20', NULL, 'Hospital Pharmacy', 3, 2, 'daily'),
+(2, 23, '2024-11-25', NULL, 'Rite Aid - Center Blvd', 4, 3, 'daily'),
+(3, 24, '2024-12-01', NULL, 'Walgreens - Oak Ave', 5, 1, 'daily'),
+(4, 25, '2024-12-05', NULL, 'Hospital Pharmacy', 3, 2, 'daily'),
+(5, 26, '2024-12-10', NULL, 'CVS Pharmacy - Main St', 6, 1, 'daily');
 
 -- BRIDGE TABLE: MessagePatients (130 rows)
 -- Multiple messages per patient for realistic communication patterns
@@ -1486,3 +1620,50 @@ INSERT INTO AlertsNurse (AlertID, NurseID, AcknowledgedTime) VALUES
 (68, 27, '2024-03-17 08:10:00'),
 (69, 28, '2024-03-17 14:25:00'),
 (70, 29, '2024-03-18 09:25:00');
+
+-- Seed each patient's series with their current VitalChart reading
+INSERT INTO VitalReading (PatientID, RecordedAt, HeartRate, BloodPressure, RespiratoryRate, Temperature, Systolic, Diastolic)
+SELECT p.PatientID, COALESCE(v.AppointmentDate, CURRENT_DATE), vc.HeartRate, vc.BloodPressure, vc.RespiratoryRate, vc.Temperature,
+    vc.Systolic, vc.Diastolic
+FROM Patient p
+JOIN VitalChart vc ON vc.VitalID = p.VitalID
+LEFT JOIN Visits v ON v.VisitID = p.VisitID;
+
+INSERT INTO VitalLatest (PatientID, RecordedAt, HeartRate, BloodPressure, RespiratoryRate, Temperature, Systolic, Diastolic)
+SELECT PatientID, RecordedAt, HeartRate, BloodPressure, RespiratoryRate, Temperature, Systolic, Diastolic
+FROM VitalReading;
+
+-- Seed rollups for the seeded readings (one reading per patient, so each
+-- bucket holds a single sample); the vitals rebuild-rollups CLI recomputes them
+INSERT INTO VitalRollup (
+    PatientID, Resolution, BucketStart, SampleCount, LastAt,
+    HeartRateCount, HeartRateSum, HeartRateMin, HeartRateMax, HeartRateLast,
+    RespiratoryRateCount, RespiratoryRateSum, RespiratoryRateMin, RespiratoryRateMax, RespiratoryRateLast,
+    TemperatureCount, TemperatureSum, TemperatureMin, TemperatureMax, TemperatureLast,
+    SystolicCount, SystolicSum, SystolicMin, SystolicMax, SystolicLast,
+    DiastolicCount, DiastolicSum, DiastolicMin, DiastolicMax, DiastolicLast)
+SELECT r.PatientID, res.Seconds,
+    FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(r.RecordedAt) / res.Seconds) * res.Seconds),
+    1, r.RecordedAt,
+    r.HeartRate IS NOT NULL, COALESCE(r.HeartRate, 0), r.HeartRate, r.HeartRate, r.HeartRate,
+    r.RespiratoryRate IS NOT NULL, COALESCE(r.RespiratoryRate, 0), r.RespiratoryRate, r.RespiratoryRate, r.RespiratoryRate,
+    r.Temperature IS NOT NULL, COALESCE(r.Temperature, 0), r.Temperature, r.Temperature, r.Temperature,
+    r.Systolic IS NOT NULL, COALESCE(r.Systolic, 0), r.Systolic, r.Systolic, r.Systolic,
+    r.Diastolic IS NOT NULL, COALESCE(r.Diastolic, 0), r.Diastolic, r.Diastolic, r.Diastolic
+FROM VitalReading r
+CROSS JOIN (SELECT 60 AS Seconds UNION ALL SELECT 900 UNION ALL SELECT 3600) res;
+
+-- Initial version of every resource
+INSERT IGNORE INTO ResourceVersion (Resource, Version, UpdatedAt) VALUES
+('alert', 1, UTC_TIMESTAMP(3)),
+('condition', 1, UTC_TIMESTAMP(3)),
+('discharge', 1, UTC_TIMESTAMP(3)),
+('doctor', 1, UTC_TIMESTAMP(3)),
+('insurance', 1, UTC_TIMESTAMP(3)),
+('medication', 1, UTC_TIMESTAMP(3)),
+('message', 1, UTC_TIMESTAMP(3)),
+('nurse', 1, UTC_TIMESTAMP(3)),
+('patient', 1, UTC_TIMESTAMP(3)),
+('proxy', 1, UTC_TIMESTAMP(3)),
+('visit', 1, UTC_TIMESTAMP(3)),
+('vital', 1, UTC_TIMESTAMP(3));